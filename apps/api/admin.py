@@ -1,3 +1,9 @@
 from django.contrib import admin
+from .models import RegistroEliminado
 
-# Register your models here.
+
+@admin.register(RegistroEliminado)
+class RegistroEliminadoAdmin(admin.ModelAdmin):
+    list_display = ('modelo', 'objeto_id', 'fecha_eliminacion')
+    list_filter = ('modelo',)
+    date_hierarchy = 'fecha_eliminacion'
@@ -0,0 +1,69 @@
+# apps/api/exportacion.py
+import csv
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from apps.reportes.tablas import escapar_formula
+from .renderers import MedidaCSVRenderer, RegistroAvanceCSVRenderer
+
+
+class _Eco:
+    """Pseudo-archivo para ``csv.writer``: devuelve la línea en lugar de acumularla."""
+
+    def write(self, valor):
+        return valor
+
+
+class ExportacionCSV:
+    """
+    Exportación CSV en streaming de un queryset.
+
+    Recorre ``.values()`` con ``.iterator(chunk_size=...)`` y escribe cada fila
+    apenas llega de la base de datos, de modo que la memoria del worker no
+    depende de la cantidad de filas. ``columnas`` asocia el campo de ``values()``
+    (puede cruzar relaciones con ``__``) con el encabezado del CSV. Los textos
+    que empiezan como una fórmula se escapan con ``escapar_formula``.
+    """
+    columnas = {}
+    orden = ()
+    nombre_archivo = 'exportacion.csv'
+
+    @classmethod
+    def filas(cls, queryset):
+        campos = list(cls.columnas)
+        escritor = csv.writer(_Eco())
+        yield escritor.writerow(cls.columnas.values())
+
+        tamano = getattr(settings, 'EXPORTACION_CSV_CHUNK', 2000)
+        # Los planes de carga anticipada del API no aplican a values()
+        filas = (
+            queryset.select_related(None).prefetch_related(None)
+            .order_by(*cls.orden).values_list(*campos)
+        )
+        for fila in filas.iterator(chunk_size=tamano):
+            yield escritor.writerow([escapar_formula(valor) for valor in fila])
+
+    @classmethod
+    def respuesta(cls, queryset):
+        response = StreamingHttpResponse(cls.filas(queryset), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{cls.nombre_archivo}"'
+        return response
+
+
+def _columnas(renderer, campos=None):
+    """Columnas con los mismos encabezados que el renderer CSV del listado."""
+    campos = campos or {}
+    return {campos.get(campo, campo): renderer.labels[campo] for campo in renderer.header}
+
+
+class MedidaExportacion(ExportacionCSV):
+    columnas = _columnas(MedidaCSVRenderer, {'componente_nombre': 'componente__nombre'})
+    orden = ('codigo', 'id')
+    nombre_archivo = 'medidas.csv'
+
+
+class RegistroAvanceExportacion(ExportacionCSV):
+    columnas = _columnas(RegistroAvanceCSVRenderer)
+    orden = ('-fecha_registro', '-id')
+    nombre_archivo = 'registros_avance.csv'
@@ -1,5 +1,4 @@
 import django_filters
-from django.db.models import Q
 from apps.medidas.models import Medida, RegistroAvance
 from apps.organismos.models import Organismo
 
@@ -20,16 +19,13 @@ class MedidaFilter(django_filters.FilterSet):
     )
     retrasada = django_filters.BooleanFilter(method='filter_retrasada')
 
+    orden = django_filters.OrderingFilter(
+        fields=('codigo', 'fecha_termino', 'porcentaje_avance', 'dias_retraso')
+    )
+
     def filter_retrasada(self, queryset, name, value):
-        from django.utils import timezone
-        today = timezone.now().date()
-        if value:  # Si queremos medidas retrasadas
-            return queryset.filter(
-                Q(fecha_termino__lt=today) &
-                ~Q(estado='completada') &
-                ~Q(estado='suspendida')
-            )
-        return queryset
+        # Columna precalculada e indexada (ver Medida.calcular_retraso)
+        return queryset.filter(retrasada=value)
 
     class Meta:
         model = Medida
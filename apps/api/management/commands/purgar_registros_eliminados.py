@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.api.services import SincronizacionService
+
+
+class Command(BaseCommand):
+    help = 'Borra las marcas de eliminación más antiguas que SINCRONIZACION_RETENCION_ELIMINADOS días'
+
+    def handle(self, *args, **options):
+        dias = getattr(settings, 'SINCRONIZACION_RETENCION_ELIMINADOS', 90)
+        self.stdout.write(self.style.SUCCESS(f'Purgando marcas de eliminación de más de {dias} días...'))
+
+        borrados = SincronizacionService.purgar_eliminados()
+
+        self.stdout.write(self.style.SUCCESS(f'Marcas borradas: {borrados}'))
@@ -1,11 +1,13 @@
 import time
-from django.utils import timezone
-from apps.auditorias.models import Auditoria
+from .registro import cola_registro_api, muestrear
 
 
 class APILoggingMiddleware:
     """
     Middleware para registrar todas las llamadas a la API.
+
+    El registro se encola en ``cola_registro_api`` y se escribe en segundo plano,
+    fuera del tiempo de respuesta de la petición.
     """
 
     def __init__(self, get_response):
@@ -25,36 +27,35 @@ class APILoggingMiddleware:
         # Calcular tiempo de respuesta
         duration = time.time() - start_time
 
+        if not muestrear():
+            return response
+
         # llamada a la API en auditoría
         try:
-            # información de la petición
-            ip = self._get_client_ip(request)
-            method = request.method
-            path = request.path
-            user = request.user if request.user.is_authenticated else None
-            status_code = response.status_code
-
-            # Registrar en auditoría
-            Auditoria.objects.create(
-                usuario=user,
-                accion='api_call',
-                descripcion=f"Llamada a la API: {method} {path}",
-                ip=ip,
-                navegador=request.META.get('HTTP_USER_AGENT', ''),
-                datos_adicionales={
-                    'method': method,
-                    'path': path,
-                    'status_code': status_code,
-                    'duration_ms': round(duration * 1000, 2),
-                    'response_size': len(response.content) if hasattr(response, 'content') else 0,
-                }
-            )
+            user = getattr(request, 'user', None)
+            cola_registro_api.encolar({
+                'usuario_id': user.pk if user is not None and user.is_authenticated else None,
+                'method': request.method,
+                'path': request.path,
+                'ip': self._get_client_ip(request),
+                'navegador': request.META.get('HTTP_USER_AGENT', '')[:255],
+                'status_code': response.status_code,
+                'duration_ms': round(duration * 1000, 2),
+                'response_size': self._tamano_respuesta(response),
+            })
         except Exception as e:
             # No interrumpir la respuesta por errores en el registro
             print(f"Error al registrar llamada a la API: {str(e)}")
 
         return response
 
+    def _tamano_respuesta(self, response):
+        """Tamaño del cuerpo sin consumir las respuestas en streaming."""
+        if getattr(response, 'streaming', False):
+            longitud = response.get('Content-Length')
+            return int(longitud) if longitud else None
+        return len(response.content)
+
     def _get_client_ip(self, request):
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
         if x_forwarded_for:
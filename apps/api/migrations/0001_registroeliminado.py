@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroEliminado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=50, verbose_name='Modelo')),
+                ('objeto_id', models.PositiveBigIntegerField(verbose_name='ID del objeto')),
+                ('fecha_eliminacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de eliminación')),
+            ],
+            options={
+                'verbose_name': 'Registro eliminado',
+                'verbose_name_plural': 'Registros eliminados',
+                'ordering': ['-fecha_eliminacion'],
+                'indexes': [models.Index(fields=['modelo', 'fecha_eliminacion'], name='registro_eliminado_sync_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,73 @@
+import hashlib
+
+from django.utils.cache import patch_vary_headers
+from rest_framework import status
+from rest_framework.response import Response
+
+from .versiones import VersionTablas
+
+
+class RespuestaCondicionalMixin:
+    """
+    GET condicional para endpoints de lectura.
+
+    El ETag se calcula antes de consultar, a partir de la versión de las tablas
+    en ``modelos_version`` (ver ``VersionTablas``), la URL, el formato pedido y
+    el alcance del usuario. Si coincide con ``If-None-Match`` se responde 304 sin
+    generar la respuesta; con ``CACHE_COMPARTIDA``, sin tocar la base de datos.
+    """
+    modelos_version = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.responder_condicional(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.responder_condicional(request, super().retrieve, *args, **kwargs)
+
+    def responder_condicional(self, request, generar, *args, **kwargs):
+        etag = self.calcular_etag(request)
+        if etag in self._etags_solicitados(request):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = generar(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        patch_vary_headers(response, ('Accept', 'Authorization', 'Cookie'))
+        return response
+
+    def partes_etag(self, request):
+        """Valores que, junto a las versiones de las tablas, determinan la respuesta."""
+        usuario = request.user
+        if usuario.is_authenticated:
+            alcance = f'{usuario.rol}:{usuario.organismo_id or ""}'
+        else:
+            alcance = 'anonimo'
+        return [request.get_full_path(), request.META.get('HTTP_ACCEPT', ''), alcance]
+
+    def calcular_etag(self, request):
+        partes = self.partes_etag(request) + VersionTablas.obtener(self.modelos_version)
+        return '"%s"' % hashlib.sha1('|'.join(map(str, partes)).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _etags_solicitados(request):
+        # GZipMiddleware debilita el ETag (W/"..."): se compara sin el prefijo
+        encabezado = request.META.get('HTTP_IF_NONE_MATCH', '')
+        return {etag.strip().removeprefix('W/') for etag in encabezado.split(',') if etag.strip()}
+
+
+class ListadoCSVMixin:
+    """
+    Listado en CSV sin paginar.
+
+    Con ``?format=csv`` el listado no pasa por la paginación (el renderer CSV
+    recibiría el diccionario de la página): responde con la exportación en
+    streaming de ``exportacion_csv`` sobre el queryset filtrado completo.
+    """
+    exportacion_csv = None
+
+    def list(self, request, *args, **kwargs):
+        if self.exportacion_csv is not None and getattr(request.accepted_renderer, 'format', None) == 'csv':
+            return self.exportacion_csv.respuesta(self.filter_queryset(self.get_queryset()))
+        return super().list(request, *args, **kwargs)
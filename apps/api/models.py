@@ -1,3 +1,23 @@
 from django.db import models
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+
+class RegistroEliminado(models.Model):
+    """
+    Marca (tombstone) de un registro borrado físicamente, para que la
+    sincronización incremental pueda informar la eliminación a los clientes.
+    """
+    modelo = models.CharField(_("Modelo"), max_length=50)
+    objeto_id = models.PositiveBigIntegerField(_("ID del objeto"))
+    fecha_eliminacion = models.DateTimeField(_("Fecha de eliminación"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Registro eliminado")
+        verbose_name_plural = _("Registros eliminados")
+        ordering = ['-fecha_eliminacion']
+        indexes = [
+            models.Index(fields=['modelo', 'fecha_eliminacion'], name='registro_eliminado_sync_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.modelo} #{self.objeto_id}"
@@ -1,5 +1,11 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -15,4 +21,160 @@ class StandardResultsSetPagination(PageNumberPagination):
             'total_pages': self.page.paginator.num_pages,
             'current_page': self.page.number,
             'results': data
-        })
\ No newline at end of file
+        })
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por clave (keyset) para colecciones que crecen sin límite.
+
+    Ordena por ``ordering`` (el último campo debe ser único, normalmente ``id``)
+    y filtra cada página con ``WHERE (campo, id) < (valor, id)`` en lugar de
+    OFFSET, por lo que el costo no depende de la profundidad de la página. No
+    ejecuta ``COUNT(*)``: la respuesta solo trae enlaces ``next`` y ``previous``
+    con cursores opacos.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('-id',)
+    mensaje_cursor_invalido = 'Cursor inválido.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = getattr(view, 'keyset_ordering', self.ordering)
+        tamano = self.get_page_size(request)
+
+        cursor = self.decodificar_cursor(request)
+        reverso = cursor is not None and cursor['reverso']
+        orden = [self._invertir(campo) for campo in self.ordering] if reverso else list(self.ordering)
+
+        queryset = queryset.order_by(*orden)
+        if cursor is not None:
+            queryset = queryset.filter(self._despues_de(cursor['valores'], orden))
+
+        resultados = list(queryset[:tamano + 1])
+        hay_mas = len(resultados) > tamano
+        resultados = resultados[:tamano]
+
+        if reverso:
+            resultados.reverse()
+            self.tiene_siguiente, self.tiene_anterior = True, hay_mas
+        else:
+            self.tiene_siguiente, self.tiene_anterior = hay_mas, cursor is not None
+
+        self.resultados = resultados
+        return resultados
+
+    def get_page_size(self, request):
+        try:
+            tamano = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(tamano, self.max_page_size) if tamano > 0 else self.page_size
+
+    def get_next_link(self):
+        if not self.tiene_siguiente:
+            return None
+        if not self.resultados:
+            # Página vacía al retroceder: se vuelve al inicio
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self._enlace(self.resultados[-1], reverso=False)
+
+    def get_previous_link(self):
+        if not self.tiene_anterior or not self.resultados:
+            return None
+        return self._enlace(self.resultados[0], reverso=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Cursor opaco de la página, tomado de los enlaces next/previous.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Cantidad de resultados por página (máximo {self.max_page_size}).',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+    def decodificar_cursor(self, request):
+        """Retorna ``{'valores': [...], 'reverso': bool}`` o None si no viene cursor."""
+        codificado = request.query_params.get(self.cursor_query_param)
+        if not codificado:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(codificado.encode('ascii')))
+            valores, reverso = cursor['v'], bool(cursor.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.mensaje_cursor_invalido)
+        if not isinstance(valores, list) or len(valores) != len(self.ordering):
+            raise NotFound(self.mensaje_cursor_invalido)
+        return {'valores': valores, 'reverso': reverso}
+
+    def codificar_cursor(self, valores, reverso):
+        datos = json.dumps({'v': valores, 'r': int(reverso)}, default=str, separators=(',', ':'))
+        return base64.urlsafe_b64encode(datos.encode('utf-8')).decode('ascii')
+
+    def _enlace(self, instancia, reverso):
+        valores = [self._valor(instancia, campo) for campo in self.ordering]
+        cursor = self.codificar_cursor(valores, reverso)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    @staticmethod
+    def _valor(instancia, campo):
+        valor = getattr(instancia, campo.lstrip('-'))
+        return valor.isoformat() if hasattr(valor, 'isoformat') else valor
+
+    @staticmethod
+    def _invertir(campo):
+        return campo[1:] if campo.startswith('-') else f'-{campo}'
+
+    @staticmethod
+    def _despues_de(valores, orden):
+        """
+        Condición de comparación de tuplas para los campos de ``orden``:
+        (a, b) > (x, y)  ≡  a > x OR (a = x AND b > y), según la dirección de cada campo.
+        """
+        condicion = Q()
+        iguales = {}
+        for campo, valor in zip(orden, valores):
+            nombre = campo.lstrip('-')
+            operador = 'lt' if campo.startswith('-') else 'gt'
+            condicion |= Q(**iguales, **{f'{nombre}__{operador}': valor})
+            iguales[nombre] = valor
+        return condicion
+
+
+class RegistroAvancePagination(KeysetPagination):
+    ordering = ('-fecha_registro', '-id')
+
+
+class NotificacionPagination(KeysetPagination):
+    ordering = ('-fecha_envio', '-id')
@@ -0,0 +1,154 @@
+import atexit
+import logging
+import queue
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class ColaRegistroAPI:
+    """
+    Cola acotada en memoria para el registro de llamadas a la API.
+
+    La petición solo encola un diccionario compacto; un hilo en segundo plano
+    agrupa los registros y los inserta con ``bulk_create`` cuando se junta un
+    lote completo o pasa el intervalo máximo. Si la cola está llena, el registro
+    se descarta y se contabiliza en ``descartados``.
+    """
+
+    def __init__(self, maximo=10000, lote=200, intervalo=2.0):
+        self.cola = queue.Queue(maxsize=maximo)
+        self.lote = lote
+        self.intervalo = intervalo
+        self.encolados = 0
+        self.descartados = 0
+        self.fallidos = 0
+        # Descartados ya informados en el log
+        self._descartados_informados = 0
+        self._hilo = None
+        self._lock = threading.Lock()
+
+    def encolar(self, registro):
+        """Agrega un registro sin bloquear. Retorna False si se descartó por desborde."""
+        self._iniciar()
+        try:
+            self.cola.put_nowait(registro)
+        except queue.Full:
+            with self._lock:
+                self.descartados += 1
+            return False
+        with self._lock:
+            self.encolados += 1
+        return True
+
+    def vaciar(self):
+        """Escribe en el hilo actual todo lo que haya en la cola."""
+        registros = []
+        while True:
+            try:
+                registros.append(self.cola.get_nowait())
+            except queue.Empty:
+                break
+        for inicio in range(0, len(registros), self.lote):
+            self._escribir(registros[inicio:inicio + self.lote])
+
+    def estadisticas(self):
+        return {
+            'encolados': self.encolados,
+            'descartados': self.descartados,
+            'fallidos': self.fallidos,
+            'pendientes': self.cola.qsize(),
+        }
+
+    def _iniciar(self):
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(
+                    target=self._ejecutar, name='registro-api', daemon=True
+                )
+                self._hilo.start()
+
+    def _ejecutar(self):
+        while True:
+            registros = [self.cola.get()]
+            limite = time.monotonic() + self.intervalo
+            while len(registros) < self.lote:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    registros.append(self.cola.get(timeout=restante))
+                except queue.Empty:
+                    break
+
+            close_old_connections()
+            self._escribir(registros)
+
+    def _escribir(self, registros):
+        from apps.auditorias.models import Auditoria
+
+        try:
+            Auditoria.objects.bulk_create([
+                Auditoria(
+                    usuario_id=registro['usuario_id'],
+                    accion='api_call',
+                    descripcion=f"Llamada a la API: {registro['method']} {registro['path']}",
+                    ip=registro['ip'],
+                    navegador=registro['navegador'],
+                    datos_adicionales={
+                        'method': registro['method'],
+                        'path': registro['path'],
+                        'status_code': registro['status_code'],
+                        'duration_ms': registro['duration_ms'],
+                        'response_size': registro['response_size'],
+                    }
+                )
+                for registro in registros
+            ])
+        except Exception:
+            # Un error de escritura no debe detener el hilo
+            with self._lock:
+                self.fallidos += len(registros)
+            logger.exception("Error al registrar %s llamadas a la API", len(registros))
+        self._informar(len(registros))
+
+    def _informar(self, escritos):
+        """Deja en el log los contadores de cada escritura y advierte si hubo descartes desde la anterior."""
+        with self._lock:
+            nuevos = self.descartados - self._descartados_informados
+            self._descartados_informados = self.descartados
+        estadisticas = self.estadisticas()
+        if nuevos:
+            logger.warning(
+                "Registro de API: %s llamadas descartadas por cola llena desde la última escritura "
+                "(total descartadas: %s, pendientes: %s)",
+                nuevos, estadisticas['descartados'], estadisticas['pendientes'],
+            )
+        logger.debug(
+            "Registro de API: %s escritas; encoladas %s, descartadas %s, fallidas %s, pendientes %s",
+            escritos, estadisticas['encolados'], estadisticas['descartados'], estadisticas['fallidos'],
+            estadisticas['pendientes'],
+        )
+
+
+cola_registro_api = ColaRegistroAPI(
+    maximo=getattr(settings, 'API_LOG_COLA_MAXIMO', 10000),
+    lote=getattr(settings, 'API_LOG_LOTE', 200),
+    intervalo=getattr(settings, 'API_LOG_INTERVALO', 2.0),
+)
+
+# Escribir lo pendiente al terminar el proceso
+atexit.register(cola_registro_api.vaciar)
+
+
+def muestrear():
+    """Indica si la llamada actual debe registrarse según ``API_LOG_TASA_MUESTREO``."""
+    tasa = getattr(settings, 'API_LOG_TASA_MUESTREO', 1.0)
+    return tasa >= 1 or random.random() < tasa
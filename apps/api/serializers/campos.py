@@ -0,0 +1,88 @@
+# apps/api/serializers/campos.py
+from rest_framework import serializers
+
+
+def _lista(valor):
+    if valor is None:
+        return None
+    return {parte.strip() for parte in valor.split(',') if parte.strip()}
+
+
+class SeleccionCampos:
+    """
+    Campos y relaciones pedidos con ``?fields=`` y ``?expand=``.
+
+    ``None`` significa sin restricción: sin ``fields`` se entregan todos los
+    campos y sin ``expand`` se anidan todas las relaciones, como antes.
+    """
+
+    def __init__(self, campos=None, expandir=None):
+        self.campos = campos
+        self.expandir = expandir
+
+    @classmethod
+    def desde_request(cls, request):
+        if request is None:
+            return cls()
+        return cls(_lista(request.query_params.get('fields')), _lista(request.query_params.get('expand')))
+
+    def incluye(self, nombre):
+        return self.campos is None or nombre in self.campos
+
+    def expande(self, nombre):
+        return self.incluye(nombre) and (self.expandir is None or nombre in self.expandir)
+
+
+class CamposDinamicosMixin:
+    """
+    Aplica ``?fields=`` y ``?expand=`` al serializer raíz de la respuesta.
+
+    Las relaciones anidadas listadas en ``Meta.expandibles`` se entregan como
+    ids cuando se pide ``expand`` sin incluirlas. Los serializers anidados dentro
+    de otro no se recortan.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._es_raiz():
+            return fields
+
+        seleccion = SeleccionCampos.desde_request(self.context.get('request'))
+        if seleccion.campos is not None:
+            fields = {nombre: campo for nombre, campo in fields.items() if nombre in seleccion.campos}
+        for nombre in getattr(self.Meta, 'expandibles', ()):
+            if nombre in fields and not seleccion.expande(nombre):
+                fields[nombre] = serializers.PrimaryKeyRelatedField(
+                    read_only=True, many=isinstance(fields[nombre], serializers.ListSerializer)
+                )
+        return fields
+
+    def _es_raiz(self):
+        padre = self.parent
+        if isinstance(padre, serializers.ListSerializer):
+            padre = padre.parent
+        return padre is None
+
+    @classmethod
+    def columnas(cls, seleccion):
+        """Columnas del modelo para ``only()``, o None si se piden todos los campos."""
+        if seleccion.campos is None:
+            return None
+        modelo = cls.Meta.model
+        concretos = {campo.name for campo in modelo._meta.concrete_fields}
+        return [modelo._meta.pk.name] + sorted(seleccion.campos & concretos - {modelo._meta.pk.name})
+
+
+def preparar_queryset(queryset, serializer_class, request=None):
+    """
+    Aplica el plan de carga anticipada que declara el serializer, si lo tiene,
+    limitado a los campos y relaciones pedidos en el request.
+    """
+    seleccion = SeleccionCampos.desde_request(request)
+    preparar = getattr(serializer_class, 'preparar_queryset', None)
+    if preparar:
+        queryset = preparar(queryset, seleccion=seleccion)
+    columnas = getattr(serializer_class, 'columnas', None)
+    if columnas and columnas(seleccion):
+        queryset = queryset.only(*columnas(seleccion))
+    return queryset
@@ -1,6 +1,8 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 from apps.medidas.models import Componente, Medida, AsignacionMedida, RegistroAvance
 from .organismos import OrganismoSimpleSerializer
+from .campos import CamposDinamicosMixin, SeleccionCampos
 
 
 class ComponenteSerializer(serializers.ModelSerializer):
@@ -17,14 +19,22 @@ class AsignacionMedidaSerializer(serializers.ModelSerializer):
         fields = ['id', 'organismo', 'es_coordinador', 'descripcion_responsabilidad']
 
 
-class MedidaListSerializer(serializers.ModelSerializer):
+class MedidaListSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     componente = ComponenteSerializer(read_only=True)
 
     class Meta:
 
         model = Medida
         fields = ['id', 'codigo', 'nombre', 'componente', 'estado',
-                  'porcentaje_avance', 'fecha_inicio', 'fecha_termino']
+                  'porcentaje_avance', 'fecha_inicio', 'fecha_termino', 'retrasada', 'dias_retraso']
+        expandibles = ['componente']
+
+    @staticmethod
+    def preparar_queryset(queryset, seleccion=SeleccionCampos()):
+        """Carga anticipada de las relaciones que serializa esta clase."""
+        if seleccion.expande('componente'):
+            queryset = queryset.select_related('componente')
+        return queryset
 
 
 
@@ -64,7 +74,16 @@ class RegistroAvanceSerializer(serializers.ModelSerializer):
 
         return super().create(validated_data)
 
-class MedidaDetailSerializer(serializers.ModelSerializer):
+class RegistroAvanceLoteSerializer(serializers.ModelSerializer):
+    """Avance dentro de un registro en lote; la medida se valida para todo el lote a la vez."""
+    medida = serializers.IntegerField(source='medida_id')
+
+    class Meta:
+        model = RegistroAvance
+        fields = ['medida', 'fecha_registro', 'porcentaje_avance', 'descripcion']
+
+
+class MedidaDetailSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     componente = ComponenteSerializer(read_only=True)
     asignaciones = AsignacionMedidaSerializer(many=True, read_only=True)
     registros_avance = RegistroAvanceSerializer(many=True, read_only=True)
@@ -74,14 +93,53 @@ class MedidaDetailSerializer(serializers.ModelSerializer):
         fields = ['id', 'codigo', 'nombre', 'descripcion', 'componente',
                   'fecha_inicio', 'fecha_termino', 'estado', 'prioridad',
 
-                  'porcentaje_avance', 'asignaciones', 'registros_avance']
+                  'porcentaje_avance', 'retrasada', 'dias_retraso', 'asignaciones', 'registros_avance']
+        expandibles = ['componente', 'asignaciones', 'registros_avance']
+
+    @staticmethod
+    def preparar_queryset(queryset, prefijo='', seleccion=SeleccionCampos()):
+        """
+        Carga anticipada de componente, asignaciones con su organismo y registros,
+        para que el costo del listado no crezca con la cantidad de filas.
+        Solo se cargan las relaciones pedidas; las no expandidas se leen como ids.
+
+        Args:
+            prefijo: ruta hasta la medida cuando se serializa anidada (p. ej. ``'medida__'``)
+            seleccion: campos y relaciones pedidos con ``?fields=`` y ``?expand=``
+        """
+        if seleccion.expande('componente'):
+            queryset = queryset.select_related(f'{prefijo}componente')
+        if seleccion.incluye('asignaciones'):
+            asignaciones = AsignacionMedida.objects.all()
+            if seleccion.expande('asignaciones'):
+                asignaciones = asignaciones.select_related('organismo')
+            else:
+                asignaciones = asignaciones.only('id', 'medida')
+            queryset = queryset.prefetch_related(Prefetch(f'{prefijo}asignaciones', queryset=asignaciones))
+        if seleccion.incluye('registros_avance'):
+            registros = RegistroAvance.objects.all()
+            if not seleccion.expande('registros_avance'):
+                registros = registros.only('id', 'medida')
+            queryset = queryset.prefetch_related(Prefetch(f'{prefijo}registros_avance', queryset=registros))
+        return queryset
 
 
-class RegistroAvanceDetailSerializer(serializers.ModelSerializer):
+class RegistroAvanceDetailSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     medida = MedidaDetailSerializer(read_only=True)
     organismo = OrganismoSimpleSerializer(read_only=True)
     
     class Meta:
         model = RegistroAvance
         fields = ['id', 'medida', 'fecha_registro', 'porcentaje_avance', 'descripcion', 'evidencia', 'organismo', 'created_at']
+        expandibles = ['medida', 'organismo']
+
+    @staticmethod
+    def preparar_queryset(queryset, seleccion=SeleccionCampos()):
+        """Carga anticipada de la medida anidada (con sus relaciones) y del organismo."""
+        if seleccion.expande('organismo'):
+            queryset = queryset.select_related('organismo')
+        if seleccion.expande('medida'):
+            queryset = queryset.select_related('medida')
+            queryset = MedidaDetailSerializer.preparar_queryset(queryset, prefijo='medida__')
+        return queryset
 
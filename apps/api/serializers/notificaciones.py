@@ -0,0 +1,13 @@
+# apps/api/serializers/notificaciones.py
+from rest_framework import serializers
+from apps.notificaciones.models import Notificacion
+
+
+class NotificacionSerializer(serializers.ModelSerializer):
+    tipo_nombre = serializers.ReadOnlyField(source='tipo.nombre')
+
+    class Meta:
+        model = Notificacion
+        fields = ['id', 'tipo', 'tipo_nombre', 'titulo', 'mensaje', 'enlace', 'medida',
+                  'organismo', 'fecha_envio', 'fecha_lectura', 'leida', 'prioridad']
+        read_only_fields = fields
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from apps.organismos.models import Organismo, TipoOrganismo, ContactoOrganismo
+from .campos import CamposDinamicosMixin, SeleccionCampos
 
 
 class TipoOrganismoSerializer(serializers.ModelSerializer):
@@ -14,7 +15,7 @@ class ContactoOrganismoSerializer(serializers.ModelSerializer):
         fields = ['id', 'nombre', 'apellido', 'cargo', 'email', 'telefono', 'es_principal']
 
 
-class OrganismoSimpleSerializer(serializers.ModelSerializer):
+class OrganismoSimpleSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Versión simple de organismos"""
 
     class Meta:
@@ -22,7 +23,7 @@ class OrganismoSimpleSerializer(serializers.ModelSerializer):
         fields = ['id', 'nombre']
 
 
-class OrganismoDetailSerializer(serializers.ModelSerializer):
+class OrganismoDetailSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Versión completa del organismo con toda la información"""
     tipo = TipoOrganismoSerializer(read_only=True)
     contactos = ContactoOrganismoSerializer(many=True, read_only=True)
@@ -30,4 +31,14 @@ class OrganismoDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Organismo
         fields = ['id', 'nombre', 'tipo', 'rut', 'direccion', 'comuna', 'region',
-                  'telefono', 'email_contacto', 'sitio_web', 'contactos']
\ No newline at end of file
+                  'telefono', 'email_contacto', 'sitio_web', 'contactos']
+        expandibles = ['tipo', 'contactos']
+
+    @staticmethod
+    def preparar_queryset(queryset, seleccion=SeleccionCampos()):
+        """Carga anticipada del tipo y los contactos, si se piden."""
+        if seleccion.expande('tipo'):
+            queryset = queryset.select_related('tipo')
+        if seleccion.incluye('contactos'):
+            queryset = queryset.prefetch_related('contactos')
+        return queryset
\ No newline at end of file
@@ -1,6 +1,6 @@
 # apps/api/serializers/reportes.py
 from rest_framework import serializers
-from apps.reportes.models import TipoReporte, ReporteGenerado
+from apps.reportes.models import TipoReporte, ReporteGenerado, TrabajoReporte
 from apps.organismos.models import Organismo
 from apps.medidas.models import Componente
 
@@ -22,7 +22,7 @@ class ReporteGeneradoSerializer(serializers.ModelSerializer):
     class Meta:
         model = ReporteGenerado
         fields = ['id', 'tipo_reporte', 'tipo_reporte_nombre', 'usuario', 'usuario_nombre',
-                  'titulo', 'fecha_generacion', 'parametros', 'organismo', 'organismo_nombre',
+                  'titulo', 'formato', 'fecha_generacion', 'parametros', 'organismo', 'organismo_nombre',
                   'componente', 'componente_nombre', 'archivo_url']
         read_only_fields = ['fecha_generacion', 'archivo']
 
@@ -34,6 +34,17 @@ class ReporteGeneradoSerializer(serializers.ModelSerializer):
         return None
 
 
+class TrabajoReporteSerializer(serializers.ModelSerializer):
+    tipo_reporte_nombre = serializers.ReadOnlyField(source='tipo_reporte.nombre')
+    reporte = ReporteGeneradoSerializer(read_only=True)
+
+    class Meta:
+        model = TrabajoReporte
+        fields = ['id', 'tipo_reporte', 'tipo_reporte_nombre', 'titulo', 'parametros', 'estado',
+                  'error', 'created_at', 'fecha_inicio', 'fecha_fin', 'reporte']
+        read_only_fields = fields
+
+
 class GenerarReporteSerializer(serializers.Serializer):
     tipo_reporte_id = serializers.IntegerField()
     titulo = serializers.CharField(max_length=200)
@@ -41,6 +52,7 @@ class GenerarReporteSerializer(serializers.Serializer):
     componente_id = serializers.IntegerField(required=False, allow_null=True)
     fecha_inicio = serializers.DateField(required=False, allow_null=True)
     fecha_fin = serializers.DateField(required=False, allow_null=True)
+    formato = serializers.ChoiceField(choices=TipoReporte.FORMATO_CHOICES, default='pdf')
 
     def validate_tipo_reporte_id(self, value):
         try:
@@ -63,4 +75,16 @@ class GenerarReporteSerializer(serializers.Serializer):
                 Componente.objects.get(pk=value)
             except Componente.DoesNotExist:
                 raise serializers.ValidationError("El componente especificado no existe.")
-        return value
\ No newline at end of file
+        return value
+
+
+class GenerarReportesLoteSerializer(serializers.Serializer):
+    tipo_reporte_id = serializers.IntegerField()
+    titulo = serializers.CharField(max_length=150, required=False, allow_blank=True)
+    organismo_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    formato = serializers.ChoiceField(choices=TipoReporte.FORMATO_CHOICES, default='pdf')
+
+    def validate_tipo_reporte_id(self, value):
+        if not TipoReporte.objects.filter(pk=value, tipo='organismo').exists():
+            raise serializers.ValidationError("El tipo de reporte especificado no existe o no es por organismo.")
+        return value
@@ -0,0 +1,35 @@
+# apps/api/serializers/sincronizacion.py
+from rest_framework import serializers
+from apps.medidas.models import AsignacionMedida, Medida, RegistroAvance
+from apps.organismos.models import Organismo
+
+
+class MedidaSyncSerializer(serializers.ModelSerializer):
+    """Medida plana, con sus relaciones como ids, para la sincronización incremental."""
+
+    class Meta:
+        model = Medida
+        fields = ['id', 'codigo', 'nombre', 'descripcion', 'componente', 'fecha_inicio',
+                  'fecha_termino', 'estado', 'prioridad', 'porcentaje_avance', 'retrasada',
+                  'dias_retraso', 'updated_at']
+
+
+class OrganismoSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Organismo
+        fields = ['id', 'nombre', 'tipo', 'rut', 'direccion', 'comuna', 'region',
+                  'telefono', 'email_contacto', 'sitio_web', 'updated_at']
+
+
+class AsignacionMedidaSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AsignacionMedida
+        fields = ['id', 'medida', 'organismo', 'es_coordinador',
+                  'descripcion_responsabilidad', 'fecha_asignacion', 'updated_at']
+
+
+class RegistroAvanceSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RegistroAvance
+        fields = ['id', 'medida', 'organismo', 'fecha_registro', 'porcentaje_avance',
+                  'descripcion', 'evidencia', 'created_at', 'updated_at']
@@ -0,0 +1,196 @@
+import base64
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.medidas.models import AsignacionMedida, Medida, RegistroAvance
+from apps.organismos.models import Organismo
+from .models import RegistroEliminado
+from .serializers.sincronizacion import (
+    AsignacionMedidaSyncSerializer,
+    MedidaSyncSerializer,
+    OrganismoSyncSerializer,
+    RegistroAvanceSyncSerializer,
+)
+
+# Colecciones sincronizables: nombre en la respuesta -> (modelo, serializer)
+COLECCIONES = {
+    'medidas': (Medida, MedidaSyncSerializer),
+    'organismos': (Organismo, OrganismoSyncSerializer),
+    'asignaciones': (AsignacionMedida, AsignacionMedidaSyncSerializer),
+    'registros_avance': (RegistroAvance, RegistroAvanceSyncSerializer),
+}
+
+
+class ContinuacionInvalida(ValueError):
+    """El token de continuación de la sincronización no se puede interpretar."""
+
+
+class SincronizacionService:
+    @staticmethod
+    def obtener_cambios(usuario, desde=None, continuacion=None):
+        """
+        Cambios de las colecciones sincronizables posteriores a ``desde``, por páginas.
+
+        Por colección retorna ``actualizados`` (filas vigentes con ``updated_at``
+        mayor o igual a ``desde``) y ``eliminados`` (ids desactivados con
+        ``activo=False`` o borrados, según ``RegistroEliminado``). Sin ``desde``
+        retorna todas las filas vigentes. Si ``desde`` es anterior a la retención
+        de ``RegistroEliminado`` (``SINCRONIZACION_RETENCION_ELIMINADOS`` días) se
+        responde una sincronización completa, porque las marcas ya se purgaron.
+
+        Cada colección se recorre por clave ``(updated_at, id)`` y las marcas por
+        ``(fecha_eliminacion, id)``, con a lo sumo ``SINCRONIZACION_LOTE`` filas de
+        cada una por respuesta. Si quedan filas, ``siguiente`` trae el token de
+        continuación que se envía como ``continuacion`` para pedir la página
+        siguiente; en la última página es None.
+
+        El ``sync_token`` es el instante de la primera página menos
+        ``SINCRONIZACION_MARGEN`` segundos, para no perder filas de transacciones
+        que confirmen después de la lectura, y se repite en todas las páginas: el
+        cliente lo guarda al recibir la última. Una fila puede llegar en dos
+        páginas o sincronizaciones seguidas: el cliente debe aplicar los cambios
+        como upsert.
+        """
+        lote = getattr(settings, 'SINCRONIZACION_LOTE', 500)
+
+        if continuacion is not None:
+            estado = SincronizacionService.decodificar_continuacion(continuacion)
+        else:
+            estado = SincronizacionService._estado_inicial(desde)
+        desde = estado['desde']
+
+        cambios, posiciones = {}, {}
+        for nombre, (modelo, serializer_class) in COLECCIONES.items():
+            actualizados, eliminados = [], []
+
+            clave = f'{nombre}.actualizados'
+            if clave in estado['posiciones']:
+                queryset = SincronizacionService._queryset(modelo, usuario)
+                if desde is not None:
+                    queryset = queryset.filter(updated_at__gte=desde)
+                filas, posicion = SincronizacionService._pagina(
+                    queryset, 'updated_at', estado['posiciones'][clave], lote
+                )
+                for objeto in filas:
+                    if getattr(objeto, 'activo', True):
+                        actualizados.append(objeto)
+                    elif desde is not None:
+                        eliminados.append(objeto.pk)
+                if posicion is not None:
+                    posiciones[clave] = posicion
+
+            clave = f'{nombre}.eliminados'
+            if clave in estado['posiciones']:
+                marcas, posicion = SincronizacionService._pagina(
+                    RegistroEliminado.objects.filter(
+                        modelo=modelo._meta.label_lower, fecha_eliminacion__gte=desde
+                    ),
+                    'fecha_eliminacion', estado['posiciones'][clave], lote
+                )
+                eliminados.extend(marca.objeto_id for marca in marcas)
+                if posicion is not None:
+                    posiciones[clave] = posicion
+
+            cambios[nombre] = {
+                'actualizados': serializer_class(actualizados, many=True).data,
+                'eliminados': sorted(set(eliminados)),
+            }
+
+        siguiente = None
+        if posiciones:
+            siguiente = SincronizacionService.codificar_continuacion({**estado, 'posiciones': posiciones})
+
+        return {
+            'sync_token': estado['sync_token'],
+            'completo': desde is None,
+            'siguiente': siguiente,
+            **cambios,
+        }
+
+    @staticmethod
+    def purgar_eliminados():
+        """
+        Borra las marcas de ``RegistroEliminado`` más antiguas que la retención.
+
+        Returns:
+            int: Cantidad de marcas borradas
+        """
+        borrados, _ = RegistroEliminado.objects.filter(
+            fecha_eliminacion__lt=SincronizacionService._limite_retencion()
+        ).delete()
+        return borrados
+
+    @staticmethod
+    def codificar_continuacion(estado):
+        datos = json.dumps({
+            'd': estado['desde'].isoformat() if estado['desde'] else None,
+            't': estado['sync_token'],
+            'p': estado['posiciones'],
+        }, separators=(',', ':'))
+        return base64.urlsafe_b64encode(datos.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decodificar_continuacion(continuacion):
+        try:
+            datos = json.loads(base64.urlsafe_b64decode(continuacion.encode('ascii')))
+            desde = parse_datetime(datos['d']) if datos['d'] else None
+            estado = {'desde': desde, 'sync_token': str(datos['t']), 'posiciones': dict(datos['p'])}
+            validas = SincronizacionService._estado_inicial(desde, validar=False)['posiciones']
+            valido = (desde is not None or not datos['d']) and set(estado['posiciones']) <= set(validas)
+            for posicion in estado['posiciones'].values():
+                if posicion is not None:
+                    valor, pk = posicion
+                    valido = valido and isinstance(pk, int) and parse_datetime(valor) is not None
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            valido = False
+        if not valido:
+            raise ContinuacionInvalida('Token de continuación inválido.')
+        return estado
+
+    @staticmethod
+    def _estado_inicial(desde, validar=True):
+        margen = getattr(settings, 'SINCRONIZACION_MARGEN', 60)
+        # Sin marcas de eliminación anteriores al límite: el cliente debe sincronizar todo
+        if validar and desde is not None and desde < SincronizacionService._limite_retencion():
+            desde = None
+
+        posiciones = {f'{nombre}.actualizados': None for nombre in COLECCIONES}
+        if desde is not None:
+            posiciones.update({f'{nombre}.eliminados': None for nombre in COLECCIONES})
+        return {
+            'desde': desde,
+            'sync_token': (timezone.now() - timedelta(seconds=margen)).isoformat(),
+            'posiciones': posiciones,
+        }
+
+    @staticmethod
+    def _pagina(queryset, campo, posicion, lote):
+        """
+        Filas siguientes a ``posicion`` (``[valor, id]`` o None) por ``(campo, id)``.
+        Retorna las filas y la posición de la última, o None si no quedan más.
+        """
+        if posicion is not None:
+            valor, pk = parse_datetime(posicion[0]), posicion[1]
+            queryset = queryset.filter(Q(**{f'{campo}__gt': valor}) | Q(**{campo: valor, 'pk__gt': pk}))
+        filas = list(queryset.order_by(campo, 'id')[:lote + 1])
+        if len(filas) <= lote:
+            return filas, None
+        filas = filas[:lote]
+        return filas, [getattr(filas[-1], campo).isoformat(), filas[-1].pk]
+
+    @staticmethod
+    def _limite_retencion():
+        dias = getattr(settings, 'SINCRONIZACION_RETENCION_ELIMINADOS', 90)
+        return timezone.now() - timedelta(days=dias)
+
+    @staticmethod
+    def _queryset(modelo, usuario):
+        # Los usuarios de organismo solo ven los avances de su organismo, como en el API
+        if modelo is RegistroAvance and usuario.is_organismo:
+            return RegistroAvance.objects.filter(organismo_id=usuario.organismo_id)
+        return modelo.objects.all()
@@ -0,0 +1,58 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.medidas.models import AsignacionMedida, Componente, Medida, RegistroAvance
+from apps.medidas.signals import avances_registrados, medidas_importadas, retrasos_actualizados
+from apps.organismos.models import ContactoOrganismo, Organismo, TipoOrganismo
+from .models import RegistroEliminado
+from .versiones import VersionTablas
+
+
+@receiver(post_delete, sender=Medida)
+@receiver(post_delete, sender=Organismo)
+@receiver(post_delete, sender=AsignacionMedida)
+@receiver(post_delete, sender=RegistroAvance)
+def registrar_eliminacion(sender, instance, **kwargs):
+    """Deja la marca de eliminación que informa la sincronización incremental."""
+    RegistroEliminado.objects.create(modelo=sender._meta.label_lower, objeto_id=instance.pk)
+
+
+# Tablas cuya versión alimenta los ETag de los endpoints de lectura
+MODELOS_VERSIONADOS = [
+    Componente, Medida, AsignacionMedida, RegistroAvance,
+    TipoOrganismo, Organismo, ContactoOrganismo,
+]
+
+
+def incrementar_version(sender, **kwargs):
+    VersionTablas.incrementar(sender)
+
+
+for modelo in MODELOS_VERSIONADOS:
+    post_save.connect(incrementar_version, sender=modelo, dispatch_uid=f'version_{modelo._meta.label_lower}_save')
+    post_delete.connect(incrementar_version, sender=modelo, dispatch_uid=f'version_{modelo._meta.label_lower}_delete')
+
+
+@receiver(m2m_changed, sender=Medida.responsables.through)
+def incrementar_version_responsables(sender, action, **kwargs):
+    # add()/remove() sobre responsables no emiten post_save de AsignacionMedida
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        VersionTablas.incrementar(AsignacionMedida)
+
+
+@receiver(avances_registrados, sender=RegistroAvance)
+def incrementar_version_avances(sender, **kwargs):
+    VersionTablas.incrementar(RegistroAvance)
+
+
+@receiver(medidas_importadas, sender=Medida)
+def incrementar_version_importacion(sender, resumen, **kwargs):
+    if resumen['medidas_creadas'] or resumen['medidas_actualizadas']:
+        VersionTablas.incrementar(Medida)
+    if resumen['asignaciones_creadas'] or resumen['asignaciones_actualizadas']:
+        VersionTablas.incrementar(AsignacionMedida)
+
+
+@receiver(retrasos_actualizados, sender=Medida)
+def incrementar_version_retrasos(sender, **kwargs):
+    VersionTablas.incrementar(Medida)
@@ -8,10 +8,11 @@ from drf_yasg import openapi
 from .views.organismos import OrganismoViewSet, TipoOrganismoViewSet
 from .views.medidas import ComponenteViewSet, MedidaViewSet, RegistroAvanceViewSet
 from .views.dashboard import DashboardView
+from .views.sincronizacion import SincronizacionView
 
 from .views.auth import CustomAuthToken, LogoutView
 
-from .views.reportes import TipoReporteViewSet, ReporteGeneradoViewSet
+from .views.reportes import TipoReporteViewSet, ReporteGeneradoViewSet, TrabajoReporteViewSet
 
 from rest_framework.authtoken.views import obtain_auth_token
 from rest_framework.permissions import AllowAny
@@ -29,6 +30,7 @@ class TaggedSchemaGenerator(OpenAPISchemaGenerator):
             {'name': 'Reportes', 'description': 'Generación de reportes'},
             {'name': 'Dashboard', 'description': 'Paneles de control'},
             {'name': 'Notificaciones', 'description': 'Gestión de notificaciones'},
+            {'name': 'Sincronización', 'description': 'Sincronización incremental'},
         ]
 
 
@@ -56,6 +58,7 @@ router.register(r'medidas', MedidaViewSet)
 router.register(r'registros-avance', RegistroAvanceViewSet)
 router.register(r'tipos-reporte', TipoReporteViewSet)
 router.register(r'reportes', ReporteGeneradoViewSet, basename='reportes')
+router.register(r'trabajos-reporte', TrabajoReporteViewSet, basename='trabajos-reporte')
 
 # URLs de la API
 urlpatterns = [
@@ -71,6 +74,7 @@ urlpatterns = [
     # Endpoints de la API
     path('', include(router.urls)),
     path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('sincronizacion/', SincronizacionView.as_view(), name='sincronizacion'),
 
     # Autenticación
     path('auth/token/', CustomAuthToken.as_view(), name='api-token'),
@@ -1,6 +1,12 @@
 from django.urls import path
-from apps.api.views.notificaciones import notificaciones_no_leidas_api
+from apps.api.views.notificaciones import (
+    NotificacionListAPIView,
+    notificaciones_no_leidas_api,
+    notificaciones_stream,
+)
 
 urlpatterns = [
+    path('', NotificacionListAPIView.as_view(), name='notificaciones_lista'),
     path('no-leidas/', notificaciones_no_leidas_api, name='notificaciones_no_leidas'),
+    path('stream/', notificaciones_stream, name='notificaciones_stream'),
 ]
\ No newline at end of file
@@ -0,0 +1,56 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+
+
+class VersionTablas:
+    """
+    Versión por tabla para los ETag de los endpoints de lectura.
+
+    Con ``CACHE_COMPARTIDA`` la versión es un token en la caché: las señales de
+    guardado y borrado publican uno nuevo al confirmarse la transacción, de modo
+    que calcularla cuesta una lectura de caché y ninguna consulta. Sin caché
+    compartida cada proceso tendría sus propios tokens y no vería los cambios de
+    los otros (comandos, otros workers), así que la versión se deriva de la base
+    de datos: ``max(updated_at)`` y la cantidad de filas de cada tabla.
+    """
+
+    @staticmethod
+    def clave(modelo):
+        return f'api:version:{modelo._meta.label_lower}'
+
+    @staticmethod
+    def obtener(modelos):
+        """Retorna las versiones de los modelos, en el mismo orden."""
+        if not VersionTablas._en_cache():
+            return [VersionTablas._desde_base_datos(modelo) for modelo in modelos]
+
+        claves = [VersionTablas.clave(modelo) for modelo in modelos]
+        versiones = cache.get_many(claves)
+        for clave in claves:
+            if clave not in versiones:
+                cache.add(clave, uuid.uuid4().hex, None)
+                versiones[clave] = cache.get(clave)
+        return [versiones[clave] for clave in claves]
+
+    @staticmethod
+    def incrementar(modelo):
+        """Publica una versión nueva de la tabla cuando se confirme la transacción actual."""
+        if not VersionTablas._en_cache():
+            return
+        clave = VersionTablas.clave(modelo)
+        transaction.on_commit(lambda: cache.set(clave, uuid.uuid4().hex, None))
+
+    @staticmethod
+    def _desde_base_datos(modelo):
+        # Toda escritura masiva de estas tablas fija updated_at; un borrado baja la cantidad
+        datos = modelo._default_manager.aggregate(ultima=Max('updated_at'), total=Count('pk'))
+        ultima = datos['ultima'].isoformat() if datos['ultima'] else ''
+        return f"{ultima}:{datos['total']}"
+
+    @staticmethod
+    def _en_cache():
+        return getattr(settings, 'CACHE_COMPARTIDA', False)
@@ -1,18 +1,22 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.db.models import Avg, Count, Sum
 from drf_spectacular.utils import extend_schema
 
-from apps.medidas.models import Medida, Componente, RegistroAvance
+from django.utils import timezone
+
+from apps.medidas.models import AsignacionMedida, Componente, Medida, RegistroAvance
+from apps.medidas.services import EstadisticaService
 from apps.organismos.models import Organismo
+from ..mixins import RespuestaCondicionalMixin
 from ..permissions import IsPublicEndpoint
 
 
-class DashboardView(APIView):
+class DashboardView(RespuestaCondicionalMixin, APIView):
     """
     API endpoint para obtener datos resumidos para el dashboard.
     """
     permission_classes = [IsPublicEndpoint]
+    modelos_version = (Medida, Componente, AsignacionMedida, Organismo, RegistroAvance)
 
     @extend_schema(
         description="Obtener datos resumidos para el dashboard",
@@ -68,26 +72,36 @@ class DashboardView(APIView):
         }}
     )
     def get(self, request):
-        # Resumen general
-        total_medidas = Medida.objects.count()
-        total_componentes = Componente.objects.filter(activo=True).count()
-        total_organismos = Organismo.objects.filter(activo=True).count()
+        return self.responder_condicional(request, self.resumen)
+
+    def partes_etag(self, request):
+        # Las medidas retrasadas del snapshot cambian con el día
+        return super().partes_etag(request) + [timezone.now().date()]
 
-        # Avance global
-        avance_global = Medida.objects.aggregate(
-            promedio=Avg('porcentaje_avance')
-        )['promedio'] or 0
+    def resumen(self, request):
+        # Resumen general y agregados desde el snapshot de estadísticas
+        estadisticas = EstadisticaService.obtener_resumen()
+        resumen = estadisticas['global']
 
         # Avance por componente
-        avance_componentes = Componente.objects.filter(activo=True).annotate(
-            total_medidas=Count('medidas'),
-            avance_promedio=Avg('medidas__porcentaje_avance')
-        ).values('id', 'nombre', 'codigo', 'color', 'total_medidas', 'avance_promedio')
+        avance_componentes = [
+            {
+                'id': componente['id'],
+                'nombre': componente['nombre'],
+                'codigo': componente['codigo'],
+                'color': componente['color'],
+                'total_medidas': componente['total_medidas'],
+                'avance_promedio': componente['avance_promedio'],
+            }
+            for componente in estadisticas['componentes'] if componente['activo']
+        ]
 
         # Estado de las medidas
-        estado_medidas = Medida.objects.values('estado').annotate(
-            cantidad=Count('id')
-        ).order_by('estado')
+        estado_medidas = [
+            {'estado': estado['estado'], 'cantidad': estado['total_medidas']}
+            for estado in sorted(estadisticas['estados'], key=lambda e: e['estado'])
+            if estado['total_medidas']
+        ]
 
         # Medidas recientes
         medidas_recientes = Medida.objects.order_by('-updated_at')[:5].values(
@@ -102,13 +116,13 @@ class DashboardView(APIView):
 
         return Response({
             'resumen': {
-                'total_medidas': total_medidas,
-                'total_componentes': total_componentes,
-                'total_organismos': total_organismos,
-                'avance_global': avance_global,
+                'total_medidas': resumen['total_medidas'],
+                'total_componentes': resumen['total_componentes'],
+                'total_organismos': resumen['total_organismos'],
+                'avance_global': resumen['avance_promedio'],
             },
-            'avance_componentes': list(avance_componentes),
-            'estado_medidas': list(estado_medidas),
+            'avance_componentes': avance_componentes,
+            'estado_medidas': estado_medidas,
             'medidas_recientes': list(medidas_recientes),
             'avances_recientes': list(avances_recientes),
-        })
\ No newline at end of file
+        })
@@ -4,6 +4,7 @@ from rest_framework.renderers import JSONRenderer, BrowsableAPIRenderer
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.authentication import TokenAuthentication
+from django.conf import settings
 from django_filters.rest_framework import DjangoFilterBackend
 
 from drf_spectacular.utils import (
@@ -17,13 +18,16 @@ from drf_spectacular.utils import (
 from drf_yasg.utils import swagger_auto_schema
 
 from ..filters import MedidaFilter, RegistroAvanceFilter
-from apps.medidas.models import Componente, Medida, RegistroAvance, LogMedida
+from apps.medidas.models import Componente, Medida, AsignacionMedida, RegistroAvance, LogMedida
+from apps.organismos.models import Organismo
+from ..serializers.campos import preparar_queryset
 from ..serializers.medidas import (
     ComponenteSerializer,
     MedidaListSerializer,
     MedidaDetailSerializer,
     RegistroAvanceSerializer,
     RegistroAvanceDetailSerializer,
+    RegistroAvanceLoteSerializer,
 )
 from ..permissions import (
     IsPublicEndpoint,
@@ -33,8 +37,13 @@ from ..permissions import (
     IsOrganismoOwner,
 )
 from apps.medidas.serializers import MedidaSerializer
+from apps.medidas.services import AvanceService
+from apps.medidas.importacion import ImportadorMedidas, ArchivoInvalido, leer_filas
 
 from ..renderers import MedidaCSVRenderer, RegistroAvanceCSVRenderer
+from ..pagination import RegistroAvancePagination
+from ..exportacion import MedidaExportacion, RegistroAvanceExportacion
+from ..mixins import ListadoCSVMixin, RespuestaCondicionalMixin
 
 # views.py
 from rest_framework.decorators import api_view
@@ -47,6 +56,7 @@ def debug_auth(request):
         'auth_header': request.META.get('HTTP_AUTHORIZATION')
     })
 
+
 @extend_schema_view(
     list=extend_schema(
         description="Listar todos los componentes del plan",
@@ -58,11 +68,12 @@ def debug_auth(request):
     tags=['Componentes'], 
     operation_description="API endpoint para consultar componentes del plan"
     )
-class ComponenteViewSet(viewsets.ReadOnlyModelViewSet):
+class ComponenteViewSet(RespuestaCondicionalMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint para consultar componentes del plan.
     """
     queryset = Componente.objects.filter(activo=True)
+    modelos_version = (Componente,)
     serializer_class = ComponenteSerializer
     permission_classes = [IsPublicEndpoint]
     filter_backends = [DjangoFilterBackend]
@@ -190,17 +201,20 @@ class ComponenteViewSet(viewsets.ReadOnlyModelViewSet):
     )
 )
 @swagger_auto_schema(tags=['Medidas'])
-class MedidaViewSet(viewsets.ModelViewSet):
+class MedidaViewSet(RespuestaCondicionalMixin, ListadoCSVMixin, viewsets.ModelViewSet):
     """
     API endpoint para consultar y gestionar medidas.
     """
     authentication_classes = [TokenAuthentication]
     queryset = Medida.objects.all()
+    # El detalle anida componente, asignaciones con su organismo y registros de avance
+    modelos_version = (Medida, Componente, AsignacionMedida, Organismo, RegistroAvance)
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["componente", "estado", "prioridad"]
     search_fields = ["codigo", "nombre", "descripcion"]
     filterset_class = MedidaFilter
     renderer_classes = [JSONRenderer, BrowsableAPIRenderer, MedidaCSVRenderer]
+    exportacion_csv = MedidaExportacion
     
     @swagger_auto_schema(tags=['Medidas'])
     def list(self, request, *args, **kwargs):
@@ -227,14 +241,17 @@ class MedidaViewSet(viewsets.ModelViewSet):
 
         # Si es administrador, ve todas las medidas
         if user.is_authenticated and (user.is_superadmin or user.is_admin_sma):
-            return Medida.objects.all()
+            queryset = Medida.objects.all()
 
         # Si es usuario de organismo, solo ve sus medidas asignadas
-        if user.is_authenticated and user.is_organismo:
-            return Medida.objects.filter(responsables=user.organismo)
+        elif user.is_authenticated and user.is_organismo:
+            queryset = Medida.objects.filter(responsables=user.organismo)
 
         # Para usuarios no autenticados o ciudadanos
-        return Medida.objects.all()
+        else:
+            queryset = Medida.objects.all()
+
+        return preparar_queryset(queryset, self.get_serializer_class(), self.request)
     
     def get_serializer_class(self):
         if self.action == "list":
@@ -248,7 +265,7 @@ class MedidaViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         if self.action in ["list", "retrieve"]:
             permission_classes = [IsPublicEndpoint]
-        elif self.action in ["create", "update", "partial_update", "destroy"]:
+        elif self.action in ["create", "update", "partial_update", "destroy", "importar"]:
             permission_classes = [IsSuperAdmin | IsAdminSMA]
         else:
             permission_classes = [IsPublicEndpoint]
@@ -291,6 +308,51 @@ class MedidaViewSet(viewsets.ModelViewSet):
         serializer = RegistroAvanceSerializer(avances, many=True)
         return Response(serializer.data)
 
+    @extend_schema(
+        description="Exportar en CSV las medidas filtradas, sin paginar",
+        responses={(200, 'text/csv'): str},
+        tags=['Medidas']
+    )
+    @swagger_auto_schema(
+        tags=['Medidas'],
+        operation_description="Exportar en CSV las medidas filtradas, sin paginar")
+    @action(detail=False, methods=["get"])
+    def exportar(self, request):
+        """
+        Exportar las medidas filtradas en un CSV que se genera en streaming.
+        """
+        return MedidaExportacion.respuesta(self.filter_queryset(self.get_queryset()))
+
+    @extend_schema(
+        description="Importar medidas y asignaciones desde un archivo CSV o XLSX (campo 'archivo')",
+        request={'multipart/form-data': {'type': 'object', 'properties': {'archivo': {'type': 'string', 'format': 'binary'}}}},
+        responses={
+            200: OpenApiResponse(description="Resumen de la importación con los errores por fila"),
+            400: OpenApiResponse(description="Archivo ausente, de formato no soportado o ilegible"),
+        },
+        tags=['Medidas']
+    )
+    @swagger_auto_schema(
+        tags=['Medidas'],
+        operation_description="Importar medidas y asignaciones desde un archivo CSV o XLSX")
+    @action(detail=False, methods=["post"], permission_classes=[IsSuperAdmin | IsAdminSMA])
+    def importar(self, request):
+        """
+        Importar medidas (por código) y sus asignaciones a organismos desde un CSV o XLSX.
+        Las filas con errores se informan en el resumen y no impiden importar el resto.
+        """
+        archivo = request.FILES.get("archivo")
+        if archivo is None:
+            return Response({"detail": "Debe adjuntar el archivo en el campo 'archivo'."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            resumen = ImportadorMedidas(usuario=request.user, request=request).importar(
+                leer_filas(archivo, archivo.name)
+            )
+        except ArchivoInvalido as error:
+            return Response({"detail": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(resumen)
+
     @swagger_auto_schema(
         tags=['Medidas'],
         operation_description="Registrar un nuevo avance para esta medida.")
@@ -334,7 +396,7 @@ class MedidaViewSet(viewsets.ModelViewSet):
 )
 
 @swagger_auto_schema(tags=['Registro Avance'])
-class RegistroAvanceViewSet(viewsets.ModelViewSet):
+class RegistroAvanceViewSet(ListadoCSVMixin, viewsets.ModelViewSet):
     """
     API endpoint para consultar y gestionar registros de avance.
     """
@@ -345,6 +407,8 @@ class RegistroAvanceViewSet(viewsets.ModelViewSet):
     filterset_fields = ["medida", "organismo", "fecha_registro"]
     filterset_class = RegistroAvanceFilter
     renderer_classes = [JSONRenderer, BrowsableAPIRenderer, RegistroAvanceCSVRenderer]
+    pagination_class = RegistroAvancePagination
+    exportacion_csv = RegistroAvanceExportacion
 
     @swagger_auto_schema(tags=['Registro Avance'])
     def list(self, request, *args, **kwargs):
@@ -375,14 +439,74 @@ class RegistroAvanceViewSet(viewsets.ModelViewSet):
 
         # Si es administrador, ve todos los registros
         if user.is_authenticated and (user.is_superadmin or user.is_admin_sma):
-            return RegistroAvance.objects.all()
+            queryset = RegistroAvance.objects.all()
 
         # Si es usuario de organismo, solo ve sus propios registros
-        if user.is_authenticated and user.is_organismo:
-            return RegistroAvance.objects.filter(organismo=user.organismo)
+        elif user.is_authenticated and user.is_organismo:
+            queryset = RegistroAvance.objects.filter(organismo=user.organismo)
 
         # Para usuarios no autenticados, no ver nada
-        return RegistroAvance.objects.none()
+        else:
+            return RegistroAvance.objects.none()
+
+        return preparar_queryset(queryset, self.get_serializer_class(), self.request)
+
+    @extend_schema(
+        description="Exportar en CSV los registros de avance filtrados, sin paginar",
+        responses={(200, 'text/csv'): str},
+    )
+    @swagger_auto_schema(
+        tags=['Registro Avance'],
+        operation_description="Exportar en CSV los registros de avance filtrados, sin paginar")
+    @action(detail=False, methods=["get"])
+    def exportar(self, request):
+        """
+        Exportar el historial de avances filtrado en un CSV que se genera en streaming.
+        """
+        return RegistroAvanceExportacion.respuesta(self.filter_queryset(self.get_queryset()))
+
+    @extend_schema(
+        description="Registrar varios avances del organismo en una sola operación",
+        request=RegistroAvanceLoteSerializer(many=True),
+        responses={
+            201: RegistroAvanceSerializer(many=True),
+            403: OpenApiResponse(description="Alguna medida no está asignada al organismo del usuario"),
+            400: OpenApiResponse(description="Datos inválidos"),
+        },
+    )
+    @swagger_auto_schema(
+        tags=['Registro Avance'],
+        operation_description="Registrar varios avances del organismo en una sola operación")
+    @action(detail=False, methods=["post"], permission_classes=[IsOrganismoMember])
+    def lote(self, request):
+        """
+        Registrar en lote los avances del organismo del usuario.
+        Se validan todos juntos y se guardan en una sola transacción: si uno falla, no se guarda ninguno.
+        """
+        maximo = getattr(settings, 'AVANCES_LOTE_MAXIMO', 500)
+        if not isinstance(request.data, list) or not request.data:
+            return Response({"detail": "Se espera una lista de avances."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(request.data) > maximo:
+            return Response(
+                {"detail": f"El lote no puede superar los {maximo} avances."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = RegistroAvanceLoteSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        # Asignación del organismo a todas las medidas del lote con una sola consulta
+        no_asignadas = AvanceService.medidas_no_asignadas(
+            request.user.organismo_id, [avance['medida_id'] for avance in serializer.validated_data]
+        )
+        if no_asignadas:
+            return Response(
+                {"detail": "Tu organismo no está asignado a estas medidas", "medidas": no_asignadas},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        registros = AvanceService.registrar_lote(request.user, serializer.validated_data, request=request)
+        return Response(RegistroAvanceSerializer(registros, many=True).data, status=status.HTTP_201_CREATED)
 
     def get_serializer_class(self):
         if self.action == "create":
@@ -392,7 +516,7 @@ class RegistroAvanceViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         if self.action in ["list", "retrieve"]:
             permission_classes = [IsPublicEndpoint]
-        elif self.action in ["create"]:
+        elif self.action in ["create", "lote"]:
             permission_classes = [IsOrganismoMember]
         elif self.action in ["update", "partial_update"]:
             permission_classes = [IsOrganismoOwner | IsAdminSMA | IsSuperAdmin]
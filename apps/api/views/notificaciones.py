@@ -1,7 +1,15 @@
 
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from rest_framework import generics
+from rest_framework.permissions import IsAuthenticated
+from apps.notificaciones.models import Notificacion
+from apps.notificaciones.eventos import flujo_eventos_async
 from apps.notificaciones.services import NotificacionService
+from ..pagination import NotificacionPagination
+from ..serializers.notificaciones import NotificacionSerializer
 
 @login_required
 def notificaciones_no_leidas_api(request):
@@ -14,4 +22,40 @@ def notificaciones_no_leidas_api(request):
     except Exception as e:
         # Log the error for debugging
         print(f"Error al contar notificaciones: {str(e)}")
-        return JsonResponse({'cantidad': 0, 'error': str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({'cantidad': 0, 'error': str(e)}, status=500)
+
+
+@login_required
+def notificaciones_stream(request):
+    """
+    Flujo Server-Sent Events con las nuevas notificaciones y el contador de no leídas.
+
+    Solo con ``NOTIFICACIONES_SSE`` y un servidor ASGI: con WSGI cada conexión
+    ocuparía un hilo del worker. En otro caso responde 204, que indica a
+    EventSource que no reconecte; el navegador consulta el contador periódicamente.
+    """
+    if not getattr(settings, 'NOTIFICACIONES_SSE', False) or not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(flujo_eventos_async(request.user.id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Evita que nginx u otros proxies acumulen los eventos
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+class NotificacionListAPIView(generics.ListAPIView):
+    """
+    Bandeja de notificaciones del usuario actual, paginada por clave
+    sobre ``(fecha_envio, id)``. Acepta ``?leida=true|false``.
+    """
+    serializer_class = NotificacionSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = NotificacionPagination
+
+    def get_queryset(self):
+        queryset = Notificacion.objects.filter(usuario=self.request.user).select_related('tipo')
+        leida = self.request.query_params.get('leida')
+        if leida in ('true', 'false'):
+            queryset = queryset.filter(leida=leida == 'true')
+        return queryset
@@ -2,7 +2,8 @@ from rest_framework import viewsets
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from drf_yasg.utils import swagger_auto_schema
-from apps.organismos.models import Organismo, TipoOrganismo
+from apps.organismos.models import Organismo, TipoOrganismo, ContactoOrganismo
+from ..serializers.campos import preparar_queryset
 from ..serializers.organismos import (
     OrganismoDetailSerializer,
     OrganismoSimpleSerializer,
@@ -10,6 +11,7 @@ from ..serializers.organismos import (
 )
 from apps.organismos.serializers import OrganismoSerializer
 from ..permissions import IsPublicEndpoint, IsAdminSMA, IsSuperAdmin
+from ..mixins import RespuestaCondicionalMixin
 from rest_framework import status
 from rest_framework.response import Response
 
@@ -18,11 +20,12 @@ from rest_framework.response import Response
     list=extend_schema(description="Listar todos los tipos de organismos"),
     retrieve=extend_schema(description="Obtener un tipo de organismo específico")
 )
-class TipoOrganismoViewSet(viewsets.ReadOnlyModelViewSet):
+class TipoOrganismoViewSet(RespuestaCondicionalMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint para consultar tipos de organismos.
     """
     queryset = TipoOrganismo.objects.filter(activo=True)
+    modelos_version = (TipoOrganismo,)
     serializer_class = TipoOrganismoSerializer
     permission_classes = [IsPublicEndpoint]
     filter_backends = [DjangoFilterBackend]
@@ -44,11 +47,12 @@ class TipoOrganismoViewSet(viewsets.ReadOnlyModelViewSet):
     partial_update=extend_schema(description="Actualizar parcialmente un organismo"),
     destroy=extend_schema(description="Eliminar un organismo")
 )
-class OrganismoViewSet(viewsets.ModelViewSet):
+class OrganismoViewSet(RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """
     API endpoint para consultar y gestionar organismos.
     """
     queryset = Organismo.objects.filter(activo=True)
+    modelos_version = (Organismo, TipoOrganismo, ContactoOrganismo)
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['tipo', 'comuna', 'region']
     search_fields = ['nombre', 'rut', 'email_contacto']
@@ -73,6 +77,9 @@ class OrganismoViewSet(viewsets.ModelViewSet):
     def partial_update(self, request, *args, **kwargs):
         return super().partial_update(request, *args, **kwargs)
 
+    def get_queryset(self):
+        return preparar_queryset(super().get_queryset(), self.get_serializer_class(), self.request)
+
     def get_serializer_class(self):
         if self.action == 'list':
             return OrganismoSimpleSerializer
@@ -3,10 +3,20 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.conf import settings
+from django.urls import reverse
 
-from apps.reportes.models import TipoReporte, ReporteGenerado
+from apps.reportes.models import TipoReporte, ReporteGenerado, TrabajoReporte
+from apps.reportes.descargas import respuesta_descarga
 from apps.reportes.services import ReporteService
-from ..serializers.reportes import TipoReporteSerializer, ReporteGeneradoSerializer, GenerarReporteSerializer
+from ..serializers.reportes import (
+    TipoReporteSerializer,
+    ReporteGeneradoSerializer,
+    GenerarReporteSerializer,
+    GenerarReportesLoteSerializer,
+    TrabajoReporteSerializer,
+)
+from ..permissions import IsSuperAdmin, IsAdminSMA
 from drf_yasg.utils import swagger_auto_schema
 
 class TipoReporteViewSet(viewsets.ReadOnlyModelViewSet):
@@ -42,6 +52,30 @@ class TipoReporteViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
 
+class TrabajoReporteViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint para consultar el estado de los reportes en cola.
+    """
+    serializer_class = TrabajoReporteSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(tags=['Reportes'])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @swagger_auto_schema(tags=['Reportes'])
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    def get_queryset(self):
+        # Un usuario solo puede ver sus propios trabajos (excepto superadmin y admin_sma)
+        user = self.request.user
+        queryset = TrabajoReporte.objects.select_related('tipo_reporte', 'reporte').order_by('-created_at')
+        if user.rol in ['superadmin', 'admin_sma']:
+            return queryset
+        return queryset.filter(usuario=user)
+
+
 class ReporteGeneradoViewSet(viewsets.ModelViewSet):
     """
     API endpoint para gestionar reportes generados.
@@ -85,6 +119,7 @@ class ReporteGeneradoViewSet(viewsets.ModelViewSet):
     def generar(self, request):
         """
         Genera un nuevo reporte basado en los parámetros proporcionados.
+        Con generación asíncrona responde 202 con el trabajo en cola.
         """
         serializer = GenerarReporteSerializer(data=request.data)
         if serializer.is_valid():
@@ -93,6 +128,29 @@ class ReporteGeneradoViewSet(viewsets.ModelViewSet):
             if request.user.rol == 'organismo':
                 organismo_id = request.user.organismo.id
 
+            # Encolar el reporte; el cliente consulta el estado en trabajos-reporte
+            if settings.REPORTES_GENERACION_ASINCRONA:
+                trabajo = ReporteService.encolar_reporte(
+                    usuario=request.user,
+                    tipo_reporte_id=serializer.validated_data['tipo_reporte_id'],
+                    titulo=serializer.validated_data['titulo'],
+                    organismo_id=organismo_id,
+                    componente_id=serializer.validated_data.get('componente_id'),
+                    fecha_inicio=serializer.validated_data.get('fecha_inicio'),
+                    fecha_fin=serializer.validated_data.get('fecha_fin'),
+                    formato=serializer.validated_data['formato'],
+                )
+                if not trabajo:
+                    return Response(
+                        {"error": "No tiene permiso para generar este tipo de reporte."},
+                        status=status.HTTP_403_FORBIDDEN
+                    )
+                data = TrabajoReporteSerializer(trabajo, context={'request': request}).data
+                data['estado_url'] = request.build_absolute_uri(
+                    reverse('api:trabajos-reporte-detail', kwargs={'pk': trabajo.pk})
+                )
+                return Response(data, status=status.HTTP_202_ACCEPTED)
+
             # Generar el reporte
             reporte = ReporteService.generar_reporte(
                 usuario=request.user,
@@ -102,6 +160,7 @@ class ReporteGeneradoViewSet(viewsets.ModelViewSet):
                 componente_id=serializer.validated_data.get('componente_id'),
                 fecha_inicio=serializer.validated_data.get('fecha_inicio'),
                 fecha_fin=serializer.validated_data.get('fecha_fin'),
+                formato=serializer.validated_data['formato'],
             )
 
             if reporte:
@@ -118,11 +177,62 @@ class ReporteGeneradoViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @swagger_auto_schema(tags=['Reportes'])
+    @action(detail=False, methods=['post'], permission_classes=[IsSuperAdmin | IsAdminSMA])
+    def lote(self, request):
+        """
+        Genera el reporte de cada organismo (por defecto, todos los activos).
+        Con generación asíncrona responde 202 con un trabajo en cola por organismo;
+        si no, los genera en una sola pasada e informa los reportes por segundo.
+        """
+        serializer = GenerarReportesLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Encolar un trabajo por organismo; el cliente consulta su estado en trabajos-reporte
+        if settings.REPORTES_GENERACION_ASINCRONA:
+            trabajos = ReporteService.encolar_reportes_organismos(
+                usuario=request.user,
+                tipo_reporte_id=serializer.validated_data['tipo_reporte_id'],
+                organismo_ids=serializer.validated_data.get('organismo_ids'),
+                titulo=serializer.validated_data.get('titulo'),
+                formato=serializer.validated_data['formato'],
+            )
+            if trabajos is None:
+                return Response(
+                    {"error": "No tiene permiso para generar este tipo de reporte."},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            data = TrabajoReporteSerializer(trabajos, many=True, context={'request': request}).data
+            for trabajo in data:
+                trabajo['estado_url'] = request.build_absolute_uri(
+                    reverse('api:trabajos-reporte-detail', kwargs={'pk': trabajo['id']})
+                )
+            return Response({'trabajos': data}, status=status.HTTP_202_ACCEPTED)
+
+        resumen = ReporteService.generar_reportes_organismos(
+            usuario=request.user,
+            tipo_reporte_id=serializer.validated_data['tipo_reporte_id'],
+            organismo_ids=serializer.validated_data.get('organismo_ids'),
+            titulo=serializer.validated_data.get('titulo'),
+            procesos=settings.REPORTES_LOTE_WORKERS,
+            formato=serializer.validated_data['formato'],
+        )
+        if resumen is None:
+            return Response(
+                {"error": "No tiene permiso para generar este tipo de reporte."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        resumen['reportes'] = ReporteGeneradoSerializer(
+            resumen['reportes'], many=True, context={'request': request}
+        ).data
+        return Response(resumen, status=status.HTTP_201_CREATED)
+
     @swagger_auto_schema(tags=['Reportes'])
     @action(detail=True, methods=['get'])
     def descargar(self, request, pk=None):
         """
-        Retorna la URL de descarga del reporte.
+        Descarga el archivo del reporte. Acepta ``Range`` e ``If-None-Match``.
         """
         reporte = self.get_object()
 
@@ -133,7 +243,4 @@ class ReporteGeneradoViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Retornar la URL
-        return Response({
-            "archivo_url": request.build_absolute_uri(reporte.archivo.url)
-        })
\ No newline at end of file
+        return respuesta_descarga(request, reporte)
@@ -0,0 +1,51 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..services import ContinuacionInvalida, SincronizacionService
+
+
+class SincronizacionView(APIView):
+    """
+    API endpoint de sincronización incremental de medidas, organismos,
+    asignaciones y registros de avance.
+    """
+    authentication_classes = [TokenAuthentication, SessionAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        description=(
+            "Retorna las filas modificadas y los ids eliminados desde `changed_since` "
+            "(o desde el `sync_token` de la sincronización anterior). Sin parámetros "
+            "retorna todas las filas vigentes. Si la respuesta trae `siguiente`, quedan "
+            "filas: se piden enviando ese valor como `continuacion`."
+        ),
+        parameters=[
+            OpenApiParameter('changed_since', str, description="Fecha y hora ISO 8601"),
+            OpenApiParameter('sync_token', str, description="Token retornado por la sincronización anterior"),
+            OpenApiParameter('continuacion', str, description="Valor de `siguiente` de la página anterior"),
+        ],
+        tags=['Sincronización'],
+    )
+    def get(self, request):
+        valor = request.query_params.get('sync_token') or request.query_params.get('changed_since')
+        desde = None
+        if valor:
+            desde = parse_datetime(valor.replace(' ', '+'))
+            if desde is None:
+                raise ValidationError({'changed_since': 'Debe ser una fecha y hora ISO 8601.'})
+            if timezone.is_naive(desde):
+                desde = timezone.make_aware(desde)
+
+        try:
+            cambios = SincronizacionService.obtener_cambios(
+                request.user, desde, continuacion=request.query_params.get('continuacion') or None
+            )
+        except ContinuacionInvalida as e:
+            raise ValidationError({'continuacion': str(e)})
+        return Response(cambios)
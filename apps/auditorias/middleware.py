@@ -1,6 +1,23 @@
 import json
 from django.utils import timezone
 from .models import Auditoria
+from .services import BufferAuditoria
+
+
+class BufferAuditoriaMiddleware:
+    """
+    Escribe en lote, al terminar la petición, las auditorías generadas durante la vista.
+
+    Solo agrupa escrituras: el registro de inicio y cierre de sesión sigue en
+    ``AuditoriaMiddleware``, que no está habilitado.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with BufferAuditoria.diferir():
+            return self.get_response(request)
 
 
 class AuditoriaMiddleware:
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auditorias', '0001_initial'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='configuracionauditoria',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='configuracionauditoria',
+            constraint=models.UniqueConstraint(fields=('content_type',), name='configuracion_auditoria_content_type_unico'),
+        ),
+    ]
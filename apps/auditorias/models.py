@@ -107,7 +107,9 @@ class ConfiguracionAuditoria(models.Model):
     class Meta:
         verbose_name = _("Configuración de auditoría")
         verbose_name_plural = _("Configuraciones de auditoría")
-        unique_together = ['content_type']
+        constraints = [
+            models.UniqueConstraint(fields=['content_type'], name='configuracion_auditoria_content_type_unico'),
+        ]
 
     def __str__(self):
         return f"Auditoría para {self.content_type.app_labeled_name}"
@@ -0,0 +1,185 @@
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+
+from .models import Auditoria, CambioDetalle, ConfiguracionAuditoria
+
+# Estado del buffer por hilo: registros pendientes de confirmar y lote de la petición
+_estado = threading.local()
+
+# Modelos críticos que se auditan aunque no tengan configuración
+MODELOS_CRITICOS = ['Medida', 'Organismo', 'Usuario', 'RegistroAvance']
+
+
+class LoteAuditoria:
+    """Registros de auditoría pendientes de escritura, con sus detalles de cambio."""
+
+    def __init__(self):
+        self.registros = []
+
+    def agregar(self, auditoria, detalles):
+        self.registros.append((auditoria, detalles))
+
+
+class RegistroPendiente:
+    """
+    Registro creado dentro de una transacción; es su propio callback de ``on_commit``.
+
+    Django descarta los callbacks de un savepoint (o de una transacción) que se
+    revierte: al perder esa única referencia el registro se libera y desaparece
+    de los pendientes del hilo, que solo guardan referencias débiles. El primer
+    callback que se ejecuta tras confirmar entrega de una vez todos los que
+    siguen vivos; los demás ya no encuentran nada pendiente.
+    """
+    __slots__ = ('auditoria', 'detalles', '__weakref__')
+
+    def __init__(self, auditoria, detalles):
+        self.auditoria = auditoria
+        self.detalles = detalles
+
+    def __call__(self):
+        referencias, _estado.pendientes = getattr(_estado, 'pendientes', []), []
+        registros = []
+        for referencia in referencias:
+            pendiente = referencia()
+            if pendiente is not None:
+                registros.append((pendiente.auditoria, pendiente.detalles))
+
+        peticion = getattr(_estado, 'peticion', None)
+        if peticion is not None:
+            # Dentro de una petición se escriben todos juntos al terminarla
+            peticion.registros.extend(registros)
+        else:
+            BufferAuditoria.escribir(registros)
+
+
+class BufferAuditoria:
+    @staticmethod
+    def agregar(auditoria, detalles=()):
+        """
+        Encola un registro de auditoría (sin guardar) y sus ``CambioDetalle``.
+
+        Dentro de una transacción, los registros se escriben al confirmarla y se
+        descartan si se revierte la transacción o el savepoint en que se crearon.
+        Dentro de una petición (``BufferAuditoriaMiddleware``) se escriben en lote
+        al finalizarla. En otro caso se escriben de inmediato.
+        """
+        detalles = list(detalles)
+
+        if transaction.get_connection().in_atomic_block:
+            pendiente = RegistroPendiente(auditoria, detalles)
+            if getattr(_estado, 'pendientes', None) is None:
+                _estado.pendientes = []
+            _estado.pendientes.append(weakref.ref(pendiente))
+            transaction.on_commit(pendiente)
+            return
+
+        peticion = getattr(_estado, 'peticion', None)
+        if peticion is not None:
+            peticion.agregar(auditoria, detalles)
+        else:
+            BufferAuditoria.escribir([(auditoria, detalles)])
+
+    @staticmethod
+    @contextmanager
+    def diferir():
+        """Agrupa las auditorías generadas dentro del bloque en una sola escritura al salir."""
+        if getattr(_estado, 'peticion', None) is not None:
+            # Bloque anidado: el bloque externo se encarga de escribir
+            yield
+            return
+
+        lote = _estado.peticion = LoteAuditoria()
+        try:
+            yield
+        finally:
+            _estado.peticion = None
+            BufferAuditoria.escribir(lote.registros)
+
+    @staticmethod
+    def escribir(registros):
+        """Inserta en lote las auditorías y luego todos sus detalles."""
+        if not registros:
+            return
+        Auditoria.objects.bulk_create([auditoria for auditoria, _ in registros])
+
+        detalles = []
+        for auditoria, cambios in registros:
+            for detalle in cambios:
+                detalle.auditoria = auditoria
+                detalles.append(detalle)
+        if detalles:
+            CambioDetalle.objects.bulk_create(detalles)
+
+
+class ConfiguracionAuditoriaCache:
+    """
+    Copia en memoria del proceso de ``ConfiguracionAuditoria`` indexada por content type.
+
+    Cada proceso compara su versión con la de la base de datos (fecha de la
+    última modificación y cantidad de configuraciones, como máximo cada
+    ``AUDITORIA_CONFIGURACION_INTERVALO`` segundos) y recarga todas las
+    configuraciones con una sola consulta cuando cambia. No depende de que el
+    backend de caché sea compartido entre procesos.
+    """
+    _configuraciones = None
+    _version = None
+    _verificado = 0.0
+    _lock = threading.Lock()
+
+    @classmethod
+    def obtener(cls, content_type, model_name):
+        """
+        Retorna la configuración activa del content type, o None si el modelo
+        no se audita. Crea la configuración por defecto de los modelos críticos.
+        """
+        configuraciones = cls._vigentes()
+        if content_type.pk in configuraciones:
+            return configuraciones[content_type.pk]
+        if model_name not in MODELOS_CRITICOS:
+            return None
+
+        # La restricción única sobre content_type hace que otro proceso que la crea a la vez la obtenga
+        config, _ = ConfiguracionAuditoria.objects.get_or_create(
+            content_type=content_type,
+            defaults={
+                'auditar_creacion': True,
+                'auditar_modificacion': True,
+                'auditar_eliminacion': True,
+            }
+        )
+        configuraciones[content_type.pk] = config if config.activo else None
+        return configuraciones[content_type.pk]
+
+    @classmethod
+    def invalidar(cls):
+        """Fuerza a este proceso a verificar la versión en la próxima consulta."""
+        cls._verificado = 0.0
+
+    @classmethod
+    def _vigentes(cls):
+        ahora = time.monotonic()
+        intervalo = getattr(settings, 'AUDITORIA_CONFIGURACION_INTERVALO', 5)
+        if cls._configuraciones is not None and ahora - cls._verificado < intervalo:
+            return cls._configuraciones
+
+        with cls._lock:
+            version = ConfiguracionAuditoria.objects.aggregate(
+                modificada=Max('updated_at'), total=Count('id')
+            )
+            version = (version['modificada'], version['total'])
+
+            if cls._configuraciones is None or version != cls._version:
+                # Las inactivas se guardan como None: el modelo no se audita
+                cls._configuraciones = {
+                    config.content_type_id: config if config.activo else None
+                    for config in ConfiguracionAuditoria.objects.all()
+                }
+                cls._version = version
+            cls._verificado = ahora
+            return cls._configuraciones
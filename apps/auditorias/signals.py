@@ -1,37 +1,42 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
+from django.db import models, transaction
 from django.forms.models import model_to_dict
 from django.utils.text import camel_case_to_spaces
 
+from apps.medidas.models import Medida, RegistroAvance
+from apps.medidas.signals import avances_registrados, medidas_importadas
 from .models import Auditoria, CambioDetalle, ConfiguracionAuditoria
+from .services import BufferAuditoria, ConfiguracionAuditoriaCache
+
+
+def _origen(request):
+    """IP y navegador de la petición, si hay una disponible."""
+    if not request:
+        return None, 'desconocido'
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        ip = x_forwarded_for.split(',')[0]
+    else:
+        ip = request.META.get('REMOTE_ADDR')
+    return ip, request.META.get('HTTP_USER_AGENT', '')
 
 
 def registrar_auditoria(instance, action, user=None, request=None):
     """
     Función central para registrar auditorías.
+
+    El registro no se guarda aquí: se entrega a ``BufferAuditoria`` que lo
+    escribe en lote al confirmar la transacción o al terminar la petición.
     """
     # Obtener el tipo de contenido del modelo
     content_type = ContentType.objects.get_for_model(instance)
 
-    # Verificar si este modelo debe ser auditado
-    try:
-        config = ConfiguracionAuditoria.objects.get(content_type=content_type, activo=True)
-    except ConfiguracionAuditoria.DoesNotExist:
-        # Si no hay configuración, verificar si deberíamos crear una por defecto
-        model_name = instance.__class__.__name__
-        if model_name in ['Medida', 'Organismo', 'Usuario', 'RegistroAvance']:
-            # Modelos críticos se auditan por defecto
-            config = ConfiguracionAuditoria.objects.create(
-                content_type=content_type,
-                auditar_creacion=True,
-                auditar_modificacion=True,
-                auditar_eliminacion=True
-            )
-        else:
-            # No auditar este modelo
-            return None
+    # Verificar si este modelo debe ser auditado (los modelos críticos se auditan por defecto)
+    config = ConfiguracionAuditoriaCache.obtener(content_type, instance.__class__.__name__)
+    if config is None:
+        return None
 
     # Verificar si esta acción debe ser auditada
     if action == 'creacion' and not config.auditar_creacion:
@@ -63,19 +68,10 @@ def registrar_auditoria(instance, action, user=None, request=None):
         datos_adicionales['url'] = instance.get_absolute_url()
 
     # Obtener IP y navegador si hay request disponible
-    ip = None
-    navegador = request.META.get('HTTP_USER_AGENT', 'desconocido') if request else 'desconocido'
-
-    if request:
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        navegador = request.META.get('HTTP_USER_AGENT', '')
+    ip, navegador = _origen(request)
 
     # Crear registro de auditoría
-    auditoria = Auditoria.objects.create(
+    auditoria = Auditoria(
         usuario=user,
         accion=action,
         descripcion=descripcion,
@@ -85,6 +81,7 @@ def registrar_auditoria(instance, action, user=None, request=None):
         navegador=navegador,
         datos_adicionales=datos_adicionales
     )
+    detalles = []
 
     # Si es una modificación, registrar los cambios en campos
     if action == 'modificacion' and hasattr(instance, '_original_state'):
@@ -107,12 +104,13 @@ def registrar_auditoria(instance, action, user=None, request=None):
 
             # Solo registrar si hubo cambio
             if valor_anterior != valor_nuevo:
-                CambioDetalle.objects.create(
-                    auditoria=auditoria,
+                detalles.append(CambioDetalle(
                     campo=campo,
                     valor_anterior=str(valor_anterior) if valor_anterior is not None else None,
                     valor_nuevo=str(valor_nuevo) if valor_nuevo is not None else None
-                )
+                ))
+
+    BufferAuditoria.agregar(auditoria, detalles)
 
     return auditoria
 
@@ -128,10 +126,6 @@ def auditoria_post_save(sender, instance, created, **kwargs):
     if sender.__module__.startswith('django.'):
         return
 
-    # Capturar el estado original si es una modificación (para la próxima vez)
-    if not created:
-        instance._original_state = model_to_dict(instance)
-
     # Registrar la auditoría
     user = None
     if hasattr(instance, '_audit_user'):
@@ -144,6 +138,9 @@ def auditoria_post_save(sender, instance, created, **kwargs):
     action = 'creacion' if created else 'modificacion'
     registrar_auditoria(instance, action, user, request)
 
+    # Capturar el estado actual para comparar en la próxima modificación
+    instance._original_state = model_to_dict(instance)
+
 
 @receiver(post_delete)
 def auditoria_post_delete(sender, instance, **kwargs):
@@ -165,4 +162,54 @@ def auditoria_post_delete(sender, instance, **kwargs):
     if hasattr(instance, '_audit_request'):
         request = instance._audit_request
 
-    registrar_auditoria(instance, 'eliminacion', user, request)
\ No newline at end of file
+    registrar_auditoria(instance, 'eliminacion', user, request)
+
+
+@receiver(avances_registrados, sender=RegistroAvance)
+def auditar_avances_en_lote(sender, registros, usuario=None, request=None, **kwargs):
+    """Un solo registro de auditoría por lote de avances, con los ids creados."""
+    content_type = ContentType.objects.get_for_model(RegistroAvance)
+    config = ConfiguracionAuditoriaCache.obtener(content_type, RegistroAvance.__name__)
+    if config is None or not config.auditar_creacion or not registros:
+        return
+
+    ip, navegador = _origen(request)
+    BufferAuditoria.agregar(Auditoria(
+        usuario=usuario,
+        accion='creacion',
+        descripcion=f"Creación en lote de {len(registros)} registros de avance",
+        content_type=content_type,
+        ip=ip,
+        navegador=navegador,
+        datos_adicionales={
+            'registros': [registro.pk for registro in registros],
+            'medidas': sorted({registro.medida_id for registro in registros}),
+        }
+    ))
+
+
+@receiver(medidas_importadas, sender=Medida)
+def auditar_importacion_medidas(sender, resumen, usuario=None, request=None, **kwargs):
+    """Un solo registro de auditoría por importación, en lugar de uno por fila."""
+    ip, navegador = _origen(request)
+    BufferAuditoria.agregar(Auditoria(
+        usuario=usuario,
+        accion='importacion',
+        descripcion=(
+            f"Importación de medidas: {resumen['medidas_creadas']} creadas, "
+            f"{resumen['medidas_actualizadas']} actualizadas, {resumen['filas_con_error']} filas con error"
+        ),
+        content_type=ContentType.objects.get_for_model(Medida),
+        ip=ip,
+        navegador=navegador,
+        datos_adicionales={clave: valor for clave, valor in resumen.items() if clave != 'errores'},
+    ))
+
+
+@receiver([post_save, post_delete], sender=ConfiguracionAuditoria)
+def invalidar_configuracion_auditoria(sender, instance, **kwargs):
+    """
+    Al confirmar el cambio este proceso recarga la configuración en la próxima
+    consulta; los demás lo detectan en ``AUDITORIA_CONFIGURACION_INTERVALO`` segundos.
+    """
+    transaction.on_commit(ConfiguracionAuditoriaCache.invalidar)
@@ -19,7 +19,7 @@ class AsignacionMedidaInline(admin.TabularInline):
 class MedidaAdmin(admin.ModelAdmin):
     list_display = ('codigo', 'nombre', 'componente', 'estado', 'prioridad',
                     'fecha_inicio', 'fecha_termino', 'porcentaje_avance')
-    list_filter = ('componente', 'estado', 'prioridad')
+    list_filter = ('componente', 'estado', 'prioridad', 'retrasada')
     search_fields = ('codigo', 'nombre', 'descripcion')
     inlines = [AsignacionMedidaInline]
     date_hierarchy = 'fecha_inicio'
@@ -0,0 +1,311 @@
+import codecs
+import csv
+import os
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.organismos.models import Organismo
+from .models import Componente, Medida, AsignacionMedida
+from .signals import medidas_importadas
+
+# Columnas reconocidas; ``organismos`` lleva RUT o nombres separados por "|"
+COLUMNAS = [
+    'codigo', 'nombre', 'descripcion', 'componente', 'fecha_inicio', 'fecha_termino',
+    'estado', 'prioridad', 'porcentaje_avance', 'organismos', 'coordinador',
+]
+COLUMNAS_OBLIGATORIAS = ['codigo', 'nombre', 'componente', 'fecha_inicio', 'fecha_termino']
+CAMPOS_MEDIDA = [
+    'nombre', 'descripcion', 'componente_id', 'fecha_inicio', 'fecha_termino',
+    'estado', 'prioridad', 'porcentaje_avance',
+]
+FORMATOS_FECHA = ['%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y']
+MAX_ERRORES_REPORTADOS = 1000
+
+
+class ArchivoInvalido(ValueError):
+    pass
+
+
+def leer_filas(archivo, nombre):
+    """
+    Itera las filas de un CSV o XLSX como dicts, sin cargar el archivo completo.
+
+    Args:
+        archivo: archivo binario abierto (o ``UploadedFile``)
+        nombre: nombre del archivo, para decidir el formato por su extensión
+
+    Raises:
+        ArchivoInvalido: si el formato no es soportado; también al iterar, si el
+            archivo no se puede leer
+    """
+    extension = os.path.splitext(nombre)[1].lower()
+    if extension == '.csv':
+        filas = _filas_csv(archivo)
+    elif extension == '.xlsx':
+        filas = _filas_xlsx(archivo)
+    else:
+        raise ArchivoInvalido(f"Formato no soportado: {extension or nombre}. Use CSV o XLSX.")
+    return _controlar_lectura(filas)
+
+
+def _controlar_lectura(filas):
+    try:
+        yield from filas
+    except (UnicodeDecodeError, csv.Error, zipfile.BadZipFile) as error:
+        raise ArchivoInvalido(f"No se pudo leer el archivo: {error}") from error
+
+
+def _filas_csv(archivo):
+    texto = codecs.getreader('utf-8-sig')(archivo)
+    muestra = texto.read(4096)
+    try:
+        dialecto = csv.Sniffer().sniff(muestra, delimiters=',;')
+    except csv.Error:
+        dialecto = csv.excel
+    # Se reinicia la lectura después de detectar el separador
+    archivo.seek(0)
+    texto = codecs.getreader('utf-8-sig')(archivo)
+    for fila in csv.DictReader(texto, dialect=dialecto):
+        yield {_normalizar(clave): valor for clave, valor in fila.items() if clave}
+
+
+def _filas_xlsx(archivo):
+    from openpyxl import load_workbook
+
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezados = [_normalizar(valor) if valor else None for valor in next(filas, ())]
+        for valores in filas:
+            if not any(valor not in (None, '') for valor in valores):
+                continue
+            yield {clave: valor for clave, valor in zip(encabezados, valores) if clave}
+    finally:
+        libro.close()
+
+
+def _normalizar(encabezado):
+    return str(encabezado).strip().lower().replace(' ', '_')
+
+
+def _texto(valor):
+    return '' if valor is None else str(valor).strip()
+
+
+def _fecha(valor):
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(_texto(valor), formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f"fecha inválida '{_texto(valor)}'")
+
+
+class ImportadorMedidas:
+    """
+    Importa medidas y sus asignaciones desde un CSV o XLSX, fila a fila.
+
+    Componentes (por código) y organismos (por RUT o nombre) se resuelven con
+    mapas en memoria cargados una vez. Las filas válidas se acumulan y se
+    guardan por lotes: ``bulk_create``/``bulk_update`` de ``Medida`` según su
+    código y de ``AsignacionMedida`` según el par medida-organismo. Como las
+    operaciones en lote no emiten ``post_save``, al final se envía una sola vez
+    ``medidas_importadas`` con el resumen (auditoría, notificaciones a los
+    organismos con nuevas asignaciones y estadísticas).
+    """
+
+    def __init__(self, usuario=None, lote=None, request=None):
+        self.usuario = usuario
+        self.request = request
+        self.lote = lote or getattr(settings, 'IMPORTACION_MEDIDAS_LOTE', 500)
+        # Componente.codigo no es único: un código compartido no identifica un componente
+        self.componentes, self.componentes_ambiguos = {}, set()
+        for pk, codigo in Componente.objects.exclude(codigo='').values_list('id', 'codigo'):
+            if codigo.upper() in self.componentes:
+                self.componentes_ambiguos.add(codigo.upper())
+            self.componentes[codigo.upper()] = pk
+        self.organismos = {}
+        for pk, rut, nombre in Organismo.objects.values_list('id', 'rut', 'nombre'):
+            self.organismos[nombre.strip().lower()] = pk
+            if rut:
+                self.organismos[self._rut(rut)] = pk
+        self.estados = {clave for clave, _ in Medida.ESTADO_CHOICES}
+        self.prioridades = {clave for clave, _ in Medida.PRIORIDAD_CHOICES}
+        self.resumen = {
+            'filas': 0, 'medidas_creadas': 0, 'medidas_actualizadas': 0,
+            'asignaciones_creadas': 0, 'asignaciones_actualizadas': 0,
+            'filas_con_error': 0, 'errores': [],
+        }
+        self.organismos_afectados = set()
+        # Códigos de las medidas asignadas por primera vez a cada organismo
+        self.asignaciones_nuevas = {}
+
+    @staticmethod
+    def _rut(valor):
+        return _texto(valor).replace('.', '').replace('-', '').upper()
+
+    def importar(self, filas):
+        """
+        Procesa todas las filas y retorna el resumen con los errores por fila.
+
+        Las filas con errores no se importan; el resto sí.
+        """
+        pendientes = {}
+        for numero, fila in enumerate(filas, start=2):
+            self.resumen['filas'] += 1
+            datos, errores = self.validar(fila)
+            if not errores and datos['codigo'] in pendientes:
+                errores = [f"código {datos['codigo']} repetido en el archivo"]
+            if errores:
+                self._error(numero, fila, errores)
+                continue
+
+            pendientes[datos['codigo']] = datos
+            if len(pendientes) >= self.lote:
+                self._guardar(list(pendientes.values()))
+                # Los códigos ya guardados pueden repetirse en lotes siguientes: se actualizan
+                pendientes = {}
+
+        if pendientes:
+            self._guardar(list(pendientes.values()))
+
+        medidas_importadas.send(
+            sender=Medida, resumen=self.resumen, usuario=self.usuario, request=self.request,
+            organismo_ids=sorted(self.organismos_afectados), asignaciones_nuevas=self.asignaciones_nuevas,
+        )
+        return self.resumen
+
+    def validar(self, fila):
+        """Convierte una fila en los datos de la medida; retorna ``(datos, errores)``."""
+        errores = []
+        for columna in COLUMNAS_OBLIGATORIAS:
+            if not _texto(fila.get(columna)):
+                errores.append(f"falta {columna}")
+        if errores:
+            return None, errores
+
+        datos = {
+            'codigo': _texto(fila['codigo']),
+            'nombre': _texto(fila['nombre']),
+            'descripcion': _texto(fila.get('descripcion')),
+            'estado': _texto(fila.get('estado')).lower() or 'pendiente',
+            'prioridad': _texto(fila.get('prioridad')).lower() or 'media',
+        }
+        for campo in ('codigo', 'nombre'):
+            largo = Medida._meta.get_field(campo).max_length
+            if len(datos[campo]) > largo:
+                errores.append(f"{campo} supera los {largo} caracteres")
+        componente = _texto(fila['componente'])
+        datos['componente_id'] = self.componentes.get(componente.upper())
+        if datos['componente_id'] is None:
+            errores.append(f"componente '{componente}' no existe")
+        elif componente.upper() in self.componentes_ambiguos:
+            errores.append(f"componente '{componente}' es ambiguo: hay varios componentes con ese código")
+        for campo in ('fecha_inicio', 'fecha_termino'):
+            try:
+                datos[campo] = _fecha(fila[campo])
+            except ValueError as error:
+                errores.append(f"{campo}: {error}")
+        if datos['estado'] not in self.estados:
+            errores.append(f"estado '{datos['estado']}' no válido")
+        if datos['prioridad'] not in self.prioridades:
+            errores.append(f"prioridad '{datos['prioridad']}' no válida")
+        try:
+            datos['porcentaje_avance'] = Decimal(_texto(fila.get('porcentaje_avance')).replace(',', '.') or 0)
+            if not 0 <= datos['porcentaje_avance'] <= 100:
+                errores.append("porcentaje_avance debe estar entre 0 y 100")
+        except InvalidOperation:
+            errores.append(f"porcentaje_avance '{_texto(fila.get('porcentaje_avance'))}' no es un número")
+
+        datos['organismos'] = []
+        for referencia in filter(None, (_texto(v) for v in _texto(fila.get('organismos')).split('|'))):
+            organismo_id = self._organismo(referencia)
+            if organismo_id is None:
+                errores.append(f"organismo '{referencia}' no existe")
+            else:
+                datos['organismos'].append(organismo_id)
+        # El mismo organismo por RUT y por nombre, o repetido: una sola asignación
+        datos['organismos'] = list(dict.fromkeys(datos['organismos']))
+        coordinador = _texto(fila.get('coordinador'))
+        datos['coordinador'] = self._organismo(coordinador) if coordinador else None
+        if coordinador and datos['coordinador'] not in datos['organismos']:
+            errores.append(f"coordinador '{coordinador}' no está entre los organismos")
+
+        return datos, errores
+
+    def _organismo(self, referencia):
+        return self.organismos.get(self._rut(referencia)) or self.organismos.get(referencia.lower())
+
+    def _error(self, numero, fila, errores):
+        self.resumen['filas_con_error'] += 1
+        if len(self.resumen['errores']) < MAX_ERRORES_REPORTADOS:
+            self.resumen['errores'].append({
+                'fila': numero, 'codigo': _texto(fila.get('codigo')), 'errores': errores,
+            })
+
+    @transaction.atomic
+    def _guardar(self, filas):
+        existentes = Medida.objects.in_bulk([datos['codigo'] for datos in filas], field_name='codigo')
+        ahora = timezone.now()
+        hoy = ahora.date()
+        nuevas, actualizadas = [], []
+        for datos in filas:
+            medida = existentes.get(datos['codigo'])
+            if medida is None:
+                medida = Medida(codigo=datos['codigo'])
+                nuevas.append(medida)
+            else:
+                # bulk_update no aplica auto_now; la sincronización depende de updated_at
+                medida.updated_at = ahora
+                actualizadas.append(medida)
+            for campo in CAMPOS_MEDIDA:
+                setattr(medida, campo, datos[campo])
+            # Las operaciones en lote no pasan por pre_save
+            medida.calcular_retraso(hoy)
+            datos['medida'] = medida
+
+        Medida.objects.bulk_create(nuevas)
+        Medida.objects.bulk_update(actualizadas, CAMPOS_MEDIDA + ['retrasada', 'dias_retraso', 'updated_at'])
+        self.resumen['medidas_creadas'] += len(nuevas)
+        self.resumen['medidas_actualizadas'] += len(actualizadas)
+
+        self._guardar_asignaciones(filas, ahora)
+
+    def _guardar_asignaciones(self, filas, ahora):
+        existentes = {
+            (asignacion.medida_id, asignacion.organismo_id): asignacion
+            for asignacion in AsignacionMedida.objects.filter(
+                medida_id__in=[datos['medida'].pk for datos in filas]
+            )
+        }
+        # Los organismos ya asignados a las medidas del lote también cambian sus estadísticas
+        self.organismos_afectados.update(organismo_id for _, organismo_id in existentes)
+        nuevas, actualizadas = [], []
+        for datos in filas:
+            for organismo_id in datos['organismos']:
+                es_coordinador = organismo_id == datos['coordinador']
+                asignacion = existentes.get((datos['medida'].pk, organismo_id))
+                if asignacion is None:
+                    nuevas.append(AsignacionMedida(
+                        medida=datos['medida'], organismo_id=organismo_id, es_coordinador=es_coordinador
+                    ))
+                    self.asignaciones_nuevas.setdefault(organismo_id, []).append(datos['codigo'])
+                elif asignacion.es_coordinador != es_coordinador:
+                    asignacion.es_coordinador = es_coordinador
+                    asignacion.updated_at = ahora
+                    actualizadas.append(asignacion)
+                self.organismos_afectados.add(organismo_id)
+
+        AsignacionMedida.objects.bulk_create(nuevas)
+        AsignacionMedida.objects.bulk_update(actualizadas, ['es_coordinador', 'updated_at'])
+        self.resumen['asignaciones_creadas'] += len(nuevas)
+        self.resumen['asignaciones_actualizadas'] += len(actualizadas)
@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.medidas.importacion import ImportadorMedidas, ArchivoInvalido, leer_filas
+
+
+class Command(BaseCommand):
+    help = 'Importa medidas y sus asignaciones a organismos desde un archivo CSV o XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del archivo CSV o XLSX')
+        parser.add_argument('--lote', type=int, default=None, help='Filas guardadas por transacción')
+        parser.add_argument('--usuario', help='Nombre de usuario al que se atribuye la importación')
+
+    def handle(self, *args, **options):
+        usuario = None
+        if options['usuario']:
+            usuario = get_user_model().objects.filter(username=options['usuario']).first()
+            if usuario is None:
+                raise CommandError(f"No existe el usuario {options['usuario']}")
+
+        self.stdout.write(self.style.SUCCESS(f"Importando medidas desde {options['archivo']}..."))
+        try:
+            with open(options['archivo'], 'rb') as archivo:
+                resumen = ImportadorMedidas(usuario=usuario, lote=options['lote']).importar(
+                    leer_filas(archivo, options['archivo'])
+                )
+        except (OSError, ArchivoInvalido) as error:
+            raise CommandError(str(error))
+
+        for error in resumen['errores']:
+            self.stdout.write(self.style.WARNING(
+                f"Fila {error['fila']} ({error['codigo'] or 'sin código'}): {'; '.join(error['errores'])}"
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f"Filas: {resumen['filas']}, medidas creadas: {resumen['medidas_creadas']}, "
+            f"actualizadas: {resumen['medidas_actualizadas']}, asignaciones creadas: "
+            f"{resumen['asignaciones_creadas']}, actualizadas: {resumen['asignaciones_actualizadas']}, "
+            f"filas con error: {resumen['filas_con_error']}"
+        ))
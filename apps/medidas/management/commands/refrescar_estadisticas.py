@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from apps.medidas.services import EstadisticaService
+
+
+class Command(BaseCommand):
+    help = ('Actualiza el retraso precalculado de las medidas y recalcula el snapshot '
+            'de estadísticas del plan usado por los dashboards')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('Recalculando estadísticas del plan...'))
+
+        retrasos = EstadisticaService.refrescar_todo()
+
+        self.stdout.write(
+            f"Medidas retrasadas actualizadas: {retrasos['retrasadas']}, al día: {retrasos['al_dia']}"
+        )
+        self.stdout.write(self.style.SUCCESS('Estadísticas actualizadas.'))
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medidas', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticaPlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ambito', models.CharField(choices=[('global', 'Global'), ('componente', 'Componente'), ('organismo', 'Organismo'), ('estado', 'Estado')], max_length=20, verbose_name='Ámbito')),
+                ('clave', models.CharField(blank=True, help_text='ID del componente/organismo o código del estado', max_length=50, verbose_name='Clave')),
+                ('nombre', models.CharField(blank=True, max_length=255, verbose_name='Nombre')),
+                ('total_medidas', models.PositiveIntegerField(default=0, verbose_name='Total de medidas')),
+                ('medidas_completadas', models.PositiveIntegerField(default=0, verbose_name='Medidas completadas')),
+                ('medidas_en_proceso', models.PositiveIntegerField(default=0, verbose_name='Medidas en proceso')),
+                ('medidas_retrasadas', models.PositiveIntegerField(default=0, verbose_name='Medidas retrasadas')),
+                ('avance_promedio', models.DecimalField(decimal_places=2, default=0, max_digits=5, verbose_name='Avance promedio')),
+                ('datos', models.JSONField(blank=True, default=dict, verbose_name='Datos adicionales')),
+                ('fecha_referencia', models.DateField(help_text='Día usado para calcular las medidas retrasadas', verbose_name='Fecha de referencia')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+            ],
+            options={
+                'verbose_name': 'Estadística del Plan',
+                'verbose_name_plural': 'Estadísticas del Plan',
+                'ordering': ['ambito', 'nombre'],
+                'unique_together': {('ambito', 'clave')},
+            },
+        ),
+    ]
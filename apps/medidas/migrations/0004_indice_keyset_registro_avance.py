@@ -0,0 +1,20 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medidas', '0003_estadisticaplan'),
+        ('organismos', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registroavance',
+            index=models.Index(fields=['-fecha_registro', '-id'], name='registro_avance_keyset_idx'),
+        ),
+    ]
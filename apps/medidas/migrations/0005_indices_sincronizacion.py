@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medidas', '0004_indice_keyset_registro_avance'),
+        ('organismos', '0002_indices_sincronizacion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asignacionmedida',
+            index=models.Index(fields=['updated_at'], name='asignacion_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medida',
+            index=models.Index(fields=['updated_at'], name='medida_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registroavance',
+            index=models.Index(fields=['updated_at'], name='registro_avance_updated_idx'),
+        ),
+    ]
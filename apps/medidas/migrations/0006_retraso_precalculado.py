@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:13
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def calcular_retrasos(apps, schema_editor):
+    Medida = apps.get_model('medidas', 'Medida')
+    hoy = timezone.now().date()
+    retrasadas = Medida.objects.filter(estado__in=['pendiente', 'en_proceso', 'retrasada'], fecha_termino__lt=hoy)
+    for fecha in retrasadas.order_by().values_list('fecha_termino', flat=True).distinct():
+        retrasadas.filter(fecha_termino=fecha).update(retrasada=True, dias_retraso=(hoy - fecha).days)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medidas', '0005_indices_sincronizacion'),
+        ('organismos', '0002_indices_sincronizacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='medida',
+            name='dias_retraso',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Días de retraso'),
+        ),
+        migrations.AddField(
+            model_name='medida',
+            name='retrasada',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Retrasada'),
+        ),
+        migrations.AddIndex(
+            model_name='medida',
+            index=models.Index(fields=['retrasada', '-dias_retraso'], name='medida_retraso_idx'),
+        ),
+        migrations.RunPython(calcular_retrasos, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 # apps/medidas/models.py
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from apps.organismos.models import Organismo
 
@@ -28,6 +29,10 @@ class Componente(models.Model):
         return self.nombre
 
 
+# Estados que, con la fecha de término vencida, cuentan como medida retrasada
+ESTADOS_RETRASO = ['pendiente', 'en_proceso', 'retrasada']
+
+
 class Medida(models.Model):
     """
     Representa una medida específica dentro del plan de descontaminación.
@@ -60,6 +65,9 @@ class Medida(models.Model):
     estado = models.CharField(_("Estado"), max_length=20, choices=ESTADO_CHOICES, default='pendiente')
     prioridad = models.CharField(_("Prioridad"), max_length=10, choices=PRIORIDAD_CHOICES, default='media')
     porcentaje_avance = models.DecimalField(_("Porcentaje de avance"), max_digits=5, decimal_places=2, default=0)
+    # Precalculados (ver ``calcular_retraso``); el comando refrescar_estadisticas los actualiza cada día
+    retrasada = models.BooleanField(_("Retrasada"), default=False, editable=False)
+    dias_retraso = models.PositiveIntegerField(_("Días de retraso"), default=0, editable=False)
     responsables = models.ManyToManyField(
         Organismo,
         through='AsignacionMedida',
@@ -74,10 +82,38 @@ class Medida(models.Model):
         verbose_name = _("Medida")
         verbose_name_plural = _("Medidas")
         ordering = ['codigo']
+        indexes = [
+            # Sincronización incremental por fecha de modificación
+            models.Index(fields=['updated_at'], name='medida_updated_at_idx'),
+            # Listados y filtros de medidas retrasadas, de la más atrasada a la menos
+            models.Index(fields=['retrasada', '-dias_retraso'], name='medida_retraso_idx'),
+        ]
 
     def __str__(self):
         return f"{self.codigo} - {self.nombre}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Componente y estado leídos: al cambiar, el snapshot refresca también los anteriores
+        instancia._originales = {
+            campo: valor for campo, valor in zip(field_names, values) if campo in ('componente_id', 'estado')
+        }
+        return instancia
+
+    @staticmethod
+    def condicion_retraso(hoy):
+        """Definición única de medida retrasada, como filtro para consultas."""
+        return models.Q(estado__in=ESTADOS_RETRASO, fecha_termino__lt=hoy)
+
+    def calcular_retraso(self, hoy=None):
+        """Actualiza ``retrasada`` y ``dias_retraso`` según la fecha indicada (hoy por defecto)."""
+        hoy = hoy or timezone.now().date()
+        # Admite la fecha como texto, igual que save()
+        fecha_termino = self._meta.get_field('fecha_termino').to_python(self.fecha_termino)
+        self.retrasada = self.estado in ESTADOS_RETRASO and fecha_termino < hoy
+        self.dias_retraso = (hoy - fecha_termino).days if self.retrasada else 0
+
 
 class AsignacionMedida(models.Model):
     """
@@ -109,6 +145,9 @@ class AsignacionMedida(models.Model):
         verbose_name = _("Asignación de Medida")
         verbose_name_plural = _("Asignaciones de Medidas")
         unique_together = ['medida', 'organismo']
+        indexes = [
+            models.Index(fields=['updated_at'], name='asignacion_updated_at_idx'),
+        ]
 
     def __str__(self):
         return f"{self.medida.codigo} - {self.organismo.nombre}"
@@ -144,6 +183,11 @@ class RegistroAvance(models.Model):
         verbose_name = _("Registro de Avance")
         verbose_name_plural = _("Registros de Avance")
         ordering = ['-fecha_registro']
+        indexes = [
+            # Paginación por clave del API
+            models.Index(fields=['-fecha_registro', '-id'], name='registro_avance_keyset_idx'),
+            models.Index(fields=['updated_at'], name='registro_avance_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.medida.codigo} - {self.fecha_registro} - {self.porcentaje_avance}%"
@@ -176,4 +220,57 @@ class LogMedida(models.Model):
         ordering = ['-fecha']
 
     def __str__(self):
-        return f"{self.medida.codigo} - {self.accion} - {self.fecha}"
\ No newline at end of file
+        return f"{self.medida.codigo} - {self.accion} - {self.fecha}"
+
+class EstadisticaPlan(models.Model):
+    """
+    Snapshot materializado de las estadísticas del plan (global, por componente,
+    por organismo y por estado). Se refresca de forma incremental cuando cambian
+    medidas, asignaciones o registros de avance, y es la fuente de los dashboards.
+    """
+    AMBITO_CHOICES = [
+        ('global', _('Global')),
+        ('componente', _('Componente')),
+        ('organismo', _('Organismo')),
+        ('estado', _('Estado')),
+    ]
+
+    ambito = models.CharField(_("Ámbito"), max_length=20, choices=AMBITO_CHOICES)
+    clave = models.CharField(_("Clave"), max_length=50, blank=True,
+                             help_text=_("ID del componente/organismo o código del estado"))
+    nombre = models.CharField(_("Nombre"), max_length=255, blank=True)
+
+    total_medidas = models.PositiveIntegerField(_("Total de medidas"), default=0)
+    medidas_completadas = models.PositiveIntegerField(_("Medidas completadas"), default=0)
+    medidas_en_proceso = models.PositiveIntegerField(_("Medidas en proceso"), default=0)
+    medidas_retrasadas = models.PositiveIntegerField(_("Medidas retrasadas"), default=0)
+    avance_promedio = models.DecimalField(_("Avance promedio"), max_digits=5, decimal_places=2, default=0)
+
+    # Datos descriptivos del ámbito (código, color, activo, totales auxiliares)
+    datos = models.JSONField(_("Datos adicionales"), default=dict, blank=True)
+    fecha_referencia = models.DateField(_("Fecha de referencia"),
+                                        help_text=_("Día usado para calcular las medidas retrasadas"))
+
+    updated_at = models.DateTimeField(_("Fecha de actualización"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Estadística del Plan")
+        verbose_name_plural = _("Estadísticas del Plan")
+        unique_together = ['ambito', 'clave']
+        ordering = ['ambito', 'nombre']
+
+    def __str__(self):
+        return f"{self.get_ambito_display()} {self.nombre or self.clave}".strip()
+
+    def como_dict(self):
+        """Representación plana usada por las vistas y plantillas."""
+        return {
+            'id': int(self.clave) if self.clave.isdigit() else self.clave,
+            'nombre': self.nombre,
+            'total_medidas': self.total_medidas,
+            'medidas_completadas': self.medidas_completadas,
+            'medidas_en_proceso': self.medidas_en_proceso,
+            'medidas_retrasadas': self.medidas_retrasadas,
+            'avance_promedio': self.avance_promedio,
+            **self.datos,
+        }
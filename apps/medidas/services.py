@@ -0,0 +1,370 @@
+import threading
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Avg, Case, Count, PositiveIntegerField, Q, Value, When
+from django.utils import timezone
+
+from apps.organismos.models import Organismo
+from .models import Componente, Medida, AsignacionMedida, EstadisticaPlan, RegistroAvance
+
+# Fechas de término distintas por cada UPDATE del cálculo de retrasos
+RETRASO_LOTE_FECHAS = 500
+
+# Ámbitos con refresco pendiente para la transacción en curso (por hilo)
+_pendientes = threading.local()
+
+
+def _metricas(prefijo=''):
+    """Agregados comunes a todos los ámbitos del snapshot."""
+    return {
+        'total_medidas': Count(f'{prefijo}id'),
+        'medidas_completadas': Count(f'{prefijo}id', filter=Q(**{f'{prefijo}estado': 'completada'})),
+        'medidas_en_proceso': Count(f'{prefijo}id', filter=Q(**{f'{prefijo}estado': 'en_proceso'})),
+        'medidas_retrasadas': Count(f'{prefijo}id', filter=Q(**{f'{prefijo}retrasada': True})),
+        'avance_promedio': Avg(f'{prefijo}porcentaje_avance'),
+    }
+
+
+def _valores(agregado):
+    """Normaliza el resultado de un agregado para guardarlo en el snapshot."""
+    agregado = agregado or {}
+    avance = agregado.get('avance_promedio') or 0
+    return {
+        'total_medidas': agregado.get('total_medidas') or 0,
+        'medidas_completadas': agregado.get('medidas_completadas') or 0,
+        'medidas_en_proceso': agregado.get('medidas_en_proceso') or 0,
+        'medidas_retrasadas': agregado.get('medidas_retrasadas') or 0,
+        'avance_promedio': Decimal(avance).quantize(Decimal('0.01')),
+    }
+
+
+class EstadisticaService:
+    # Campos que se reescriben al refrescar una fila del snapshot
+    CAMPOS_SNAPSHOT = [
+        'nombre', 'datos', 'fecha_referencia', 'updated_at', 'total_medidas',
+        'medidas_completadas', 'medidas_en_proceso', 'medidas_retrasadas', 'avance_promedio',
+    ]
+
+    @staticmethod
+    def refrescar_todo():
+        """
+        Recalcula el snapshot completo. Lo ejecuta el refresco nocturno (comando
+        ``refrescar_estadisticas``) para el cambio de día de las medidas
+        retrasadas, por eso antes pone al día el retraso precalculado.
+
+        Returns:
+            dict: Resultado de ``RetrasoService.actualizar``
+        """
+        retrasos = RetrasoService.actualizar()
+        EstadisticaService.refrescar(organismo_ids=None, componente_ids=None, estados=None)
+        return retrasos
+
+    @staticmethod
+    def refrescar(organismo_ids=(), componente_ids=(), estados=()):
+        """
+        Recalcula los ámbitos indicados y el global, que se deriva de las filas de componentes.
+
+        Args:
+            organismo_ids: IDs de organismos a recalcular. ``None`` recalcula todos.
+            componente_ids: IDs de componentes a recalcular. ``None`` recalcula todos.
+            estados: códigos de estado a recalcular. ``None`` recalcula todos.
+        """
+        hoy = timezone.now().date()
+        with transaction.atomic():
+            if componente_ids is None or componente_ids:
+                EstadisticaService._refrescar_componentes(hoy, componente_ids)
+            if estados is None or estados:
+                EstadisticaService._refrescar_estados(hoy, estados)
+            if organismo_ids is None or organismo_ids:
+                EstadisticaService._refrescar_organismos(hoy, organismo_ids)
+            EstadisticaService._refrescar_global(hoy)
+
+    @staticmethod
+    def programar_refresco(organismo_ids=(), componente_ids=(), estados=()):
+        """
+        Agenda un refresco incremental de los ámbitos afectados para cuando se
+        confirme la transacción actual (``None`` en un ámbito lo recalcula entero).
+        Varios cambios dentro de la misma transacción se agrupan en un solo refresco.
+        """
+        pendientes = getattr(_pendientes, 'ambitos', None)
+        if pendientes is None:
+            pendientes = _pendientes.ambitos = {'organismo_ids': set(), 'componente_ids': set(), 'estados': set()}
+        for ambito, valores in (('organismo_ids', organismo_ids), ('componente_ids', componente_ids),
+                                ('estados', estados)):
+            if valores is None:
+                pendientes[ambito] = None
+            elif pendientes[ambito] is not None:
+                pendientes[ambito].update(v for v in valores if v)
+        transaction.on_commit(EstadisticaService._ejecutar_refresco_pendiente)
+
+    @staticmethod
+    def _ejecutar_refresco_pendiente():
+        pendientes = getattr(_pendientes, 'ambitos', None)
+        if pendientes is None:
+            # Otro callback de la misma transacción ya hizo el refresco
+            return
+        _pendientes.ambitos = None
+        EstadisticaService.refrescar(**{
+            ambito: None if valores is None else sorted(valores) for ambito, valores in pendientes.items()
+        })
+
+    @staticmethod
+    def obtener_resumen():
+        """
+        Retorna el snapshot completo con una sola consulta indexada.
+
+        Un snapshot de un día anterior se sirve igual: el cambio de día lo hace
+        el comando nocturno, nunca la solicitud.
+
+        Returns:
+            dict: ``global``, ``componentes``, ``organismos`` y ``estados``
+        """
+        filas = list(EstadisticaPlan.objects.all())
+        if EstadisticaService._sin_snapshot(filas):
+            EstadisticaService._construir_inicial()
+            filas = list(EstadisticaPlan.objects.all())
+
+        resumen = {'global': None, 'componentes': [], 'organismos': [], 'estados': []}
+        listas = {'componente': 'componentes', 'organismo': 'organismos', 'estado': 'estados'}
+        for fila in filas:
+            if fila.ambito == 'global':
+                resumen['global'] = fila.como_dict()
+            else:
+                resumen[listas[fila.ambito]].append(fila.como_dict())
+        return resumen
+
+    @staticmethod
+    def obtener_organismo(organismo_id):
+        """
+        Retorna las estadísticas de un organismo (y el ámbito global para saber si existe el snapshot).
+        """
+        filas = list(EstadisticaPlan.objects.filter(
+            Q(ambito='global', clave='') | Q(ambito='organismo', clave=str(organismo_id))
+        ))
+        if EstadisticaService._sin_snapshot(filas):
+            EstadisticaService._construir_inicial()
+            filas = list(EstadisticaPlan.objects.filter(ambito='organismo', clave=str(organismo_id)))
+
+        for fila in filas:
+            if fila.ambito == 'organismo':
+                return fila.como_dict()
+        return _valores(None)
+
+    @staticmethod
+    def _sin_snapshot(filas):
+        """El snapshot solo se construye en la solicitud si todavía no existe."""
+        return not any(f.ambito == 'global' for f in filas)
+
+    @staticmethod
+    def _construir_inicial():
+        """
+        Primer snapshot (base de datos recién creada). No toca el retraso de las
+        medidas, que ya mantiene ``pre_save``; si dos solicitudes lo construyen a
+        la vez, ``_guardar`` resuelve el conflicto sobre ``(ambito, clave)``.
+        """
+        EstadisticaService.refrescar(organismo_ids=None, componente_ids=None, estados=None)
+
+    @staticmethod
+    def _refrescar_global(hoy):
+        # Suma de las filas de componentes (toda medida tiene componente): no recorre las medidas
+        agregado = {'total_medidas': 0, 'medidas_completadas': 0, 'medidas_en_proceso': 0, 'medidas_retrasadas': 0}
+        suma_avance = Decimal(0)
+        for fila in EstadisticaPlan.objects.filter(ambito='componente').values(*agregado, 'avance_promedio'):
+            for campo in agregado:
+                agregado[campo] += fila[campo]
+            suma_avance += fila['avance_promedio'] * fila['total_medidas']
+        if agregado['total_medidas']:
+            agregado['avance_promedio'] = suma_avance / agregado['total_medidas']
+        datos = {
+            'total_componentes': Componente.objects.filter(activo=True).count(),
+            'total_organismos': Organismo.objects.filter(activo=True).count(),
+        }
+        EstadisticaService._guardar('global', {'': ('', _valores(agregado), datos)}, hoy)
+
+    @staticmethod
+    def _refrescar_componentes(hoy, componente_ids=None):
+        medidas = Medida.objects.all()
+        componentes = Componente.objects.all()
+        if componente_ids is not None:
+            medidas = medidas.filter(componente_id__in=componente_ids)
+            componentes = componentes.filter(id__in=componente_ids)
+
+        agregados = {
+            fila.pop('componente_id'): fila
+            for fila in medidas.values('componente_id').annotate(**_metricas()).order_by()
+        }
+        filas = {}
+        for componente in componentes.values('id', 'nombre', 'codigo', 'color', 'descripcion', 'activo'):
+            datos = {
+                'codigo': componente['codigo'],
+                'color': componente['color'],
+                'descripcion': componente['descripcion'],
+                'activo': componente['activo'],
+            }
+            filas[str(componente['id'])] = (
+                componente['nombre'], _valores(agregados.get(componente['id'])), datos
+            )
+        claves = None if componente_ids is None else [str(i) for i in componente_ids]
+        EstadisticaService._guardar('componente', filas, hoy, completo=componente_ids is None, claves=claves)
+
+    @staticmethod
+    def _refrescar_estados(hoy, estados=None):
+        medidas = Medida.objects.all()
+        if estados is not None:
+            medidas = medidas.filter(estado__in=estados)
+
+        agregados = {
+            fila.pop('estado'): fila
+            for fila in medidas.values('estado').annotate(**_metricas()).order_by()
+        }
+        filas = {
+            codigo: (str(nombre), _valores(agregados.get(codigo)), {'estado': codigo})
+            for codigo, nombre in Medida.ESTADO_CHOICES
+            if estados is None or codigo in estados
+        }
+        EstadisticaService._guardar('estado', filas, hoy, completo=estados is None, claves=list(filas))
+
+    @staticmethod
+    def _refrescar_organismos(hoy, organismo_ids=None):
+        asignaciones = AsignacionMedida.objects.all()
+        organismos = Organismo.objects.all()
+        if organismo_ids is not None:
+            asignaciones = asignaciones.filter(organismo_id__in=organismo_ids)
+            organismos = organismos.filter(id__in=organismo_ids)
+
+        agregados = {
+            fila.pop('organismo_id'): fila
+            for fila in asignaciones.values('organismo_id').annotate(**_metricas('medida__')).order_by()
+        }
+        filas = {
+            str(organismo['id']): (
+                organismo['nombre'], _valores(agregados.get(organismo['id'])), {'activo': organismo['activo']}
+            )
+            for organismo in organismos.values('id', 'nombre', 'activo')
+        }
+        claves = None if organismo_ids is None else [str(i) for i in organismo_ids]
+        EstadisticaService._guardar('organismo', filas, hoy, completo=organismo_ids is None, claves=claves)
+
+    @staticmethod
+    def _guardar(ambito, filas, hoy, completo=False, claves=None):
+        """
+        Inserta o actualiza en lote las filas de un ámbito y elimina las que ya no existen.
+
+        Las filas nuevas se insertan con ``ON CONFLICT DO UPDATE``: si otro
+        proceso insertó la misma ``(ambito, clave)`` entre la lectura y la
+        escritura, se actualiza en vez de fallar por ``unique_together``.
+
+        Args:
+            filas: dict ``clave -> (nombre, valores, datos)``
+            completo: si es True, ``filas`` representa el ámbito entero
+            claves: claves recalculadas (para eliminar las que desaparecieron)
+        """
+        existentes = EstadisticaPlan.objects.filter(ambito=ambito)
+        if not completo:
+            existentes = existentes.filter(clave__in=claves if claves is not None else list(filas))
+        existentes = {e.clave: e for e in existentes}
+
+        ahora = timezone.now()
+        nuevas, actualizadas = [], []
+        for clave, (nombre, valores, datos) in filas.items():
+            fila = existentes.pop(clave, None) or EstadisticaPlan(ambito=ambito, clave=clave)
+            fila.nombre = nombre
+            fila.datos = datos
+            fila.fecha_referencia = hoy
+            fila.updated_at = ahora
+            for campo, valor in valores.items():
+                setattr(fila, campo, valor)
+            (actualizadas if fila.pk else nuevas).append(fila)
+
+        if nuevas:
+            EstadisticaPlan.objects.bulk_create(
+                nuevas, update_conflicts=True, unique_fields=['ambito', 'clave'],
+                update_fields=EstadisticaService.CAMPOS_SNAPSHOT,
+            )
+        if actualizadas:
+            EstadisticaPlan.objects.bulk_update(actualizadas, EstadisticaService.CAMPOS_SNAPSHOT)
+        if existentes:
+            EstadisticaPlan.objects.filter(pk__in=[e.pk for e in existentes.values()]).delete()
+
+
+class RetrasoService:
+    @staticmethod
+    def actualizar(hoy=None):
+        """
+        Pone al día ``retrasada`` y ``dias_retraso`` de todas las medidas.
+
+        Al guardar una medida sus valores se recalculan (señal ``pre_save``); este
+        proceso cubre el cambio de día. Solo escribe las filas cuyo valor cambia,
+        con un UPDATE por grupo de fechas de término, y emite una vez
+        ``retrasos_actualizados`` si hubo cambios.
+
+        Returns:
+            dict: Medidas marcadas como retrasadas (o con días actualizados) y medidas al día
+        """
+        from .signals import retrasos_actualizados
+
+        hoy = hoy or timezone.now().date()
+        ahora = timezone.now()
+        condicion = Medida.condicion_retraso(hoy)
+        resultado = {'retrasadas': 0, 'al_dia': 0}
+        with transaction.atomic():
+            # updated_at explícito: update() no aplica auto_now y la sincronización depende de él
+            resultado['al_dia'] = Medida.objects.filter(retrasada=True).exclude(condicion).update(
+                retrasada=False, dias_retraso=0, updated_at=ahora
+            )
+
+            fechas = sorted(
+                Medida.objects.filter(condicion).order_by().values_list('fecha_termino', flat=True).distinct()
+            )
+            for inicio in range(0, len(fechas), RETRASO_LOTE_FECHAS):
+                grupo = fechas[inicio:inicio + RETRASO_LOTE_FECHAS]
+                dias = Case(
+                    *[When(fecha_termino=fecha, then=Value((hoy - fecha).days)) for fecha in grupo],
+                    output_field=PositiveIntegerField(),
+                )
+                resultado['retrasadas'] += Medida.objects.filter(condicion, fecha_termino__in=grupo).exclude(
+                    retrasada=True, dias_retraso=dias
+                ).update(retrasada=True, dias_retraso=dias, updated_at=ahora)
+
+            if any(resultado.values()):
+                retrasos_actualizados.send(sender=Medida, **resultado)
+        return resultado
+
+
+class AvanceService:
+    @staticmethod
+    def medidas_no_asignadas(organismo_id, medida_ids):
+        """IDs de ``medida_ids`` que no están asignadas al organismo (una sola consulta)."""
+        asignadas = set(
+            AsignacionMedida.objects.filter(
+                organismo_id=organismo_id, medida_id__in=set(medida_ids)
+            ).values_list('medida_id', flat=True)
+        )
+        return sorted(set(medida_ids) - asignadas)
+
+    @staticmethod
+    def registrar_lote(usuario, avances, request=None):
+        """
+        Registra varios avances del organismo del usuario en una sola transacción.
+
+        Los registros se insertan con ``bulk_create``, que no emite ``post_save``;
+        en su lugar se emite una vez ``avances_registrados`` con todo el lote, para
+        que auditoría, notificaciones y estadísticas generen un único evento.
+
+        Args:
+            avances: dicts con ``medida_id``, ``fecha_registro``, ``porcentaje_avance`` y ``descripcion``
+
+        Returns:
+            list: RegistroAvance creados
+        """
+        from .signals import avances_registrados
+
+        registros = [
+            RegistroAvance(organismo_id=usuario.organismo_id, created_by=usuario, **avance)
+            for avance in avances
+        ]
+        with transaction.atomic():
+            registros = RegistroAvance.objects.bulk_create(registros)
+            avances_registrados.send(sender=RegistroAvance, registros=registros, usuario=usuario, request=request)
+        return registros
@@ -1,10 +1,28 @@
-from django.db.models.signals import post_save, post_delete
-from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import Signal, receiver
 from .models import Medida, LogMedida
 from django.contrib.auth import get_user_model
 
 Usuario = get_user_model()
 
+# Registro de avances en lote (bulk_create no emite post_save). Argumentos:
+# ``registros`` (lista de RegistroAvance), ``usuario`` y ``request`` (puede ser None)
+avances_registrados = Signal()
+
+# Importación masiva de medidas y asignaciones. Argumentos: ``resumen`` (dict
+# con contadores y errores), ``usuario``, ``request`` (pueden ser None),
+# ``organismo_ids`` y ``asignaciones_nuevas`` ({organismo_id: [códigos de medida]})
+medidas_importadas = Signal()
+
+# Actualización diaria del retraso precalculado (update() no emite post_save).
+# Argumentos: ``retrasadas`` y ``al_dia`` (cantidad de medidas modificadas)
+retrasos_actualizados = Signal()
+
+
+@receiver(pre_save, sender=Medida)
+def calcular_retraso_medida(sender, instance, **kwargs):
+    instance.calcular_retraso()
+
 @receiver(post_save, sender=Medida)
 def log_medida_save(sender, instance, created, **kwargs):
     if hasattr(instance, '_request_user'): # Check if user is set
@@ -16,4 +34,57 @@ def log_medida_save(sender, instance, created, **kwargs):
 def log_medida_delete(sender, instance, **kwargs):
     if hasattr(instance, '_request_user'):
         usuario = instance._request_user
-        LogMedida.objects.create(usuario=usuario, medida=instance, accion='eliminar')
\ No newline at end of file
+        LogMedida.objects.create(usuario=usuario, medida=instance, accion='eliminar')
+
+# Mantener actualizado el snapshot de estadísticas de los dashboards
+from apps.organismos.models import Organismo
+from .models import Componente, AsignacionMedida, RegistroAvance
+from .services import EstadisticaService
+
+
+@receiver(post_save, sender=Medida)
+@receiver(post_delete, sender=Medida)
+def refrescar_estadisticas_medida(sender, instance, **kwargs):
+    organismo_ids = []
+    if instance.pk:
+        organismo_ids = list(
+            AsignacionMedida.objects.filter(medida_id=instance.pk).values_list('organismo_id', flat=True)
+        )
+    originales = getattr(instance, '_originales', {})
+    EstadisticaService.programar_refresco(
+        organismo_ids,
+        componente_ids={instance.componente_id, originales.get('componente_id')},
+        estados={instance.estado, originales.get('estado')},
+    )
+    instance._originales = {'componente_id': instance.componente_id, 'estado': instance.estado}
+
+
+@receiver(post_save, sender=AsignacionMedida)
+@receiver(post_delete, sender=AsignacionMedida)
+@receiver(post_save, sender=RegistroAvance)
+@receiver(post_delete, sender=RegistroAvance)
+def refrescar_estadisticas_organismo(sender, instance, **kwargs):
+    EstadisticaService.programar_refresco([instance.organismo_id])
+
+
+@receiver(post_save, sender=Componente)
+@receiver(post_delete, sender=Componente)
+def refrescar_estadisticas_componente(sender, instance, **kwargs):
+    EstadisticaService.programar_refresco(componente_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Organismo)
+@receiver(post_delete, sender=Organismo)
+def refrescar_estadisticas_de_organismo(sender, instance, **kwargs):
+    EstadisticaService.programar_refresco([instance.pk])
+
+
+@receiver(avances_registrados)
+def refrescar_estadisticas_avances(sender, registros, **kwargs):
+    EstadisticaService.programar_refresco({registro.organismo_id for registro in registros})
+
+
+@receiver(medidas_importadas)
+def refrescar_estadisticas_importacion(sender, resumen, organismo_ids, **kwargs):
+    if resumen['medidas_creadas'] or resumen['medidas_actualizadas']:
+        EstadisticaService.programar_refresco(organismo_ids, componente_ids=None, estados=None)
@@ -21,7 +21,7 @@ from django.db.models import Avg, Count, Sum, Q, F, Case, When, Value, IntegerFi
 from django.utils import timezone
 
 from apps.medidas.models import Medida, Componente, RegistroAvance
-from apps.organismos.models import Organismo
+from apps.medidas.services import EstadisticaService
 
 
 class MedidaViewSet(viewsets.ModelViewSet):
@@ -63,25 +63,17 @@ class DashboardSMAView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
         # Fecha actual para cálculos
         hoy = timezone.now().date()
 
-        # 1. Estadísticas generales
-        total_medidas = Medida.objects.count()
-        medidas_completadas = Medida.objects.filter(estado='completada').count()
-        medidas_en_proceso = Medida.objects.filter(estado='en_proceso').count()
-        medidas_retrasadas = Medida.objects.filter(
-            Q(estado__in=['pendiente', 'en_proceso', 'retrasada']) &
-            Q(fecha_termino__lt=hoy)
-        ).count()
-
-        avance_promedio = Medida.objects.aggregate(
-            promedio=Avg('porcentaje_avance')
-        )['promedio'] or 0
+        # 1. Estadísticas generales (snapshot materializado)
+        estadisticas = EstadisticaService.obtener_resumen()
+        resumen = estadisticas['global']
+        total_medidas = resumen['total_medidas']
+        medidas_completadas = resumen['medidas_completadas']
+        medidas_en_proceso = resumen['medidas_en_proceso']
+        medidas_retrasadas = resumen['medidas_retrasadas']
+        avance_promedio = resumen['avance_promedio']
 
         # 2. Avance por componente
-        componentes = Componente.objects.annotate(
-            total_medidas=Count('medidas'),
-            medidas_completadas=Count('medidas', filter=Q(medidas__estado='completada')),
-            avance_promedio=Avg('medidas__porcentaje_avance')
-        ).values('id', 'nombre', 'color', 'total_medidas', 'medidas_completadas', 'avance_promedio')
+        componentes = estadisticas['componentes']
 
         # 3. Medidas próximas a vencer (en los próximos 30 días)
         proximo_mes = hoy + timezone.timedelta(days=30)
@@ -93,29 +85,16 @@ class DashboardSMAView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
 
         # 4. Medidas más retrasadas
         medidas_retrasadas_list = Medida.objects.filter(
-            estado__in=['pendiente', 'en_proceso', 'retrasada'],
-            fecha_termino__lt=hoy
-        ).annotate(
-            dias_retraso=timezone.now().date() - F('fecha_termino')
+            retrasada=True
         ).order_by('-dias_retraso').select_related('componente')[:10]
 
         # 5. Organismos con mejor y peor desempeño
-        organismos = Organismo.objects.annotate(
-            total_medidas=Count('medidas_asignadas'),
-            medidas_completadas=Count('medidas_asignadas', filter=Q(medidas_asignadas__estado='completada')),
-            porcentaje_completado=Case(
-                When(total_medidas=0, then=Value(0)),
-                default=100 * F('medidas_completadas') / F('total_medidas'),
-                output_field=IntegerField(),
-            ),
-            avance_promedio=Avg('medidas_asignadas__porcentaje_avance')
-        ).filter(total_medidas__gt=0).values(
-            'id', 'nombre', 'total_medidas', 'medidas_completadas',
-            'porcentaje_completado', 'avance_promedio'
-        )
+        organismos = [o for o in estadisticas['organismos'] if o['total_medidas'] > 0]
+        for organismo in organismos:
+            organismo['porcentaje_completado'] = 100 * organismo['medidas_completadas'] // organismo['total_medidas']
 
-        mejores_organismos = list(organismos.order_by('-avance_promedio')[:5])
-        peores_organismos = list(organismos.order_by('avance_promedio')[:5])
+        mejores_organismos = sorted(organismos, key=lambda o: o['avance_promedio'], reverse=True)[:5]
+        peores_organismos = sorted(organismos, key=lambda o: o['avance_promedio'])[:5]
 
         # 6. Últimos avances registrados
         ultimos_avances = RegistroAvance.objects.select_related(
@@ -213,18 +192,13 @@ class DashboardOrganismoView(LoginRequiredMixin, UserPassesTestMixin, TemplateVi
             responsables=organismo
         ).select_related('componente')
 
-        # Otras estadísticas relevantes
-        total_medidas = medidas_asignadas.count()
-        medidas_completadas = medidas_asignadas.filter(estado='completada').count()
-        medidas_en_proceso = medidas_asignadas.filter(estado='en_proceso').count()
-        medidas_retrasadas = medidas_asignadas.filter(
-            estado__in=['pendiente', 'en_proceso'],
-            fecha_termino__lt=timezone.now().date()
-        ).count()
-
-        avance_promedio = medidas_asignadas.aggregate(
-            promedio=Avg('porcentaje_avance')
-        )['promedio'] or 0
+        # Otras estadísticas relevantes (snapshot materializado)
+        estadisticas = EstadisticaService.obtener_organismo(getattr(organismo, 'id', None))
+        total_medidas = estadisticas['total_medidas']
+        medidas_completadas = estadisticas['medidas_completadas']
+        medidas_en_proceso = estadisticas['medidas_en_proceso']
+        medidas_retrasadas = estadisticas['medidas_retrasadas']
+        avance_promedio = estadisticas['avance_promedio']
 
         # Últimos avances registrados por este organismo
         ultimos_avances = RegistroAvance.objects.filter(
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
-from .models import TipoNotificacion, Notificacion
+from .models import TipoNotificacion, Notificacion, CorreoPendiente
+from .services import NotificacionService
 
 
 @admin.register(TipoNotificacion)
@@ -23,7 +24,10 @@ class NotificacionAdmin(admin.ModelAdmin):
     def marcar_como_leidas(self, request, queryset):
         from django.utils import timezone
 
+        usuarios = set(queryset.values_list('usuario_id', flat=True))
         updated = queryset.update(leida=True, fecha_lectura=timezone.now())
+        for usuario_id in usuarios:
+            NotificacionService.reiniciar_contador(usuario_id)
         self.message_user(
             request,
             _(f"{updated} notificación(es) marcada(s) como leída(s)."),
@@ -32,10 +36,21 @@ class NotificacionAdmin(admin.ModelAdmin):
     marcar_como_leidas.short_description = _("Marcar notificaciones seleccionadas como leídas")
 
     def marcar_como_no_leidas(self, request, queryset):
+        usuarios = set(queryset.values_list('usuario_id', flat=True))
         updated = queryset.update(leida=False, fecha_lectura=None)
+        for usuario_id in usuarios:
+            NotificacionService.reiniciar_contador(usuario_id)
         self.message_user(
             request,
             _(f"{updated} notificación(es) marcada(s) como no leída(s)."),
         )
 
-    marcar_como_no_leidas.short_description = _("Marcar notificaciones seleccionadas como no leídas")
\ No newline at end of file
+    marcar_como_no_leidas.short_description = _("Marcar notificaciones seleccionadas como no leídas")
+
+
+@admin.register(CorreoPendiente)
+class CorreoPendienteAdmin(admin.ModelAdmin):
+    list_display = ('asunto', 'destinatario', 'estado', 'intentos', 'proximo_intento', 'fecha_envio')
+    list_filter = ('estado', 'created_at')
+    search_fields = ('asunto', 'destinatario')
+    readonly_fields = ('created_at', 'fecha_envio', 'ultimo_error')
@@ -1,3 +1,5 @@
+from django.conf import settings
+
 from .models import Notificacion
 from .services import NotificacionService
 
@@ -13,21 +15,21 @@ def notificaciones_context(request):
 
     if request.user.is_authenticated:
         try:
-            # Obtener todas las notificaciones no leídas en una sola consulta
-            no_leidas = list(Notificacion.objects.filter(
-                usuario=request.user,
-                leida=False
-            ).order_by('-fecha_envio'))
-
-            # Asegurarse de que ambas variables usan la misma fuente de datos
-            context['notificaciones_no_leidas_count'] = len(no_leidas)
-            context['ultimas_notificaciones'] = no_leidas[:5]
-
-            # Log para depuración
-            print(f"Usuario: {request.user.username}")
-            print(f"Notificaciones no leídas: {context['notificaciones_no_leidas_count']}")
-            print(f"Últimas notificaciones: {[n.id for n in context['ultimas_notificaciones']]}")
+            # El contador sale de la caché; solo se consultan las últimas 5
+            context['notificaciones_no_leidas_count'] = (
+                NotificacionService.contar_notificaciones_no_leidas(request.user)
+            )
+            if context['notificaciones_no_leidas_count']:
+                context['ultimas_notificaciones'] = list(Notificacion.objects.filter(
+                    usuario=request.user,
+                    leida=False
+                ).order_by('-fecha_envio')[:5])
         except Exception as e:
             print(f"Error en context processor: {str(e)}")
 
-    return context
\ No newline at end of file
+    return context
+
+
+def notificaciones_sse(request):
+    """Indica a las plantillas si el contador de notificaciones se recibe por SSE (``NOTIFICACIONES_SSE``)."""
+    return {'notificaciones_sse': getattr(settings, 'NOTIFICACIONES_SSE', False)}
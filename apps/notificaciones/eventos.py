@@ -0,0 +1,140 @@
+import asyncio
+import json
+import queue
+import threading
+import time
+
+from django.conf import settings
+
+
+class Suscripcion:
+    """
+    Cola de eventos de una conexión SSE. Funciona tanto con hilos (WSGI)
+    como con un event loop (ASGI): la publicación nunca bloquea al emisor.
+    """
+
+    def __init__(self, usuario_id, loop=None, maximo=100):
+        self.usuario_id = usuario_id
+        self.loop = loop
+        if loop is None:
+            self.cola = queue.Queue(maxsize=maximo)
+        else:
+            self.cola = asyncio.Queue(maxsize=maximo)
+
+    def entregar(self, evento):
+        if self.loop is None:
+            try:
+                self.cola.put_nowait(evento)
+            except queue.Full:
+                pass
+        else:
+            self.loop.call_soon_threadsafe(self._entregar_async, evento)
+
+    def _entregar_async(self, evento):
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            pass
+
+    def esperar(self, timeout):
+        """Siguiente evento o None si se cumple el timeout (modo hilos)."""
+        try:
+            return self.cola.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    async def esperar_async(self, timeout):
+        """Siguiente evento o None si se cumple el timeout (modo ASGI)."""
+        try:
+            return await asyncio.wait_for(self.cola.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class CanalNotificaciones:
+    """Pub/sub en memoria del proceso: eventos de notificaciones por usuario."""
+
+    def __init__(self):
+        self._suscripciones = {}
+        self._lock = threading.Lock()
+
+    def suscribir(self, usuario_id, loop=None):
+        suscripcion = Suscripcion(usuario_id, loop=loop)
+        with self._lock:
+            self._suscripciones.setdefault(usuario_id, set()).add(suscripcion)
+        return suscripcion
+
+    def cancelar(self, suscripcion):
+        with self._lock:
+            suscripciones = self._suscripciones.get(suscripcion.usuario_id)
+            if suscripciones is not None:
+                suscripciones.discard(suscripcion)
+                if not suscripciones:
+                    del self._suscripciones[suscripcion.usuario_id]
+
+    def tiene_suscriptores(self, usuario_id):
+        return usuario_id in self._suscripciones
+
+    def publicar(self, usuario_id, evento, datos):
+        with self._lock:
+            suscripciones = list(self._suscripciones.get(usuario_id, ()))
+        for suscripcion in suscripciones:
+            suscripcion.entregar((evento, datos))
+
+
+canal_notificaciones = CanalNotificaciones()
+
+
+def formatear_evento(evento, datos):
+    """Serializa un evento en formato text/event-stream."""
+    return f"event: {evento}\ndata: {json.dumps(datos, default=str)}\n\n"
+
+
+def _parametros():
+    return (
+        getattr(settings, 'SSE_INTERVALO_LATIDO', 15),
+        getattr(settings, 'SSE_DURACION_MAXIMA', 300),
+    )
+
+
+def _contador(usuario_id):
+    from .services import NotificacionService
+    return NotificacionService.contar_notificaciones_no_leidas(usuario_id)
+
+
+async def flujo_eventos_async(usuario_id):
+    """
+    Generador SSE para servidores ASGI: la conexión espera en el event loop, sin ocupar un hilo.
+
+    Emite el contador al conectar, los eventos publicados en este proceso y un
+    latido cada ``SSE_INTERVALO_LATIDO`` segundos. El latido vuelve a leer el
+    contador (de la base o de la caché compartida), lo que cubre los cambios
+    hechos en otros procesos. La conexión se cierra tras ``SSE_DURACION_MAXIMA``
+    y EventSource reconecta.
+    """
+    from asgiref.sync import sync_to_async
+
+    latido, duracion = _parametros()
+    suscripcion = canal_notificaciones.suscribir(usuario_id, loop=asyncio.get_running_loop())
+    contador = sync_to_async(_contador)
+    try:
+        ultimo = await contador(usuario_id)
+        yield f"retry: 5000\n\n{formatear_evento('contador', {'cantidad': ultimo})}"
+
+        fin = time.monotonic() + duracion
+        while time.monotonic() < fin:
+            evento = await suscripcion.esperar_async(latido)
+            if evento is not None:
+                if evento[0] == 'contador':
+                    ultimo = evento[1]['cantidad']
+                yield formatear_evento(*evento)
+                continue
+
+            cantidad = await contador(usuario_id)
+            if cantidad != ultimo:
+                ultimo = cantidad
+                yield formatear_evento('contador', {'cantidad': cantidad})
+            else:
+                yield ": latido\n\n"
+    finally:
+        canal_notificaciones.cancelar(suscripcion)
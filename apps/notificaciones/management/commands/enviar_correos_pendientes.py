@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.notificaciones.services import NotificacionService
+
+
+class Command(BaseCommand):
+    help = 'Envía los correos de la bandeja de salida en lotes sobre una conexión SMTP'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=50, help='Correos por conexión SMTP')
+        parser.add_argument('--max-intentos', type=int, default=5,
+                            help='Intentos antes de marcar un correo como fallido')
+        parser.add_argument('--reserva', type=int, default=300,
+                            help='Segundos tras los cuales otro worker retoma un correo reservado sin resultado')
+        parser.add_argument('--intervalo', type=float, default=10.0,
+                            help='Segundos de espera cuando no hay correos pendientes')
+        parser.add_argument('--una-vez', action='store_true',
+                            help='Enviar los correos pendientes y terminar')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('Iniciando envío de correos pendientes...'))
+
+        totales = {'enviados': 0, 'reintentos': 0, 'fallidos': 0}
+        while True:
+            resultado = NotificacionService.enviar_correos_pendientes(
+                lote=options['lote'], max_intentos=options['max_intentos'], reserva=options['reserva']
+            )
+            for clave, valor in resultado.items():
+                totales[clave] += valor
+
+            if any(resultado.values()):
+                self.stdout.write(
+                    f"Enviados: {resultado['enviados']}, reintentos: {resultado['reintentos']}, "
+                    f"fallidos: {resultado['fallidos']}"
+                )
+                # Lote completo: puede haber más correos vencidos
+                if sum(resultado.values()) >= options['lote']:
+                    continue
+
+            if options['una_vez']:
+                break
+            close_old_connections()
+            time.sleep(options['intervalo'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Envío finalizado. Enviados: {totales['enviados']}, reintentos: {totales['reintentos']}, "
+            f"fallidos: {totales['fallidos']}"
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.notificaciones.services import NotificacionService
+
+
+class Command(BaseCommand):
+    help = 'Recalcula en caché los contadores de notificaciones no leídas'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('Reconciliando contadores de notificaciones...'))
+
+        cantidad = NotificacionService.reconciliar_contadores()
+
+        self.stdout.write(self.style.SUCCESS(f'Contadores actualizados: {cantidad}'))
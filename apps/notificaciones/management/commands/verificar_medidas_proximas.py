@@ -8,6 +8,12 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('Iniciando verificación de medidas próximas a vencer...'))
 
-        verificar_medidas_proximas_vencer()
+        resultado = verificar_medidas_proximas_vencer()
 
-        self.stdout.write(self.style.SUCCESS('Verificación completada.'))
\ No newline at end of file
+        self.stdout.write(
+            f"Medidas próximas a vencer: {resultado['medidas']}\n"
+            f"Notificaciones a organismos: {resultado['notificaciones_organismos']}\n"
+            f"Notificaciones a administradores: {resultado['notificaciones_admins']}\n"
+            f"Correos encolados: {resultado['correos']}"
+        )
+        self.stdout.write(self.style.SUCCESS(f"Verificación completada en {resultado['segundos']} s."))
\ No newline at end of file
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notificaciones', '0005_notificacion_medida_notificacion_organismo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorreoPendiente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('destinatario', models.EmailField(max_length=254, verbose_name='Destinatario')),
+                ('asunto', models.CharField(max_length=255, verbose_name='Asunto')),
+                ('cuerpo_texto', models.TextField(verbose_name='Cuerpo (texto)')),
+                ('cuerpo_html', models.TextField(blank=True, verbose_name='Cuerpo (HTML)')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('enviado', 'Enviado'), ('fallido', 'Fallido')], default='pendiente', max_length=20, verbose_name='Estado')),
+                ('intentos', models.PositiveIntegerField(default=0, verbose_name='Intentos')),
+                ('proximo_intento', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próximo intento')),
+                ('ultimo_error', models.TextField(blank=True, verbose_name='Último error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('fecha_envio', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de envío')),
+                ('notificacion', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='correos', to='notificaciones.notificacion', verbose_name='Notificación')),
+            ],
+            options={
+                'verbose_name': 'Correo pendiente',
+                'verbose_name_plural': 'Correos pendientes',
+                'ordering': ['proximo_intento'],
+                'indexes': [models.Index(fields=['estado', 'proximo_intento'], name='notificacio_estado_8c9733_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medidas', '0004_indice_keyset_registro_avance'),
+        ('notificaciones', '0006_correopendiente'),
+        ('organismos', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(fields=['usuario', '-fecha_envio', '-id'], name='notificacion_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notificaciones', '0007_indice_keyset_notificacion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='correopendiente',
+            name='estado',
+            field=models.CharField(choices=[('pendiente', 'Pendiente'), ('enviando', 'Enviando'), ('enviado', 'Enviado'), ('fallido', 'Fallido')], default='pendiente', max_length=20, verbose_name='Estado'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medidas', '0006_retraso_precalculado'),
+        ('notificaciones', '0008_correo_enviando'),
+        ('organismos', '0002_indices_sincronizacion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(condition=models.Q(('leida', False)), fields=['usuario'], name='notificacion_no_leidas_idx'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from apps.usuarios.models import Usuario
 from apps.organismos.models import Organismo
@@ -88,6 +89,12 @@ class Notificacion(models.Model):
         verbose_name = _("Notificación")
         verbose_name_plural = _("Notificaciones")
         ordering = ['-fecha_envio']
+        indexes = [
+            # Bandeja del usuario paginada por clave
+            models.Index(fields=['usuario', '-fecha_envio', '-id'], name='notificacion_keyset_idx'),
+            # Conteo de no leídas cuando el contador no está en una caché compartida
+            models.Index(fields=['usuario'], condition=models.Q(leida=False), name='notificacion_no_leidas_idx'),
+        ]
 
     def __str__(self):
         return f"{self.titulo} - {self.usuario.username}"
@@ -97,7 +104,60 @@ class Notificacion(models.Model):
         Marca la notificación como leída y registra la fecha.
         """
         from django.utils import timezone
+        from .services import NotificacionService
+
+        if self.leida:
+            return
 
         self.leida = True
         self.fecha_lectura = timezone.now()
-        self.save()
\ No newline at end of file
+        # Actualización condicional: dos lecturas simultáneas descuentan una sola vez
+        marcadas = Notificacion.objects.filter(pk=self.pk, leida=False).update(
+            leida=True, fecha_lectura=self.fecha_lectura
+        )
+        NotificacionService.ajustar_contadores({self.usuario_id: -marcadas})
+
+class CorreoPendiente(models.Model):
+    """
+    Bandeja de salida de correos. Las notificaciones no envían el correo en la
+    petición: lo dejan aquí y el comando ``enviar_correos_pendientes`` lo despacha.
+    """
+    ESTADO_CHOICES = [
+        ('pendiente', _('Pendiente')),
+        ('enviando', _('Enviando')),
+        ('enviado', _('Enviado')),
+        ('fallido', _('Fallido')),
+    ]
+
+    notificacion = models.ForeignKey(
+        Notificacion,
+        on_delete=models.SET_NULL,
+        verbose_name=_("Notificación"),
+        related_name="correos",
+        blank=True,
+        null=True
+    )
+    destinatario = models.EmailField(_("Destinatario"))
+    asunto = models.CharField(_("Asunto"), max_length=255)
+    cuerpo_texto = models.TextField(_("Cuerpo (texto)"))
+    cuerpo_html = models.TextField(_("Cuerpo (HTML)"), blank=True)
+
+    estado = models.CharField(_("Estado"), max_length=20, choices=ESTADO_CHOICES, default='pendiente')
+    intentos = models.PositiveIntegerField(_("Intentos"), default=0)
+    # Mientras está ``enviando``, vencimiento de la reserva del worker que lo envía
+    proximo_intento = models.DateTimeField(_("Próximo intento"), default=timezone.now)
+    ultimo_error = models.TextField(_("Último error"), blank=True)
+
+    created_at = models.DateTimeField(_("Fecha de creación"), auto_now_add=True)
+    fecha_envio = models.DateTimeField(_("Fecha de envío"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Correo pendiente")
+        verbose_name_plural = _("Correos pendientes")
+        ordering = ['proximo_intento']
+        indexes = [
+            models.Index(fields=['estado', 'proximo_intento']),
+        ]
+
+    def __str__(self):
+        return f"{self.asunto} - {self.destinatario} ({self.get_estado_display()})"
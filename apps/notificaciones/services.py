@@ -1,10 +1,16 @@
+from collections import Counter
+from datetime import timedelta
+
 from django.utils import timezone
-from django.db.models import Q
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template.loader import render_to_string
 
-from .models import Notificacion, TipoNotificacion
+from .eventos import canal_notificaciones
+from .models import Notificacion, TipoNotificacion, CorreoPendiente
 
 
 class NotificacionService:
@@ -44,8 +50,8 @@ class NotificacionService:
                 color='primary'
             )
 
-        # Crear la notificación
-        notificacion = Notificacion.objects.create(
+        # Crear la notificación (el correo se encola aquí y no desde la señal post_save)
+        notificacion = Notificacion(
             tipo=tipo,
             usuario=usuario,
             titulo=titulo,
@@ -53,41 +59,210 @@ class NotificacionService:
             enlace=enlace,
             prioridad=prioridad
         )
+        notificacion._omitir_email = True
+        notificacion.save()
 
-        # Enviar correo electrónico si está habilitado
-        if enviar_email and usuario.email and getattr(usuario, 'recibir_notificaciones_email', True):
-            NotificacionService._enviar_email_notificacion(notificacion)
+        # Encolar correo electrónico si está habilitado
+        if enviar_email:
+            NotificacionService.encolar_emails([notificacion])
 
         return notificacion
 
     @staticmethod
-    def _enviar_email_notificacion(notificacion):
+    def tipo_nuevo_avance():
+        """Tipo de notificación de nuevos avances (se crea si no existe)."""
+        tipo, _ = TipoNotificacion.objects.get_or_create(
+            codigo="nuevo_avance",
+            defaults={
+                'nombre': "Nuevo avance registrado",
+                'descripcion': "Se ha registrado un nuevo avance en una medida",
+                'icono': "chart-line",
+                'color': "#28a745",
+                'para_admin_sma': True
+            }
+        )
+        return tipo
+
+    @staticmethod
+    def tipo_nueva_asignacion():
+        """Tipo de notificación de medidas asignadas a un organismo (se crea si no existe)."""
+        tipo, _ = TipoNotificacion.objects.get_or_create(
+            codigo="nueva_asignacion",
+            defaults={
+                'nombre': "Nueva medida asignada",
+                'descripcion': "Se ha asignado una nueva medida a tu organismo",
+                'icono': "clipboard-check",
+                'color': "#007bff",
+                'para_organismos': True
+            }
+        )
+        return tipo
+
+    @staticmethod
+    def notificar_usuarios(usuarios, tipo, titulo, mensaje, medida=None, organismo=None,
+                           enlace='', prioridad='media', enviar_email=True):
+        """
+        Crea la misma notificación para varios usuarios con un único ``bulk_create``.
+
+        ``bulk_create`` no emite ``post_save``: los correos se encolan aparte,
+        también en lote, en la bandeja de salida.
+
+        Args:
+            usuarios: QuerySet o lista de usuarios destinatarios
+            tipo: TipoNotificacion de las notificaciones
+
+        Returns:
+            list: Notificaciones creadas
+        """
+        notificaciones = Notificacion.objects.bulk_create([
+            Notificacion(
+                tipo=tipo,
+                usuario=usuario,
+                titulo=titulo,
+                mensaje=mensaje,
+                medida=medida,
+                organismo=organismo,
+                enlace=enlace,
+                prioridad=prioridad
+            )
+            for usuario in usuarios
+        ])
+
+        NotificacionService.notificaciones_creadas(notificaciones)
+
+        if enviar_email:
+            NotificacionService.encolar_emails(notificaciones)
+
+        return notificaciones
+
+    @staticmethod
+    def encolar_emails(notificaciones):
         """
-        Envía un correo electrónico para una notificación.
+        Deja en la bandeja de salida el correo de cada notificación cuyo usuario
+        tenga email y acepte notificaciones por correo.
+
+        Returns:
+            list: Correos encolados
         """
+        correos = [
+            NotificacionService._construir_correo(n) for n in notificaciones
+            if n.usuario.email and getattr(n.usuario, 'recibir_notificaciones_email', True)
+        ]
+        return CorreoPendiente.objects.bulk_create(correos)
+
+    @staticmethod
+    def _construir_correo(notificacion):
+        """Renderiza asunto y cuerpos (texto y HTML) de la notificación."""
         context = {
             'notificacion': notificacion,
             'site_url': getattr(settings, 'SITE_URL', 'http://localhost:8000'),
         }
 
-        subject = f"[Plan de Descontaminación] {notificacion.titulo}"
-        html_message = render_to_string('notificaciones/emails/notificacion.html', context)
-        plain_message = render_to_string('notificaciones/emails/notificacion.txt', context)
+        return CorreoPendiente(
+            notificacion=notificacion,
+            destinatario=notificacion.usuario.email,
+            asunto=f"[Plan de Descontaminación] {notificacion.titulo}"[:255],
+            cuerpo_texto=render_to_string('notificaciones/emails/notificacion.txt', context),
+            cuerpo_html=render_to_string('notificaciones/emails/notificacion.html', context),
+        )
+
+    @staticmethod
+    def reclamar_correos(lote=50, reserva=300):
+        """
+        Reserva un lote de correos vencidos en una transacción corta: quedan
+        ``enviando`` con ``proximo_intento`` como vencimiento de la reserva. Si
+        el worker se cae antes de registrar el resultado, al vencer la reserva
+        otro worker los vuelve a tomar.
+
+        Returns:
+            list: Los correos reservados por este worker
+        """
+        ahora = timezone.now()
+        vencimiento = ahora + timedelta(seconds=reserva)
+        with transaction.atomic():
+            # skip_locked permite varios workers sin enviar dos veces el mismo correo
+            ids = list(CorreoPendiente.objects.select_for_update(skip_locked=True).filter(
+                estado__in=['pendiente', 'enviando'], proximo_intento__lte=ahora
+            ).order_by('proximo_intento').values_list('id', flat=True)[:lote])
+            if not ids:
+                return []
+            CorreoPendiente.objects.filter(
+                pk__in=ids, estado__in=['pendiente', 'enviando'], proximo_intento__lte=ahora
+            ).update(estado='enviando', proximo_intento=vencimiento)
+
+        # Sin bloqueo de filas (SQLite), el vencimiento propio identifica lo que este worker reservó
+        return list(CorreoPendiente.objects.filter(
+            pk__in=ids, estado='enviando', proximo_intento=vencimiento
+        ).order_by('proximo_intento', 'id'))
+
+    @staticmethod
+    def enviar_correos_pendientes(lote=50, max_intentos=5, espera_base=60, reserva=300):
+        """
+        Envía un lote de correos vencidos reutilizando una sola conexión SMTP.
+
+        Los correos se reservan en una transacción corta (``reclamar_correos``) y
+        se envían fuera de ella; el resultado de cada uno se guarda apenas se
+        conoce. Los fallidos se reintentan con espera exponencial
+        (``espera_base * 2^intentos`` segundos) hasta ``max_intentos``, y luego
+        quedan como fallidos.
+
+        Returns:
+            dict: Cantidad de correos ``enviados``, ``reintentos`` y ``fallidos``
+        """
+        resultado = {'enviados': 0, 'reintentos': 0, 'fallidos': 0}
+
+        correos = NotificacionService.reclamar_correos(lote, reserva)
+        if not correos:
+            return resultado
 
         try:
-            send_mail(
-                subject=subject,
-                message=plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[notificacion.usuario.email],
-                html_message=html_message,
-                fail_silently=False
-            )
-            print(f"Correo enviado correctamente a {notificacion.usuario.email}")
-            return True
+            conexion = get_connection(fail_silently=False)
+            conexion.open()
         except Exception as e:
-            print(f"Error al enviar email: {str(e)}")
-            return False
+            # Sin conexión no se consume un intento: se libera todo el lote para más tarde
+            CorreoPendiente.objects.filter(pk__in=[correo.pk for correo in correos], estado='enviando').update(
+                estado='pendiente', ultimo_error=str(e),
+                proximo_intento=timezone.now() + timedelta(seconds=espera_base),
+            )
+            resultado['reintentos'] = len(correos)
+            return resultado
+
+        try:
+            for correo in correos:
+                mensaje = EmailMultiAlternatives(
+                    subject=correo.asunto,
+                    body=correo.cuerpo_texto,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[correo.destinatario],
+                    connection=conexion,
+                )
+                if correo.cuerpo_html:
+                    mensaje.attach_alternative(correo.cuerpo_html, 'text/html')
+
+                intentos = correo.intentos + 1
+                try:
+                    conexion.send_messages([mensaje])
+                except Exception as e:
+                    cambios = {'intentos': intentos, 'ultimo_error': str(e)}
+                    if intentos >= max_intentos:
+                        cambios['estado'] = 'fallido'
+                        resultado['fallidos'] += 1
+                    else:
+                        espera = espera_base * 2 ** (intentos - 1)
+                        cambios['estado'] = 'pendiente'
+                        cambios['proximo_intento'] = timezone.now() + timedelta(seconds=espera)
+                        resultado['reintentos'] += 1
+                else:
+                    cambios = {
+                        'intentos': intentos, 'estado': 'enviado',
+                        'fecha_envio': timezone.now(), 'ultimo_error': '',
+                    }
+                    resultado['enviados'] += 1
+                CorreoPendiente.objects.filter(pk=correo.pk, estado='enviando').update(**cambios)
+        finally:
+            conexion.close()
+
+        return resultado
 
     @staticmethod
     def obtener_notificaciones_no_leidas(usuario):
@@ -109,6 +284,11 @@ class NotificacionService:
         """
         Cuenta las notificaciones no leídas de un usuario.
 
+        Con ``CACHE_COMPARTIDA`` el valor se mantiene en la caché y se ajusta con
+        ``incr``/``decr`` al crear o leer notificaciones; solo se consulta la base
+        si el contador no existe. Sin caché compartida (locmem, una copia por
+        proceso) se cuenta siempre en la base con el índice de no leídas.
+
         Args:
             usuario: Usuario o ID de usuario
 
@@ -120,7 +300,130 @@ class NotificacionService:
         else:
             usuario_id = usuario.id
 
-        return Notificacion.objects.filter(
-            usuario_id=usuario_id,
-            leida=False
-        ).count()
\ No newline at end of file
+        if not NotificacionService._contador_en_cache():
+            return Notificacion.objects.filter(usuario_id=usuario_id, leida=False).count()
+
+        clave = NotificacionService._clave_contador(usuario_id)
+        cantidad = cache.get(clave)
+        if cantidad is None:
+            cantidad = Notificacion.objects.filter(
+                usuario_id=usuario_id,
+                leida=False
+            ).count()
+            cache.add(clave, cantidad, NotificacionService._duracion_contador())
+        return cantidad
+
+    @staticmethod
+    def notificaciones_creadas(notificaciones):
+        """
+        Actualiza contadores y publica las nuevas notificaciones a las conexiones
+        SSE abiertas, una vez confirmada la transacción.
+        """
+        pendientes = [n for n in notificaciones if not n.leida]
+        NotificacionService.ajustar_contadores(Counter(n.usuario_id for n in pendientes))
+        if pendientes:
+            transaction.on_commit(lambda: NotificacionService._publicar_notificaciones(pendientes))
+
+    @staticmethod
+    def _publicar_notificaciones(notificaciones):
+        for notificacion in notificaciones:
+            if not canal_notificaciones.tiene_suscriptores(notificacion.usuario_id):
+                continue
+            canal_notificaciones.publicar(notificacion.usuario_id, 'notificacion', {
+                'id': notificacion.id,
+                'titulo': notificacion.titulo,
+                'mensaje': notificacion.mensaje,
+                'enlace': notificacion.enlace,
+                'prioridad': notificacion.prioridad,
+                'fecha_envio': notificacion.fecha_envio,
+            })
+
+    @staticmethod
+    def _publicar_contador(usuario_id):
+        """Envía el contador actual a las conexiones SSE del usuario en este proceso."""
+        if canal_notificaciones.tiene_suscriptores(usuario_id):
+            canal_notificaciones.publicar(usuario_id, 'contador', {
+                'cantidad': NotificacionService.contar_notificaciones_no_leidas(usuario_id)
+            })
+
+    @staticmethod
+    def ajustar_contadores(deltas):
+        """
+        Ajusta los contadores de no leídas al confirmar la transacción.
+
+        Args:
+            deltas: dict ``usuario_id -> variación``
+        """
+        deltas = {usuario_id: delta for usuario_id, delta in deltas.items() if delta}
+        if deltas:
+            transaction.on_commit(lambda: NotificacionService._aplicar_deltas(deltas))
+
+    @staticmethod
+    def reiniciar_contador(usuario_id, cantidad=None):
+        """
+        Fija el contador (p. ej. en 0 tras marcar todas como leídas) o lo elimina
+        para que se recalcule en la próxima lectura.
+        """
+        clave = NotificacionService._clave_contador(usuario_id)
+
+        def aplicar():
+            if NotificacionService._contador_en_cache():
+                if cantidad is None:
+                    cache.delete(clave)
+                else:
+                    cache.set(clave, cantidad, NotificacionService._duracion_contador())
+            NotificacionService._publicar_contador(usuario_id)
+
+        transaction.on_commit(aplicar)
+
+    @staticmethod
+    def reconciliar_contadores(usuario_ids=None):
+        """
+        Recalcula los contadores con una sola consulta agrupada.
+
+        Returns:
+            int: Número de contadores actualizados
+        """
+        from apps.usuarios.models import Usuario
+
+        if not NotificacionService._contador_en_cache():
+            return 0
+        usuarios = Usuario.objects.all()
+        if usuario_ids is not None:
+            usuarios = usuarios.filter(pk__in=usuario_ids)
+        cantidades = usuarios.annotate(
+            no_leidas=Count('notificaciones', filter=Q(notificaciones__leida=False))
+        ).values_list('id', 'no_leidas')
+
+        valores = {NotificacionService._clave_contador(uid): cantidad for uid, cantidad in cantidades}
+        cache.set_many(valores, NotificacionService._duracion_contador())
+        return len(valores)
+
+    @staticmethod
+    def _aplicar_deltas(deltas):
+        if not NotificacionService._contador_en_cache():
+            for usuario_id in deltas:
+                NotificacionService._publicar_contador(usuario_id)
+            return
+        for usuario_id, delta in deltas.items():
+            clave = NotificacionService._clave_contador(usuario_id)
+            try:
+                valor = cache.incr(clave, delta)
+            except ValueError:
+                # Sin contador en caché: se calculará en la próxima lectura
+                valor = 0
+            if valor < 0:
+                cache.delete(clave)
+            NotificacionService._publicar_contador(usuario_id)
+
+    @staticmethod
+    def _contador_en_cache():
+        return getattr(settings, 'CACHE_COMPARTIDA', False)
+
+    @staticmethod
+    def _clave_contador(usuario_id):
+        return f'notificaciones:no_leidas:{usuario_id}'
+
+    @staticmethod
+    def _duracion_contador():
+        return getattr(settings, 'NOTIFICACIONES_CONTADOR_DURACION', 3600)
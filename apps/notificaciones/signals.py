@@ -1,26 +1,41 @@
+import time
+
 from django.dispatch import receiver
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
 from apps.usuarios.models import Usuario
 from .models import Notificacion, TipoNotificacion
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from datetime import timedelta
 from .services import NotificacionService
 
 from apps.medidas.models import Medida, RegistroAvance, AsignacionMedida
+from apps.medidas.signals import avances_registrados, medidas_importadas
 
 
-# Añadimos esta señal para enviar emails cuando se crea una notificación
+# Añadimos esta señal para encolar emails cuando se crea una notificación
 @receiver(post_save, sender=Notificacion)
 def enviar_email_notificacion(sender, instance, created, **kwargs):
     """
-    Envía un email cuando se crea una nueva notificación.
+    Encola el email de una nueva notificación en la bandeja de salida.
     """
-    if created and instance.usuario.email and getattr(instance.usuario, 'recibir_notificaciones_email', True):
+    if created:
+        NotificacionService.notificaciones_creadas([instance])
+
+    if created and not getattr(instance, '_omitir_email', False):
         try:
-            NotificacionService._enviar_email_notificacion(instance)
+            NotificacionService.encolar_emails([instance])
         except Exception as e:
-            print(f"Error al enviar email para notificación {instance.id}: {str(e)}")
+            print(f"Error al encolar email para notificación {instance.id}: {str(e)}")
+
+
+@receiver(post_delete, sender=Notificacion)
+def descontar_notificacion_eliminada(sender, instance, **kwargs):
+    """Mantiene el contador de no leídas al eliminar una notificación pendiente."""
+    if not instance.leida:
+        NotificacionService.ajustar_contadores({instance.usuario_id: -1})
 
 
 # Comentamos esta función porque ConfiguracionNotificaciones no está definida en tu modelo actual
@@ -60,69 +75,110 @@ def notificar_nuevo_avance(sender, instance, created, **kwargs):
     """Envía notificaciones cuando se registra un nuevo avance"""
     if created:
         # Obtener el tipo de notificación (crearlo si no existe)
-        tipo, _ = TipoNotificacion.objects.get_or_create(
-            codigo="nuevo_avance",
-            defaults={
-                'nombre': "Nuevo avance registrado",
-                'descripcion': "Se ha registrado un nuevo avance en una medida",
-                'icono': "chart-line",
-                'color': "#28a745",
-                'para_admin_sma': True
-            }
-        )
+        tipo = NotificacionService.tipo_nuevo_avance()
 
         # Crear notificación para administradores SMA
         from apps.usuarios.models import Usuario
         admins_sma = Usuario.objects.filter(rol='admin_sma')
 
-        for admin in admins_sma:
-            Notificacion.objects.create(
-                tipo=tipo,
-                usuario=admin,
-                titulo=f"Nuevo avance en {instance.medida.codigo}",
-                mensaje=f"El organismo {instance.organismo.nombre} ha registrado un avance del {instance.porcentaje_avance}% en la medida {instance.medida.nombre}.",
-                medida=instance.medida,
-                organismo=instance.organismo,
-                enlace=f"/medidas/{instance.medida.id}/"  # URL a la página de detalle de la medida
-            )
+        NotificacionService.notificar_usuarios(
+            admins_sma,
+            tipo=tipo,
+            titulo=f"Nuevo avance en {instance.medida.codigo}",
+            mensaje=f"El organismo {instance.organismo.nombre} ha registrado un avance del {instance.porcentaje_avance}% en la medida {instance.medida.nombre}.",
+            medida=instance.medida,
+            organismo=instance.organismo,
+            enlace=f"/medidas/{instance.medida.id}/"  # URL a la página de detalle de la medida
+        )
+
+
+@receiver(avances_registrados, sender=RegistroAvance)
+def notificar_avances_en_lote(sender, registros, **kwargs):
+    """Una sola notificación a los administradores SMA por lote de avances"""
+    if not registros:
+        return
+    from apps.organismos.models import Organismo
+    from apps.usuarios.models import Usuario
+
+    organismo = Organismo.objects.get(pk=registros[0].organismo_id)
+    medidas = list(Medida.objects.filter(pk__in={r.medida_id for r in registros}).order_by('codigo'))
+    medida = medidas[0] if len(medidas) == 1 else None
+
+    NotificacionService.notificar_usuarios(
+        Usuario.objects.filter(rol='admin_sma'),
+        tipo=NotificacionService.tipo_nuevo_avance(),
+        titulo=f"{len(registros)} nuevos avances de {organismo.nombre}",
+        mensaje=f"El organismo {organismo.nombre} ha registrado {len(registros)} avances en las medidas " +
+                ", ".join(m.codigo for m in medidas) + ".",
+        medida=medida,
+        organismo=organismo,
+        enlace=f"/medidas/{medida.id}/" if medida else "/medidas/"
+    )
 
 
 @receiver(post_save, sender=AsignacionMedida)
 def notificar_nueva_asignacion(sender, instance, created, **kwargs):
     """Envía notificaciones cuando se asigna una medida a un organismo"""
     if created:
-        # Obtener el tipo de notificación
-        tipo, _ = TipoNotificacion.objects.get_or_create(
-            codigo="nueva_asignacion",
-            defaults={
-                'nombre': "Nueva medida asignada",
-                'descripcion': "Se ha asignado una nueva medida a tu organismo",
-                'icono': "clipboard-check",
-                'color': "#007bff",
-                'para_organismos': True
-            }
-        )
+        tipo = NotificacionService.tipo_nueva_asignacion()
 
         # Crear notificación para usuarios del organismo
         from apps.usuarios.models import Usuario
         usuarios_organismo = Usuario.objects.filter(organismo=instance.organismo)
 
-        for usuario in usuarios_organismo:
-            Notificacion.objects.create(
-                tipo=tipo,
-                usuario=usuario,
-                titulo=f"Nueva medida asignada: {instance.medida.codigo}",
-                mensaje=f"Se ha asignado a tu organismo la medida '{instance.medida.nombre}'. " +
-                        f"Fecha límite: {instance.medida.fecha_termino.strftime('%d/%m/%Y')}",
-                medida=instance.medida,
-                organismo=instance.organismo,
-                enlace=f"/medidas/{instance.medida.id}/"
-            )
+        NotificacionService.notificar_usuarios(
+            usuarios_organismo,
+            tipo=tipo,
+            titulo=f"Nueva medida asignada: {instance.medida.codigo}",
+            mensaje=f"Se ha asignado a tu organismo la medida '{instance.medida.nombre}'. " +
+                    f"Fecha límite: {instance.medida.fecha_termino.strftime('%d/%m/%Y')}",
+            medida=instance.medida,
+            organismo=instance.organismo,
+            enlace=f"/medidas/{instance.medida.id}/"
+        )
+
+
+@receiver(medidas_importadas, sender=Medida)
+def notificar_asignaciones_importadas(sender, asignaciones_nuevas, **kwargs):
+    """Una sola notificación por organismo con las medidas que le asignó la importación"""
+    if not asignaciones_nuevas:
+        return
+    from apps.organismos.models import Organismo
+
+    usuarios = {}
+    for usuario in Usuario.objects.filter(organismo_id__in=list(asignaciones_nuevas)):
+        usuarios.setdefault(usuario.organismo_id, []).append(usuario)
+    if not usuarios:
+        return
+
+    tipo = NotificacionService.tipo_nueva_asignacion()
+    organismos = Organismo.objects.in_bulk(list(usuarios))
+    for organismo_id, codigos in asignaciones_nuevas.items():
+        if not usuarios.get(organismo_id):
+            continue
+        NotificacionService.notificar_usuarios(
+            usuarios[organismo_id],
+            tipo=tipo,
+            titulo=f"{len(codigos)} medidas asignadas" if len(codigos) > 1 else f"Nueva medida asignada: {codigos[0]}",
+            mensaje="Se han asignado a tu organismo las medidas " + ", ".join(sorted(codigos)) + ".",
+            organismo=organismos.get(organismo_id),
+            enlace="/medidas/"
+        )
 
 
 # Función auxiliar para verificar medidas próximas a vencer
 def verificar_medidas_proximas_vencer():
-    """Verifica medidas que vencen en los próximos 30 días y envía notificaciones"""
+    """
+    Verifica medidas que vencen en los próximos 30 días y envía notificaciones.
+
+    Calcula en SQL los pares (medida, usuario) a notificar, descarta los que ya
+    tienen una notificación igual sin leer y crea las faltantes con ``bulk_create``.
+
+    Returns:
+        dict: Medidas revisadas, notificaciones creadas y duración en segundos
+    """
+    inicio = time.monotonic()
+
     # Obtener el tipo de notificación
     tipo, _ = TipoNotificacion.objects.get_or_create(
         codigo="medida_proxima_vencer",
@@ -146,54 +202,65 @@ def verificar_medidas_proximas_vencer():
         fecha_termino__lte=en_30_dias,
         estado__in=['pendiente', 'en_proceso']
     )
+    medidas = {m.id: m for m in medidas_proximas.only(
+        'id', 'codigo', 'nombre', 'fecha_termino', 'porcentaje_avance'
+    )}
 
-    for medida in medidas_proximas:
-        # Notificar a los organismos responsables
-        for asignacion in medida.asignaciones.all():
-            usuarios_organismo = asignacion.organismo.usuarios.all()
-
-            for usuario in usuarios_organismo:
-                # Verificar si ya existe una notificación similar no leída
-                notif_existente = Notificacion.objects.filter(
-                    tipo=tipo,
-                    usuario=usuario,
-                    medida=medida,
-                    leida=False
-                ).exists()
-
-                if not notif_existente:
-                    dias_restantes = (medida.fecha_termino - hoy).days
-                    Notificacion.objects.create(
-                        tipo=tipo,
-                        usuario=usuario,
-                        titulo=f"Medida próxima a vencer: {medida.codigo}",
-                        mensaje=f"La medida '{medida.nombre}' vence en {dias_restantes} días. " +
-                                f"El avance actual es del {medida.porcentaje_avance}%.",
-                        medida=medida,
-                        organismo=asignacion.organismo,
-                        enlace=f"/medidas/{medida.id}/"
-                    )
-
-        # Notificar también a los administradores SMA
-        from apps.usuarios.models import Usuario
-        admins_sma = Usuario.objects.filter(rol='admin_sma')
+    # Notificación sin leer del mismo tipo para el par (usuario, medida)
+    def sin_notificacion_pendiente(usuario_ref, medida_ref):
+        return ~Exists(Notificacion.objects.filter(
+            tipo=tipo, usuario_id=OuterRef(usuario_ref), medida_id=OuterRef(medida_ref), leida=False
+        ))
+
+    # Usuarios de los organismos responsables
+    pares_organismos = AsignacionMedida.objects.filter(
+        medida__in=medidas_proximas
+    ).annotate(
+        usuario_id=F('organismo__usuarios__id')
+    ).filter(
+        sin_notificacion_pendiente('usuario_id', 'medida_id'),
+        usuario_id__isnull=False,
+    ).values_list('medida_id', 'usuario_id', 'organismo_id')
+
+    pares = {}
+    for medida_id, usuario_id, organismo_id in pares_organismos:
+        pares.setdefault((medida_id, usuario_id), organismo_id)
+
+    # Administradores SMA: todas las medidas próximas menos los pares ya notificados sin leer
+    admins = Usuario.objects.filter(rol='admin_sma')
+    notificados = set(Notificacion.objects.filter(
+        tipo=tipo, usuario__in=admins, medida__in=medidas_proximas, leida=False
+    ).values_list('medida_id', 'usuario_id'))
+    for usuario_id in admins.values_list('id', flat=True):
+        for medida_id in medidas:
+            if (medida_id, usuario_id) not in notificados:
+                pares.setdefault((medida_id, usuario_id), None)
+
+    usuarios = Usuario.objects.in_bulk({usuario_id for _, usuario_id in pares})
+    nuevas = []
+    for (medida_id, usuario_id), organismo_id in pares.items():
+        medida = medidas[medida_id]
+        dias_restantes = (medida.fecha_termino - hoy).days
+        nuevas.append(Notificacion(
+            tipo=tipo,
+            usuario=usuarios[usuario_id],
+            titulo=f"Medida próxima a vencer: {medida.codigo}",
+            mensaje=f"La medida '{medida.nombre}' vence en {dias_restantes} días. " +
+                    f"El avance actual es del {medida.porcentaje_avance}%.",
+            medida=medida,
+            organismo_id=organismo_id,
+            enlace=f"/medidas/{medida.id}/"
+        ))
+
+    with transaction.atomic():
+        Notificacion.objects.bulk_create(nuevas, batch_size=500)
+        NotificacionService.notificaciones_creadas(nuevas)
+        correos = NotificacionService.encolar_emails(nuevas)
 
-        for admin in admins_sma:
-            notif_existente = Notificacion.objects.filter(
-                tipo=tipo,
-                usuario=admin,
-                medida=medida,
-                leida=False
-            ).exists()
-
-            if not notif_existente:
-                dias_restantes = (medida.fecha_termino - hoy).days
-                Notificacion.objects.create(
-                    tipo=tipo,
-                    usuario=admin,
-                    titulo=f"Medida próxima a vencer: {medida.codigo}",
-                    mensaje=f"La medida '{medida.nombre}' vence en {dias_restantes} días. " +
-                            f"El avance actual es del {medida.porcentaje_avance}%.",
-                    medida=medida,
-                    enlace=f"/medidas/{medida.id}/"
-                )
\ No newline at end of file
+    return {
+        'medidas': len(medidas),
+        'notificaciones_organismos': sum(1 for n in nuevas if n.organismo_id),
+        'notificaciones_admins': sum(1 for n in nuevas if not n.organismo_id),
+        'correos': len(correos),
+        'segundos': round(time.monotonic() - inicio, 3),
+    }
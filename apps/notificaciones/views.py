@@ -82,6 +82,7 @@ class MarcarTodasLeidasView(LoginRequiredMixin, View):
 
         if cantidad > 0:
             notificaciones.update(leida=True, fecha_lectura=timezone.now())
+            NotificacionService.reiniciar_contador(request.user.id, 0)
             messages.success(request, _(f'{cantidad} notificaciones marcadas como leídas.'))
         else:
             messages.info(request, _('No hay notificaciones pendientes por leer.'))
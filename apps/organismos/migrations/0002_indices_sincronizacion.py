@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organismos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='organismo',
+            index=models.Index(fields=['updated_at'], name='organismo_updated_at_idx'),
+        ),
+    ]
@@ -51,6 +51,10 @@ class Organismo(models.Model):
         verbose_name = _("Organismo")
         verbose_name_plural = _("Organismos")
         ordering = ['nombre']
+        indexes = [
+            # Sincronización incremental por fecha de modificación
+            models.Index(fields=['updated_at'], name='organismo_updated_at_idx'),
+        ]
 
     def __str__(self):
         return self.nombre
@@ -1,25 +1,22 @@
 from django.shortcuts import render
-from django.db.models import Avg, Count
-from apps.medidas.models import Componente, Medida
+from apps.medidas.services import EstadisticaService
 
 
 def inicio_portal(request):
-    # Obtener datos resumidos para el portal público
-    total_medidas = Medida.objects.count()
-    avance_global = Medida.objects.aggregate(
-        promedio=Avg('porcentaje_avance')
-    )['promedio'] or 0
+    # Obtener datos resumidos para el portal público desde el snapshot de estadísticas
+    estadisticas = EstadisticaService.obtener_resumen()
+    total_medidas = estadisticas['global']['total_medidas']
+    avance_global = estadisticas['global']['avance_promedio']
 
     # Avance por componente
-    componentes = Componente.objects.filter(activo=True).annotate(
-        total_medidas=Count('medidas'),
-        avance_promedio=Avg('medidas__porcentaje_avance')
-    )
+    componentes = [c for c in estadisticas['componentes'] if c['activo']]
 
     # Estado de las medidas
-    estados = Medida.objects.values('estado').annotate(
-        total=Count('id')
-    ).order_by('estado')
+    estados = [
+        {'estado': e['estado'], 'total': e['total_medidas']}
+        for e in sorted(estadisticas['estados'], key=lambda e: e['estado'])
+        if e['total_medidas']
+    ]
 
     return render(request, 'publico/inicio.html', {
         'total_medidas': total_medidas,
@@ -1,6 +1,6 @@
 # apps/reportes/admin.py
 from django.contrib import admin
-from .models import TipoReporte, ReporteGenerado
+from .models import TipoReporte, ReporteGenerado, TrabajoReporte
 
 @admin.register(TipoReporte)
 class TipoReporteAdmin(admin.ModelAdmin):
@@ -10,8 +10,16 @@ class TipoReporteAdmin(admin.ModelAdmin):
 
 @admin.register(ReporteGenerado)
 class ReporteGeneradoAdmin(admin.ModelAdmin):
-    list_display = ('titulo', 'tipo_reporte', 'usuario', 'fecha_generacion', 'organismo')
-    list_filter = ('tipo_reporte', 'fecha_generacion', 'organismo')
+    list_display = ('titulo', 'tipo_reporte', 'formato', 'usuario', 'fecha_generacion', 'organismo')
+    list_filter = ('tipo_reporte', 'formato', 'fecha_generacion', 'organismo')
     search_fields = ('titulo', 'usuario__username', 'organismo__nombre')
     date_hierarchy = 'fecha_generacion'
-    readonly_fields = ('fecha_generacion', 'archivo', 'parametros')
\ No newline at end of file
+    readonly_fields = ('fecha_generacion', 'archivo', 'parametros', 'huella_parametros', 'version_datos')
+
+@admin.register(TrabajoReporte)
+class TrabajoReporteAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'usuario', 'estado', 'created_at', 'fecha_fin')
+    list_filter = ('estado', 'tipo_reporte')
+    search_fields = ('titulo', 'usuario__username')
+    readonly_fields = ('created_at', 'fecha_inicio', 'fecha_fin', 'vencimiento', 'intentos', 'parametros', 'reporte',
+                       'error')
@@ -0,0 +1,153 @@
+"""
+Carga de los datos de cada tipo de reporte.
+
+Cada cargador obtiene todos los datos de un reporte con un número fijo de
+consultas, independiente de la cantidad de medidas, y los entrega como dicts y
+listas simples. Los constructores de PDF (``apps.reportes.pdf``) son funciones
+puras de estos datos, que también pueden reutilizarse para otros formatos.
+"""
+from django.db.models import Avg, Count, F, Sum, Window
+from django.db.models.functions import RowNumber
+
+from apps.medidas.models import Componente, Medida, RegistroAvance
+from apps.organismos.models import Organismo
+
+# Últimos registros de avance incluidos en el reporte de un organismo
+ULTIMOS_REGISTROS = 10
+
+NOMBRES_ESTADO = dict(Medida.ESTADO_CHOICES)
+COLUMNAS_MEDIDA = ['id', 'codigo', 'nombre', 'estado', 'porcentaje_avance']
+
+
+def _resumen(medidas):
+    """Totales de una lista de medidas (dicts con ``estado`` y ``porcentaje_avance``)."""
+    total = len(medidas)
+    return {
+        'total_medidas': total,
+        'medidas_completadas': sum(1 for medida in medidas if medida['estado'] == 'completada'),
+        'avance_promedio': sum(medida['porcentaje_avance'] for medida in medidas) / total if total else 0,
+    }
+
+
+def _medida(fila):
+    fila['estado_nombre'] = str(NOMBRES_ESTADO.get(fila['estado'], fila['estado']))
+    return fila
+
+
+class CargadorDatosReporte:
+    @staticmethod
+    def cargar(tipo, parametros):
+        """
+        Datos del reporte del tipo indicado, o None si falta el organismo o componente.
+
+        Args:
+            tipo: ``TipoReporte.tipo`` ('general', 'organismo' o 'componente')
+            parametros: parámetros del ``ReporteGenerado``
+        """
+        if tipo == 'general':
+            return CargadorDatosReporte.general()
+        if tipo == 'organismo':
+            return CargadorDatosReporte.organismo(parametros.get('organismo_id'))
+        if tipo == 'componente':
+            return CargadorDatosReporte.componente(parametros.get('componente_id'))
+        return None
+
+    @staticmethod
+    def general():
+        """Resumen, distribución por estado y avance por componente (2 consultas)."""
+        estados = list(
+            Medida.objects.values('estado').annotate(
+                total=Count('id'), suma_avance=Sum('porcentaje_avance')
+            ).order_by('estado')
+        )
+        total = sum(estado['total'] for estado in estados)
+        suma_avance = sum(estado.pop('suma_avance') or 0 for estado in estados)
+        for estado in estados:
+            estado['nombre'] = str(NOMBRES_ESTADO.get(estado['estado'], estado['estado']))
+            estado['porcentaje'] = estado['total'] * 100 / total if total else 0
+
+        componentes = list(
+            Componente.objects.annotate(
+                total_medidas=Count('medidas'),
+                avance_promedio=Avg('medidas__porcentaje_avance')
+            ).order_by('-avance_promedio').values('id', 'nombre', 'codigo', 'total_medidas', 'avance_promedio')
+        )
+
+        return {
+            'resumen': {
+                'total_medidas': total,
+                'medidas_completadas': next((e['total'] for e in estados if e['estado'] == 'completada'), 0),
+                'avance_promedio': suma_avance / total if total else 0,
+            },
+            'estados': estados,
+            'componentes': componentes,
+        }
+
+    @staticmethod
+    def organismo(organismo_id):
+        """Ficha del organismo, sus medidas y últimos registros de avance (3 consultas)."""
+        if not organismo_id:
+            return None
+        return CargadorDatosReporte.organismos([organismo_id]).get(int(organismo_id))
+
+    @staticmethod
+    def organismos(organismo_ids=None):
+        """
+        Datos del reporte de varios organismos, indexados por id (3 consultas en total).
+
+        Args:
+            organismo_ids: ids de los organismos; por defecto, todos los organismos activos
+        """
+        if organismo_ids is None:
+            consulta = Organismo.objects.filter(activo=True)
+        else:
+            consulta = Organismo.objects.filter(pk__in=organismo_ids)
+
+        datos = {}
+        for organismo in consulta.order_by('nombre').values(
+            'id', 'nombre', 'tipo__nombre', 'direccion', 'email_contacto'
+        ):
+            datos[organismo['id']] = {'organismo': organismo, 'medidas': [], 'registros': []}
+        if not datos:
+            return datos
+
+        # Una consulta para las medidas de todos los organismos, repartidas por responsable
+        for fila in Medida.objects.filter(responsables__in=list(datos)).order_by('codigo').values(
+            'responsables', *COLUMNAS_MEDIDA
+        ):
+            datos[fila.pop('responsables')]['medidas'].append(_medida(fila))
+
+        # Últimos registros de cada organismo, numerados por organismo en la misma consulta
+        for fila in RegistroAvance.objects.filter(organismo_id__in=list(datos)).annotate(
+            posicion=Window(
+                RowNumber(),
+                partition_by=F('organismo_id'),
+                order_by=[F('fecha_registro').desc(), F('id').desc()],
+            )
+        ).filter(posicion__lte=ULTIMOS_REGISTROS).order_by('organismo_id', 'posicion').values(
+            'organismo_id', 'fecha_registro', 'medida__codigo', 'porcentaje_avance', 'descripcion'
+        ):
+            datos[fila.pop('organismo_id')]['registros'].append(fila)
+
+        for organismo in datos.values():
+            organismo['resumen'] = _resumen(organismo['medidas'])
+        return datos
+
+    @staticmethod
+    def componente(componente_id):
+        """Datos del componente y sus medidas (2 consultas)."""
+        if not componente_id:
+            return None
+        componente = Componente.objects.filter(pk=componente_id).values('id', 'nombre', 'codigo', 'descripcion').first()
+        if componente is None:
+            return None
+
+        medidas = [
+            _medida(fila) for fila in
+            Medida.objects.filter(componente_id=componente_id).order_by('codigo').values(*COLUMNAS_MEDIDA)
+        ]
+        return {
+            'componente': componente,
+            'resumen': _resumen(medidas),
+            'medidas': medidas,
+        }
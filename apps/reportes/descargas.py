@@ -0,0 +1,139 @@
+"""
+Entrega de los archivos de reportes.
+
+El archivo se transmite por bloques (nunca se carga completo en memoria), con
+``Content-Length``, ``ETag``/``If-None-Match`` y solicitudes ``Range`` de un
+solo rango. Con ``REPORTES_DESCARGA_SERVIDOR`` la lectura la hace el servidor
+web (X-Sendfile o X-Accel-Redirect) y Django solo responde los encabezados.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import content_disposition_header
+
+# Bytes leídos del almacenamiento por cada bloque transmitido
+TAMANO_BLOQUE = 64 * 1024
+
+RANGO = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def nombre_descarga(reporte):
+    """Nombre con que se descarga el archivo del reporte: ``reporte_<tipo>_<id>.<extensión>``."""
+    extension = os.path.splitext(reporte.archivo.name)[1] or '.pdf'
+    return f"reporte_{reporte.tipo_reporte.tipo}_{reporte.id}{extension}"
+
+
+def calcular_etag(archivo, tamano):
+    """Los archivos de reportes no se sobrescriben: el nombre y el tamaño identifican el contenido."""
+    return '"%s"' % hashlib.sha1(f"{archivo.name}:{tamano}".encode('utf-8')).hexdigest()
+
+
+def _etags_solicitados(request):
+    # GZipMiddleware debilita el ETag (W/"..."): se compara sin el prefijo
+    encabezado = request.META.get('HTTP_IF_NONE_MATCH', '')
+    return {etag.strip().removeprefix('W/') for etag in encabezado.split(',') if etag.strip()}
+
+
+def _rango_solicitado(request, tamano, etag):
+    """
+    Rango pedido como ``(inicio, fin)`` inclusivo, ``None`` si se debe enviar el
+    archivo completo o ``False`` si el rango no se puede satisfacer.
+    """
+    coincidencia = RANGO.match(request.META.get('HTTP_RANGE', '').replace(' ', ''))
+    if coincidencia is None:
+        # Sin Range, con varios rangos o con otra unidad se responde el archivo completo
+        return None
+    si_rango = request.META.get('HTTP_IF_RANGE')
+    if si_rango and si_rango.strip() != etag:
+        return None
+
+    inicio, fin = coincidencia.groups()
+    if not inicio and not fin:
+        return None
+    if not inicio:
+        # bytes=-N: los últimos N bytes
+        largo = int(fin)
+        if largo == 0:
+            return False
+        return max(tamano - largo, 0), tamano - 1
+    inicio = int(inicio)
+    fin = min(int(fin), tamano - 1) if fin else tamano - 1
+    if inicio >= tamano or fin < inicio:
+        return False
+    return inicio, fin
+
+
+def _leer_rango(archivo, inicio, largo):
+    with archivo.open('rb') as contenido:
+        contenido.seek(inicio)
+        while largo > 0:
+            bloque = contenido.read(min(TAMANO_BLOQUE, largo))
+            if not bloque:
+                break
+            largo -= len(bloque)
+            yield bloque
+
+
+def _ruta_servidor(archivo):
+    """Encabezado y valor para que el servidor web entregue el archivo, o None si no corresponde."""
+    modo = getattr(settings, 'REPORTES_DESCARGA_SERVIDOR', '')
+    if modo == 'x-accel-redirect':
+        prefijo = getattr(settings, 'REPORTES_DESCARGA_PREFIJO', '/protegido/')
+        return 'X-Accel-Redirect', prefijo.rstrip('/') + '/' + quote(archivo.name)
+    if modo == 'x-sendfile':
+        try:
+            return 'X-Sendfile', archivo.path
+        except NotImplementedError:
+            # Almacenamiento sin rutas locales: lo transmite Django
+            return None
+    return None
+
+
+def respuesta_descarga(request, reporte):
+    """Respuesta HTTP que entrega el archivo del reporte como adjunto."""
+    archivo = reporte.archivo
+    nombre = nombre_descarga(reporte)
+    tipo_contenido = mimetypes.guess_type(nombre)[0] or 'application/octet-stream'
+    try:
+        tamano = archivo.size
+    except FileNotFoundError:
+        raise Http404("El archivo del reporte no está en el almacenamiento.")
+    etag = calcular_etag(archivo, tamano)
+
+    if etag in _etags_solicitados(request):
+        response = HttpResponseNotModified()
+    elif (ruta := _ruta_servidor(archivo)) is not None:
+        # El servidor web lee el archivo y atiende los rangos
+        response = HttpResponse(content_type=tipo_contenido)
+        response[ruta[0]] = ruta[1]
+        response['Content-Disposition'] = content_disposition_header(True, nombre)
+    else:
+        rango = _rango_solicitado(request, tamano, etag)
+        if rango is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{tamano}'
+        elif rango is None:
+            response = FileResponse(
+                archivo.open('rb'), as_attachment=True, filename=nombre, content_type=tipo_contenido
+            )
+            response.block_size = TAMANO_BLOQUE
+            response['Content-Length'] = tamano
+        else:
+            inicio, fin = rango
+            response = StreamingHttpResponse(
+                _leer_rango(archivo, inicio, fin - inicio + 1), status=206, content_type=tipo_contenido
+            )
+            response['Content-Range'] = f'bytes {inicio}-{fin}/{tamano}'
+            response['Content-Length'] = fin - inicio + 1
+            response['Content-Disposition'] = content_disposition_header(True, nombre)
+
+    response['ETag'] = etag
+    response['Accept-Ranges'] = 'bytes'
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,119 @@
+import threading
+
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.shapes import Drawing
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import TableStyle
+
+# Nombres y colores de los estados de una medida en los gráficos
+NOMBRES_ESTADO = {
+    'pendiente': 'Pendiente',
+    'en_proceso': 'En Proceso',
+    'completada': 'Completada',
+    'retrasada': 'Retrasada',
+    'suspendida': 'Suspendida',
+}
+COLORES_ESTADO = {
+    'pendiente': colors.lavender,
+    'en_proceso': colors.lightblue,
+    'completada': colors.lightgreen,
+    'retrasada': colors.pink,
+    'suspendida': colors.lightgrey,
+}
+
+
+class TemaReporte:
+    """
+    Estilos de párrafo, estilos de tabla y plantillas de gráficos de los reportes PDF.
+
+    Se construye una vez por proceso (ver ``obtener_tema``) y lo comparten todos
+    los reportes, por lo que sus objetos se usan solo para lectura: los
+    constructores de reportes no deben modificarlos ni agregar estilos.
+    """
+
+    pagina = letter
+    margen = 72
+
+    def __init__(self, color_encabezado=colors.lightblue, color_filas=colors.beige):
+        self.estilos = getSampleStyleSheet()
+        self.estilos.add(ParagraphStyle(
+            name='Titulo',
+            parent=self.estilos['Heading1'],
+            fontSize=18,
+            spaceAfter=12
+        ))
+        self.estilos.add(ParagraphStyle(
+            name='Subtitulo',
+            parent=self.estilos['Heading2'],
+            fontSize=14,
+            spaceAfter=8
+        ))
+
+        # Encabezado destacado y grilla; el contenido se centra solo en ``tabla_centrada``
+        self.tabla = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), color_encabezado),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), color_filas),
+        ])
+        self.tabla_centrada = TableStyle([('ALIGN', (0, 0), (-1, -1), 'CENTER')], parent=self.tabla)
+        self._columna_centrada = {}
+        self._bloqueo = threading.Lock()
+
+    def tabla_columna_centrada(self, columna):
+        """Estilo ``tabla`` con una columna de datos centrada (se crea una vez por columna)."""
+        estilo = self._columna_centrada.get(columna)
+        if estilo is None:
+            with self._bloqueo:
+                estilo = self._columna_centrada.setdefault(
+                    columna, TableStyle([('ALIGN', (columna, 1), (columna, -1), 'CENTER')], parent=self.tabla)
+                )
+        return estilo
+
+    @staticmethod
+    def grafico_estados(conteos):
+        """
+        Gráfico de torta de medidas por estado.
+
+        Args:
+            conteos: pares ``(estado, total)``
+        """
+        conteos = list(conteos)
+        drawing = Drawing(400, 200)
+        pie = Pie()
+        pie.x = 150
+        pie.y = 50
+        pie.width = 100
+        pie.height = 100
+        pie.data = [total for _, total in conteos]
+        pie.labels = [NOMBRES_ESTADO.get(estado, estado) for estado, _ in conteos]
+        pie.slices.strokeWidth = 0.5
+        for indice, (estado, _) in enumerate(conteos):
+            pie.slices[indice].fillColor = COLORES_ESTADO.get(estado, colors.white)
+        drawing.add(pie)
+        return drawing
+
+
+# Temas disponibles; cada uno se construye la primera vez que se usa en el proceso
+TEMAS = {
+    'sma': TemaReporte,
+}
+
+_temas = {}
+_bloqueo_temas = threading.Lock()
+
+
+def obtener_tema(nombre='sma'):
+    """Retorna el tema compartido del proceso, construyéndolo la primera vez."""
+    tema = _temas.get(nombre)
+    if tema is None:
+        with _bloqueo_temas:
+            tema = _temas.get(nombre)
+            if tema is None:
+                tema = _temas[nombre] = TEMAS[nombre]()
+    return tema
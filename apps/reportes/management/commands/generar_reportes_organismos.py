@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.reportes.models import TipoReporte
+from apps.reportes.services import ReporteService
+
+
+class Command(BaseCommand):
+    help = 'Genera el reporte de cada organismo activo en una sola pasada (cierre de período)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', required=True, help='Nombre de usuario que genera los reportes')
+        parser.add_argument('--tipo', type=int, help='ID del tipo de reporte (por defecto, el primero de tipo organismo)')
+        parser.add_argument('--organismos', type=int, nargs='+', help='IDs de los organismos (por defecto, todos los activos)')
+        parser.add_argument('--titulo', help='Título base; se le agrega el nombre de cada organismo')
+        parser.add_argument('--workers', type=int, default=2, help='Número de procesos worker para construir los archivos')
+        parser.add_argument('--formato', default='pdf', choices=[formato for formato, _ in TipoReporte.FORMATO_CHOICES],
+                            help='Formato de los archivos')
+
+    def handle(self, *args, **options):
+        Usuario = get_user_model()
+        try:
+            usuario = Usuario.objects.get(username=options['usuario'])
+        except Usuario.DoesNotExist:
+            raise CommandError(f"No existe el usuario '{options['usuario']}'")
+
+        tipos = TipoReporte.objects.filter(tipo='organismo')
+        tipo_reporte = tipos.filter(pk=options['tipo']).first() if options['tipo'] else tipos.order_by('pk').first()
+        if tipo_reporte is None:
+            raise CommandError('No existe un tipo de reporte por organismo con ese ID')
+
+        resumen = ReporteService.generar_reportes_organismos(
+            usuario, tipo_reporte.id,
+            organismo_ids=options['organismos'],
+            titulo=options['titulo'],
+            procesos=max(1, options['workers']),
+            formato=options['formato'],
+        )
+        if resumen is None:
+            raise CommandError(f"El usuario '{usuario.username}' no puede generar reportes por organismo en lote")
+
+        self.stdout.write(f"Reportes guardados: {len(resumen['reportes'])} "
+                          f"({resumen['generados']} generados, {resumen['reutilizados']} reutilizados)")
+        self.stdout.write(self.style.SUCCESS(
+            f"{resumen['segundos']:.2f} s, {resumen['reportes_por_segundo']:.1f} reportes/s"
+        ))
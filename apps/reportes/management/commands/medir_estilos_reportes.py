@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.reportes.estilos import TemaReporte, obtener_tema
+
+# Conteos de ejemplo para el gráfico de estados
+CONTEOS = [('pendiente', 12), ('en_proceso', 30), ('completada', 25), ('retrasada', 4)]
+
+
+class Command(BaseCommand):
+    help = ('Mide el costo de preparar estilos y gráficos por reporte: construyéndolos en cada '
+            'reporte (comportamiento anterior) y con el tema compartido del proceso')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reportes', type=int, default=500, help='Reportes simulados por medición')
+
+    def handle(self, *args, **options):
+        reportes = max(1, options['reportes'])
+
+        def por_reporte(tema):
+            tema.tabla_columna_centrada(3)
+            tema.grafico_estados(CONTEOS)
+
+        # Antes: estilos construidos en cada reporte. Ambas mediciones usan la misma
+        # configuración de ReportLab, así la diferencia es solo la del tema compartido
+        sin_cache = self._medir(reportes, lambda: por_reporte(TemaReporte()))
+        obtener_tema()
+        con_cache = self._medir(reportes, lambda: por_reporte(obtener_tema()))
+
+        self.stdout.write(f"Reportes simulados: {reportes}")
+        self.stdout.write(f"Construyendo el tema en cada reporte: {sin_cache * 1000:.3f} ms por reporte")
+        self.stdout.write(f"Con el tema compartido: {con_cache * 1000:.3f} ms por reporte")
+        self.stdout.write(self.style.SUCCESS(f"Mejora: {sin_cache / con_cache:.1f}x"))
+
+    @staticmethod
+    def _medir(reportes, preparar):
+        inicio = time.perf_counter()
+        for _ in range(reportes):
+            preparar()
+        return (time.perf_counter() - inicio) / reportes
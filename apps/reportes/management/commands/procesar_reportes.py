@@ -0,0 +1,78 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from apps.reportes import workers
+from apps.reportes.models import TrabajoReporte
+from apps.reportes.services import ReporteService
+
+
+class Command(BaseCommand):
+    help = 'Procesa la cola de reportes con un pool de procesos worker'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Número de procesos worker')
+        parser.add_argument('--intervalo', type=float, default=2.0,
+                            help='Segundos de espera cuando la cola está vacía')
+        parser.add_argument('--una-vez', action='store_true',
+                            help='Procesar los trabajos en cola y terminar')
+
+    def handle(self, *args, **options):
+        num_workers = max(1, options['workers'])
+        intervalo = options['intervalo']
+        una_vez = options['una_vez']
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Iniciando procesamiento de reportes con {num_workers} worker(s)...'
+        ))
+
+        en_curso = {}
+        procesados = 0
+
+        with ProcessPoolExecutor(max_workers=num_workers, mp_context=workers.contexto(),
+                                 initializer=workers.inicializar_worker) as pool:
+            while True:
+                # Reservas: se renuevan las propias y vuelven a la cola las de workers caídos
+                ReporteService.renovar_reservas(list(en_curso.values()))
+                recuperados = ReporteService.recuperar_trabajos_vencidos()
+                if recuperados['reencolados'] or recuperados['fallidos']:
+                    self.stdout.write(self.style.WARNING(
+                        f"Reservas vencidas: {recuperados['reencolados']} reencolado(s), "
+                        f"{recuperados['fallidos']} fallido(s)"
+                    ))
+
+                # Mantener el pool ocupado sin reclamar más trabajos de los que puede atender
+                capacidad = num_workers * 2 - len(en_curso)
+                if capacidad > 0:
+                    pendientes = list(TrabajoReporte.objects.filter(estado='pendiente').order_by(
+                        'created_at'
+                    ).values_list('id', flat=True)[:capacidad])
+                    for trabajo_id in pendientes:
+                        if ReporteService.reclamar_trabajo(trabajo_id):
+                            en_curso[pool.submit(workers.ejecutar_trabajo, trabajo_id)] = trabajo_id
+
+                if not en_curso:
+                    if una_vez:
+                        break
+                    close_old_connections()
+                    time.sleep(intervalo)
+                    continue
+
+                terminados, _ = wait(list(en_curso), timeout=intervalo, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    trabajo_id = en_curso.pop(futuro)
+                    try:
+                        _, estado = futuro.result()
+                    except Exception as e:
+                        # El worker murió o falló antes de registrar el resultado
+                        estado = 'fallido'
+                        TrabajoReporte.objects.filter(pk=trabajo_id).update(
+                            estado=estado, error=str(e), fecha_fin=timezone.now(), vencimiento=None
+                        )
+                    procesados += 1
+                    self.stdout.write(f'Trabajo {trabajo_id}: {estado}')
+
+        self.stdout.write(self.style.SUCCESS(f'Procesamiento finalizado. Trabajos procesados: {procesados}'))
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrabajoReporte',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('titulo', models.CharField(blank=True, max_length=200, verbose_name='Título')),
+                ('parametros', models.JSONField(blank=True, default=dict, verbose_name='Parámetros')),
+                ('estado', models.CharField(choices=[('pendiente', 'En cola'), ('en_proceso', 'En proceso'), ('completado', 'Completado'), ('fallido', 'Fallido')], default='pendiente', max_length=20, verbose_name='Estado')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True, verbose_name='Inicio de procesamiento')),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True, verbose_name='Fin de procesamiento')),
+                ('reporte', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trabajos', to='reportes.reportegenerado', verbose_name='Reporte generado')),
+                ('tipo_reporte', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trabajos', to='reportes.tiporeporte', verbose_name='Tipo de reporte')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trabajos_reporte', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Trabajo de Reporte',
+                'verbose_name_plural': 'Trabajos de Reportes',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['estado', 'created_at'], name='reportes_tr_estado_30fc36_idx')],
+            },
+        ),
+    ]
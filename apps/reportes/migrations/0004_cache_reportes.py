@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medidas', '0003_estadisticaplan'),
+        ('organismos', '0001_initial'),
+        ('reportes', '0003_trabajoreporte'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportegenerado',
+            name='huella_parametros',
+            field=models.CharField(blank=True, max_length=64, verbose_name='Huella de parámetros'),
+        ),
+        migrations.AddField(
+            model_name='reportegenerado',
+            name='version_datos',
+            field=models.CharField(blank=True, max_length=64, verbose_name='Versión de datos'),
+        ),
+        migrations.AddIndex(
+            model_name='reportegenerado',
+            index=models.Index(fields=['huella_parametros', 'version_datos'], name='reportes_re_huella__638b65_idx'),
+        ),
+    ]
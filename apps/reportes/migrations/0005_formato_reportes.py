@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0004_cache_reportes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportegenerado',
+            name='formato',
+            field=models.CharField(choices=[('pdf', 'PDF'), ('xlsx', 'Excel (XLSX)'), ('csv', 'CSV')], default='pdf', max_length=10, verbose_name='Formato'),
+        ),
+    ]
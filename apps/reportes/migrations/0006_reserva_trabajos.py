@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0005_formato_reportes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajoreporte',
+            name='intentos',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Intentos'),
+        ),
+        migrations.AddField(
+            model_name='trabajoreporte',
+            name='vencimiento',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Vencimiento de la reserva'),
+        ),
+        migrations.AddIndex(
+            model_name='trabajoreporte',
+            index=models.Index(fields=['estado', 'vencimiento'], name='reportes_tr_estado_4ca8b5_idx'),
+        ),
+    ]
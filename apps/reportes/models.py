@@ -15,6 +15,13 @@ class TipoReporte(models.Model):
         ('componente', _('Reporte por Componente')),
     ]
 
+    # Formatos en que se puede generar cualquier tipo de reporte
+    FORMATO_CHOICES = [
+        ('pdf', _('PDF')),
+        ('xlsx', _('Excel (XLSX)')),
+        ('csv', _('CSV')),
+    ]
+
     nombre = models.CharField(_("Nombre"), max_length=100)
     descripcion = models.TextField(_("Descripción"))
     tipo = models.CharField(_("Tipo"), max_length=20, choices=TIPO_CHOICES)
@@ -54,12 +61,18 @@ class ReporteGenerado(models.Model):
     )
 
     titulo = models.CharField(_("Título"), max_length=200)
+    formato = models.CharField(_("Formato"), max_length=10, choices=TipoReporte.FORMATO_CHOICES, default='pdf')
     fecha_generacion = models.DateTimeField(_("Fecha de generación"), auto_now_add=True)
 
     # Parámetros usados para generar el reporte
     parametros = models.JSONField(_("Parámetros"), default=dict, blank=True)
 
-    # El archivo PDF generado
+    # Caché de contenido: un reporte con la misma huella de parámetros y la misma
+    # versión de los datos reutiliza el archivo ya generado
+    huella_parametros = models.CharField(_("Huella de parámetros"), max_length=64, blank=True)
+    version_datos = models.CharField(_("Versión de datos"), max_length=64, blank=True)
+
+    # El archivo generado (PDF, XLSX o CSV según el formato)
     archivo = models.FileField(_("Archivo"), upload_to='reportes/%Y/%m/')
 
     # Referencias opcionales a entidades relacionadas
@@ -85,6 +98,66 @@ class ReporteGenerado(models.Model):
         verbose_name = _("Reporte Generado")
         verbose_name_plural = _("Reportes Generados")
         ordering = ['-fecha_generacion']
+        indexes = [
+            models.Index(fields=['huella_parametros', 'version_datos']),
+        ]
+
+    def __str__(self):
+        return f"{self.titulo} - {self.fecha_generacion.strftime('%d/%m/%Y')}"
+
+class TrabajoReporte(models.Model):
+    """
+    Solicitud de generación de reporte procesada en segundo plano
+    por los workers de ``procesar_reportes``.
+    """
+    ESTADO_CHOICES = [
+        ('pendiente', _('En cola')),
+        ('en_proceso', _('En proceso')),
+        ('completado', _('Completado')),
+        ('fallido', _('Fallido')),
+    ]
+
+    tipo_reporte = models.ForeignKey(
+        TipoReporte,
+        on_delete=models.CASCADE,
+        verbose_name=_("Tipo de reporte"),
+        related_name="trabajos"
+    )
+    usuario = models.ForeignKey(
+        Usuario,
+        on_delete=models.CASCADE,
+        verbose_name=_("Usuario"),
+        related_name="trabajos_reporte"
+    )
+    titulo = models.CharField(_("Título"), max_length=200, blank=True)
+    parametros = models.JSONField(_("Parámetros"), default=dict, blank=True)
+
+    estado = models.CharField(_("Estado"), max_length=20, choices=ESTADO_CHOICES, default='pendiente')
+    reporte = models.ForeignKey(
+        ReporteGenerado,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name=_("Reporte generado"),
+        related_name="trabajos"
+    )
+    error = models.TextField(_("Error"), blank=True)
+
+    created_at = models.DateTimeField(_("Fecha de creación"), auto_now_add=True)
+    fecha_inicio = models.DateTimeField(_("Inicio de procesamiento"), null=True, blank=True)
+    fecha_fin = models.DateTimeField(_("Fin de procesamiento"), null=True, blank=True)
+    # Reserva del worker que lo procesa: si vence sin renovarse (worker caído) el trabajo vuelve a la cola
+    vencimiento = models.DateTimeField(_("Vencimiento de la reserva"), null=True, blank=True)
+    intentos = models.PositiveSmallIntegerField(_("Intentos"), default=0)
+
+    class Meta:
+        verbose_name = _("Trabajo de Reporte")
+        verbose_name_plural = _("Trabajos de Reportes")
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['estado', 'created_at']),
+            models.Index(fields=['estado', 'vencimiento']),
+        ]
 
     def __str__(self):
-        return f"{self.titulo} - {self.fecha_generacion.strftime('%d/%m/%Y')}"
\ No newline at end of file
+        return f"{self.titulo or self.tipo_reporte.nombre} - {self.get_estado_display()}"
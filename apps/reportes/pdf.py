@@ -0,0 +1,205 @@
+"""
+Construcción de los reportes PDF.
+
+Son funciones puras de los datos que entrega ``CargadorDatosReporte`` y del
+encabezado del reporte (dict con ``titulo``, ``autor`` y ``fecha``): no
+consultan la base de datos.
+"""
+from io import BytesIO
+
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
+
+from .estilos import obtener_tema
+
+
+def _documento(buffer, tema):
+    return SimpleDocTemplate(
+        buffer,
+        pagesize=tema.pagina,
+        rightMargin=tema.margen, leftMargin=tema.margen,
+        topMargin=tema.margen, bottomMargin=tema.margen
+    )
+
+
+def _generacion(elements, styles, encabezado):
+    elements.append(
+        Paragraph(f"Fecha de generación: {encabezado['fecha'].strftime('%d/%m/%Y %H:%M')}", styles['Normal']))
+    elements.append(Paragraph(f"Generado por: {encabezado['autor']}", styles['Normal']))
+    elements.append(Spacer(1, 24))
+
+
+def _tabla_resumen(resumen, doc, tema, titulo_total):
+    data = [
+        ["Métrica", "Valor"],
+        [titulo_total, str(resumen['total_medidas'])],
+        ["Medidas Completadas", str(resumen['medidas_completadas'])],
+        ["Porcentaje de Avance", f"{resumen['avance_promedio']:.2f}%"]
+    ]
+    table = Table(data, colWidths=[doc.width / 2.0] * 2)
+    table.setStyle(tema.tabla)
+    return table
+
+
+def _tabla_medidas(medidas, doc, tema):
+    data = [["Código", "Nombre", "Estado", "Avance"]]
+    for medida in medidas:
+        data.append([
+            medida['codigo'],
+            medida['nombre'],
+            medida['estado_nombre'],
+            f"{medida['porcentaje_avance']:.2f}%"
+        ])
+    table = Table(data, colWidths=[doc.width * 0.15, doc.width * 0.45, doc.width * 0.2, doc.width * 0.2])
+    table.setStyle(tema.tabla_columna_centrada(3))
+    return table
+
+
+def reporte_general(datos, encabezado):
+    """Reporte general del plan de descontaminación"""
+    buffer = BytesIO()
+    tema = obtener_tema()
+    styles = tema.estilos
+    doc = _documento(buffer, tema)
+    elements = []
+
+    # Título del reporte
+    elements.append(Paragraph("REPORTE GENERAL DEL PLAN DE DESCONTAMINACIÓN", styles['Titulo']))
+    elements.append(Paragraph(f"{encabezado['titulo']}", styles['Subtitulo']))
+    elements.append(Spacer(1, 12))
+    _generacion(elements, styles, encabezado)
+
+    # Resumen general
+    elements.append(Paragraph("1. RESUMEN GENERAL", styles['Heading2']))
+    resumen = datos['resumen']
+    data = [
+        ["Métricas", "Valores"],
+        ["Total de Medidas", str(resumen['total_medidas'])],
+        ["Medidas Completadas", str(resumen['medidas_completadas'])],
+        ["Porcentaje de Avance Global", f"{resumen['avance_promedio']:.2f}%"]
+    ]
+    table = Table(data, colWidths=[doc.width / 2.0] * 2)
+    table.setStyle(tema.tabla)
+    elements.append(table)
+    elements.append(Spacer(1, 12))
+
+    # Distribución por estado
+    elements.append(Paragraph("2. DISTRIBUCIÓN POR ESTADO", styles['Heading2']))
+    elements.append(tema.grafico_estados((estado['estado'], estado['total']) for estado in datos['estados']))
+
+    data = [["Estado", "Cantidad", "Porcentaje"]]
+    for estado in datos['estados']:
+        data.append([estado['nombre'], estado['total'], f"{estado['porcentaje']:.2f}%"])
+    table = Table(data, colWidths=[doc.width / 3.0] * 3)
+    table.setStyle(tema.tabla_centrada)
+    elements.append(Spacer(1, 12))
+    elements.append(table)
+    elements.append(Spacer(1, 24))
+
+    # Avance por componente
+    elements.append(Paragraph("3. AVANCE POR COMPONENTE", styles['Heading2']))
+    data = [["Componente", "Medidas", "Avance"]]
+    for componente in datos['componentes']:
+        avance = componente['avance_promedio']
+        data.append([componente['nombre'], componente['total_medidas'], f"{avance:.2f}%" if avance else "0.00%"])
+    table = Table(data, colWidths=[doc.width / 2.0, doc.width / 4.0, doc.width / 4.0])
+    table.setStyle(tema.tabla_centrada)
+    elements.append(table)
+    elements.append(Spacer(1, 24))
+
+    doc.build(elements)
+    return buffer
+
+
+def reporte_organismo(datos, encabezado):
+    """Reporte de las medidas y avances de un organismo"""
+    buffer = BytesIO()
+    tema = obtener_tema()
+    styles = tema.estilos
+    doc = _documento(buffer, tema)
+    elements = []
+    organismo = datos['organismo']
+
+    # Título del reporte
+    elements.append(Paragraph(f"REPORTE DEL ORGANISMO: {organismo['nombre'].upper()}", styles['Titulo']))
+    elements.append(Spacer(1, 12))
+    _generacion(elements, styles, encabezado)
+
+    # Información del organismo
+    elements.append(Paragraph("1. INFORMACIÓN DEL ORGANISMO", styles['Heading2']))
+    data = [
+        ["Dato", "Valor"],
+        ["Nombre", organismo['nombre']],
+        ["Tipo", organismo['tipo__nombre'] or "No especificado"],
+        ["Dirección", organismo['direccion']],
+        ["Email de contacto", organismo['email_contacto']]
+    ]
+    table = Table(data, colWidths=[doc.width / 3.0, doc.width * 2 / 3.0])
+    table.setStyle(tema.tabla)
+    elements.append(table)
+    elements.append(Spacer(1, 24))
+
+    # Medidas asignadas
+    elements.append(Paragraph("2. MEDIDAS ASIGNADAS", styles['Heading2']))
+    if datos['medidas']:
+        elements.append(_tabla_resumen(datos['resumen'], doc, tema, "Total de Medidas Asignadas"))
+        elements.append(Spacer(1, 12))
+        elements.append(Paragraph("Detalle de Medidas Asignadas:", styles['Heading3']))
+        elements.append(_tabla_medidas(datos['medidas'], doc, tema))
+    else:
+        elements.append(Paragraph("No hay medidas asignadas a este organismo.", styles['Normal']))
+    elements.append(Spacer(1, 24))
+
+    # Últimos registros de avance
+    elements.append(Paragraph("3. ÚLTIMOS REGISTROS DE AVANCE", styles['Heading2']))
+    if datos['registros']:
+        data = [["Fecha", "Medida", "Avance", "Descripción"]]
+        for registro in datos['registros']:
+            descripcion = registro['descripcion']
+            data.append([
+                registro['fecha_registro'].strftime('%d/%m/%Y'),
+                registro['medida__codigo'],
+                f"{registro['porcentaje_avance']:.2f}%",
+                descripcion[:50] + ('...' if len(descripcion) > 50 else '')
+            ])
+        table = Table(data, colWidths=[doc.width * 0.15, doc.width * 0.15, doc.width * 0.15, doc.width * 0.55])
+        table.setStyle(tema.tabla_columna_centrada(2))
+        elements.append(table)
+    else:
+        elements.append(Paragraph("No hay registros de avance para este organismo.", styles['Normal']))
+
+    doc.build(elements)
+    return buffer
+
+
+def reporte_componente(datos, encabezado):
+    """Reporte de las medidas de un componente del plan"""
+    buffer = BytesIO()
+    tema = obtener_tema()
+    styles = tema.estilos
+    doc = _documento(buffer, tema)
+    elements = []
+
+    # Título del reporte
+    elements.append(Paragraph(f"REPORTE DEL COMPONENTE: {datos['componente']['nombre'].upper()}", styles['Titulo']))
+    elements.append(Spacer(1, 12))
+    _generacion(elements, styles, encabezado)
+
+    # Medidas del componente
+    elements.append(Paragraph("1. MEDIDAS DEL COMPONENTE", styles['Heading2']))
+    if datos['medidas']:
+        elements.append(_tabla_resumen(datos['resumen'], doc, tema, "Total de Medidas"))
+        elements.append(Spacer(1, 12))
+        elements.append(_tabla_medidas(datos['medidas'], doc, tema))
+    else:
+        elements.append(Paragraph("No hay medidas en este componente.", styles['Normal']))
+
+    doc.build(elements)
+    return buffer
+
+
+# Constructor de PDF de cada tipo de reporte
+CONSTRUCTORES = {
+    'general': reporte_general,
+    'organismo': reporte_organismo,
+    'componente': reporte_componente,
+}
@@ -0,0 +1,142 @@
+"""
+Reportes en formatos tabulares (XLSX y CSV).
+
+Se construyen con los mismos datos que los PDF (``CargadorDatosReporte``). Cada
+reporte es una lista de hojas ``(nombre, columnas, filas)`` con valores sin
+formatear, para que puedan filtrarse y sumarse en una planilla. Los textos que
+empiezan como una fórmula se escriben como texto, sin evaluarse.
+"""
+import csv
+import io
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+
+# Prefijos con los que Excel y LibreOffice interpretan una celda como fórmula.
+# También los usa la exportación CSV del API (apps.api.exportacion).
+PREFIJOS_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+def es_formula(valor):
+    return isinstance(valor, str) and valor.startswith(PREFIJOS_FORMULA)
+
+
+def escapar_formula(valor):
+    """Antepone ``'`` a los textos que una planilla evaluaría como fórmula (para CSV)."""
+    return f"'{valor}" if es_formula(valor) else valor
+
+
+def _celda_xlsx(hoja, valor):
+    """Celda de texto literal para los valores que openpyxl o la planilla tomarían como fórmula."""
+    if not es_formula(valor):
+        return valor
+    celda = WriteOnlyCell(hoja, value=valor)
+    celda.data_type = 's'
+    return celda
+
+
+def _hoja_resumen(resumen):
+    return ('Resumen', ['Métrica', 'Valor'], [
+        ['Total de Medidas', resumen['total_medidas']],
+        ['Medidas Completadas', resumen['medidas_completadas']],
+        ['Porcentaje de Avance', round(float(resumen['avance_promedio']), 2)],
+    ])
+
+
+def _hoja_medidas(medidas):
+    return ('Medidas', ['Código', 'Nombre', 'Estado', 'Avance (%)'], [
+        [medida['codigo'], medida['nombre'], medida['estado_nombre'], medida['porcentaje_avance']]
+        for medida in medidas
+    ])
+
+
+def hojas_general(datos):
+    return [
+        _hoja_resumen(datos['resumen']),
+        ('Estados', ['Estado', 'Cantidad', 'Porcentaje'], [
+            [estado['nombre'], estado['total'], round(estado['porcentaje'], 2)] for estado in datos['estados']
+        ]),
+        ('Componentes', ['Código', 'Componente', 'Medidas', 'Avance (%)'], [
+            [componente['codigo'], componente['nombre'], componente['total_medidas'],
+             round(componente['avance_promedio'] or 0, 2)]
+            for componente in datos['componentes']
+        ]),
+    ]
+
+
+def hojas_organismo(datos):
+    organismo = datos['organismo']
+    return [
+        ('Organismo', ['Dato', 'Valor'], [
+            ['Nombre', organismo['nombre']],
+            ['Tipo', organismo['tipo__nombre'] or 'No especificado'],
+            ['Dirección', organismo['direccion']],
+            ['Email de contacto', organismo['email_contacto']],
+        ]),
+        _hoja_resumen(datos['resumen']),
+        _hoja_medidas(datos['medidas']),
+        ('Registros', ['Fecha', 'Medida', 'Avance (%)', 'Descripción'], [
+            [registro['fecha_registro'], registro['medida__codigo'], registro['porcentaje_avance'],
+             registro['descripcion']]
+            for registro in datos['registros']
+        ]),
+    ]
+
+
+def hojas_componente(datos):
+    componente = datos['componente']
+    return [
+        ('Componente', ['Dato', 'Valor'], [
+            ['Código', componente['codigo']],
+            ['Nombre', componente['nombre']],
+            ['Descripción', componente['descripcion']],
+        ]),
+        _hoja_resumen(datos['resumen']),
+        _hoja_medidas(datos['medidas']),
+    ]
+
+
+# Hojas de cada tipo de reporte
+HOJAS = {
+    'general': hojas_general,
+    'organismo': hojas_organismo,
+    'componente': hojas_componente,
+}
+
+
+def reporte_xlsx(tipo, datos, encabezado):
+    """Libro XLSX con una hoja por tabla. El modo write_only escribe las filas sin mantenerlas en memoria."""
+    libro = Workbook(write_only=True)
+    libro.properties.title = encabezado['titulo']
+    libro.properties.creator = encabezado['autor']
+    libro.properties.created = encabezado['fecha']
+    for nombre, columnas, filas in HOJAS[tipo](datos):
+        hoja = libro.create_sheet(nombre)
+        hoja.append(columnas)
+        for fila in filas:
+            hoja.append([_celda_xlsx(hoja, valor) for valor in fila])
+
+    buffer = io.BytesIO()
+    libro.save(buffer)
+    return buffer
+
+
+def reporte_csv(tipo, datos, encabezado):
+    """CSV con las tablas una tras otra, cada una precedida por su nombre y separada por una línea vacía."""
+    texto = io.StringIO()
+    escritor = csv.writer(texto)
+    for indice, (nombre, columnas, filas) in enumerate(HOJAS[tipo](datos)):
+        if indice:
+            escritor.writerow([])
+        escritor.writerow([nombre])
+        escritor.writerow(columnas)
+        escritor.writerows([escapar_formula(valor) for valor in fila] for fila in filas)
+    # Con BOM para que Excel reconozca los acentos
+    return io.BytesIO(texto.getvalue().encode('utf-8-sig'))
+
+
+# Constructor de cada formato tabular
+CONSTRUCTORES = {
+    'xlsx': reporte_xlsx,
+    'csv': reporte_csv,
+}
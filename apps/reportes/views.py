@@ -1,4 +1,5 @@
 
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -8,7 +9,8 @@ from django.urls import reverse
 from django.contrib import messages
 from django.utils.translation import gettext_lazy as _
 
-from .models import TipoReporte, ReporteGenerado
+from .descargas import respuesta_descarga
+from .models import TipoReporte, ReporteGenerado, TrabajoReporte
 from .services import ReporteService
 from apps.organismos.models import Organismo
 from apps.medidas.models import Componente
@@ -49,6 +51,14 @@ class MisReportesListView(LoginRequiredMixin, ListView):
             usuario=self.request.user
         ).order_by('-fecha_generacion')
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Reportes solicitados que aún no terminan (o que fallaron recientemente)
+        context['trabajos'] = TrabajoReporte.objects.filter(
+            usuario=self.request.user
+        ).exclude(estado='completado').select_related('tipo_reporte')[:10]
+        return context
+
 
 @login_required
 def generar_reporte(request, tipo_id):
@@ -68,18 +78,37 @@ def generar_reporte(request, tipo_id):
         titulo = request.POST.get('titulo')
         organismo_id = request.POST.get('organismo')
         componente_id = request.POST.get('componente')
+        formato = request.POST.get('formato') or 'pdf'
 
         # Si es usuario de organismo, forzar su propio organismo
         if request.user.rol == 'organismo':
             organismo_id = request.user.organismo.id
 
+        # Encolar el reporte para que lo genere un worker
+        if settings.REPORTES_GENERACION_ASINCRONA:
+            trabajo = ReporteService.encolar_reporte(
+                usuario=request.user,
+                tipo_reporte_id=tipo_id,
+                titulo=titulo,
+                organismo_id=organismo_id if organismo_id else None,
+                componente_id=componente_id if componente_id else None,
+                formato=formato
+            )
+
+            if trabajo:
+                messages.success(request, _("El reporte quedó en cola y estará disponible en unos momentos."))
+                return redirect('reportes:mis_reportes')
+            messages.error(request, _("No tienes permiso para generar este reporte."))
+            return redirect('reportes:lista_tipos')
+
         # Generar el reporte
         reporte = ReporteService.generar_reporte(
             usuario=request.user,
             tipo_reporte_id=tipo_id,
             titulo=titulo,
             organismo_id=organismo_id if organismo_id else None,
-            componente_id=componente_id if componente_id else None
+            componente_id=componente_id if componente_id else None,
+            formato=formato
         )
 
         if reporte:
@@ -91,6 +120,7 @@ def generar_reporte(request, tipo_id):
     # Preparar datos para el formulario
     context = {
         'tipo_reporte': tipo_reporte,
+        'formatos': TipoReporte.FORMATO_CHOICES,
         'organismos': Organismo.objects.all() if request.user.rol != 'organismo' else None,
         'componentes': Componente.objects.all(),
     }
@@ -126,10 +156,5 @@ def descargar_reporte(request, pk):
         messages.error(request, _("El archivo no está disponible."))
         return redirect('reportes:detalle_reporte', pk=pk)
 
-    # Establecer el nombre del archivo para la descarga
-    filename = f"reporte_{reporte.tipo_reporte.tipo}_{reporte.id}.pdf"
-
-    response = HttpResponse(reporte.archivo.read(), content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-    return response
\ No newline at end of file
+    # Transmitir el archivo por bloques (o delegarlo al servidor web)
+    return respuesta_descarga(request, reporte)
@@ -0,0 +1,40 @@
+"""
+Puntos de entrada para los procesos worker de reportes.
+
+Los workers se crean con el método ``spawn`` (intérpretes nuevos, sin conexiones
+a la base de datos heredadas), por lo que este módulo no importa modelos a nivel
+de módulo: Django se inicializa en ``inicializar_worker``.
+"""
+import multiprocessing
+
+
+def contexto():
+    """Contexto de multiprocessing usado por los pools de reportes."""
+    return multiprocessing.get_context('spawn')
+
+
+def inicializar_worker():
+    import django
+    django.setup()
+
+    # El tema de los reportes se construye una vez por worker, antes del primer trabajo
+    from apps.reportes.estilos import obtener_tema
+    obtener_tema()
+
+
+def ejecutar_trabajo(trabajo_id):
+    from django.db import close_old_connections
+    from apps.reportes.services import ReporteService
+
+    close_old_connections()
+    trabajo = ReporteService.ejecutar_trabajo(trabajo_id)
+    return trabajo.id, trabajo.estado
+
+
+def renderizar_reporte(tipo, datos, encabezado, formato='pdf'):
+    """Construye el archivo de un reporte a partir de sus datos ya cargados; no consulta la base de datos."""
+    from apps.reportes import pdf, tablas
+
+    if formato == 'pdf':
+        return pdf.CONSTRUCTORES[tipo](datos, encabezado).getvalue()
+    return tablas.CONSTRUCTORES[formato](tipo, datos, encabezado).getvalue()
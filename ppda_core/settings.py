@@ -86,6 +86,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'apps.usuarios.middleware.HistorialAccesoMiddleware',
+    'apps.auditorias.middleware.BufferAuditoriaMiddleware',
     'apps.api.middleware.APILoggingMiddleware',
     'apps.api.middleware.TokenPrefixMiddleware'
 ]
@@ -103,6 +104,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'apps.notificaciones.context_processors.notificaciones_sse',
             ],
         },
     },
@@ -150,6 +152,10 @@ AUTH_USER_MODEL = 'usuarios.Usuario'
 REST_FRAMEWORK = {
     # Otras configuraciones de REST Framework...
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Los listados se paginan por número de página; las colecciones que crecen
+    # sin límite (avances, notificaciones) usan paginación por clave
+    'DEFAULT_PAGINATION_CLASS': 'apps.api.pagination.StandardResultsSetPagination',
+    'PAGE_SIZE': 20,
 }
 
 # Configuración de Spectacular
@@ -278,7 +284,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Para pruebas locales: django.core.mail.backends.filebased.EmailBackend (con EMAIL_FILE_PATH)
+# o django.core.mail.backends.locmem.EmailBackend
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = config('EMAIL_FILE_PATH', default=str(BASE_DIR / 'correos'))
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -286,3 +295,76 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='')
 SITE_URL = config('SITE_URL', default='')
+
+
+# Caché compartida entre procesos. En producción usar un backend común a todos
+# los workers (p. ej. django.core.cache.backends.redis.RedisCache)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='sma-monitor'),
+    }
+}
+# True si el backend de caché es común a todos los procesos. Los valores que se mantienen
+# en caché y se ajustan en cada escritura (contador de no leídas) solo se usan en ese caso;
+# con locmem cada proceso tendría su propia copia y se consulta la base de datos.
+CACHE_COMPARTIDA = config(
+    'CACHE_COMPARTIDA',
+    default=not CACHES['default']['BACKEND'].startswith(
+        ('django.core.cache.backends.locmem.', 'django.core.cache.backends.dummy.')
+    ),
+    cast=bool,
+)
+
+# Vigencia (segundos) del contador de notificaciones no leídas en caché
+NOTIFICACIONES_CONTADOR_DURACION = config('NOTIFICACIONES_CONTADOR_DURACION', default=3600, cast=int)
+
+# Flujo SSE de notificaciones. Desactivado por defecto: el navegador consulta el contador cada
+# 30 segundos. Activarlo solo con un servidor ASGI (con WSGI cada conexión ocupa un hilo); los
+# eventos se publican en memoria del proceso y los de otros procesos llegan con el latido.
+NOTIFICACIONES_SSE = config('NOTIFICACIONES_SSE', default=False, cast=bool)
+# Latido y duración máxima de cada conexión SSE (segundos)
+SSE_INTERVALO_LATIDO = config('SSE_INTERVALO_LATIDO', default=15, cast=int)
+SSE_DURACION_MAXIMA = config('SSE_DURACION_MAXIMA', default=300, cast=int)
+
+# Segundos entre verificaciones de la versión de ConfiguracionAuditoria
+AUDITORIA_CONFIGURACION_INTERVALO = config('AUDITORIA_CONFIGURACION_INTERVALO', default=5, cast=int)
+
+# Registro de llamadas a la API (cola en memoria escrita por un hilo en segundo plano)
+API_LOG_TASA_MUESTREO = config('API_LOG_TASA_MUESTREO', default=1.0, cast=float)
+API_LOG_COLA_MAXIMO = config('API_LOG_COLA_MAXIMO', default=10000, cast=int)
+API_LOG_LOTE = config('API_LOG_LOTE', default=200, cast=int)
+API_LOG_INTERVALO = config('API_LOG_INTERVALO', default=2.0, cast=float)
+
+# Filas leídas por cada viaje a la base de datos en las exportaciones CSV en streaming
+EXPORTACION_CSV_CHUNK = config('EXPORTACION_CSV_CHUNK', default=2000, cast=int)
+
+# Máximo de avances por solicitud en el registro en lote
+AVANCES_LOTE_MAXIMO = config('AVANCES_LOTE_MAXIMO', default=500, cast=int)
+
+# Filas guardadas por transacción en la importación masiva de medidas
+IMPORTACION_MEDIDAS_LOTE = config('IMPORTACION_MEDIDAS_LOTE', default=500, cast=int)
+
+# Segundos que se restan al sync_token para cubrir transacciones confirmadas después de la lectura
+SINCRONIZACION_MARGEN = config('SINCRONIZACION_MARGEN', default=60, cast=int)
+# Filas por colección en cada página de la sincronización
+SINCRONIZACION_LOTE = config('SINCRONIZACION_LOTE', default=500, cast=int)
+# Días que se conservan las marcas de RegistroEliminado (comando purgar_registros_eliminados)
+SINCRONIZACION_RETENCION_ELIMINADOS = config('SINCRONIZACION_RETENCION_ELIMINADOS', default=90, cast=int)
+
+# Generación de reportes en segundo plano (comando procesar_reportes).
+# En False, los reportes se generan dentro de la petición.
+REPORTES_GENERACION_ASINCRONA = config('REPORTES_GENERACION_ASINCRONA', default=True, cast=bool)
+# Segundos de reserva de un trabajo en proceso; el worker la renueva mientras lo ejecuta. Al
+# vencer (worker caído) el trabajo vuelve a la cola, hasta REPORTES_TRABAJO_MAX_INTENTOS veces.
+REPORTES_TRABAJO_RESERVA = config('REPORTES_TRABAJO_RESERVA', default=600, cast=int)
+REPORTES_TRABAJO_MAX_INTENTOS = config('REPORTES_TRABAJO_MAX_INTENTOS', default=3, cast=int)
+
+# Procesos worker con que se construyen los PDF en la generación en lote de reportes por organismo
+REPORTES_LOTE_WORKERS = config('REPORTES_LOTE_WORKERS', default=2, cast=int)
+
+# Descarga de reportes: '' la transmite Django; 'x-sendfile' (Apache, lighttpd) o 'x-accel-redirect'
+# (nginx) la delegan al servidor web. Con nginx, REPORTES_DESCARGA_PREFIJO es una location internal
+# que apunta a MEDIA_ROOT.
+REPORTES_DESCARGA_SERVIDOR = config('REPORTES_DESCARGA_SERVIDOR', default='')
+REPORTES_DESCARGA_PREFIJO = config('REPORTES_DESCARGA_PREFIJO', default='/protegido/')
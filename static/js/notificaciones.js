@@ -8,8 +8,36 @@ document.addEventListener('DOMContentLoaded', function() {
         return;
     }
 
+    function mostrarContador(cantidad) {
+        // Buscar el badge existente dentro del dropdown
+        let badge = notificacionesDropdown.querySelector('.badge');
+
+        if (cantidad > 0) {
+            // Si el badge ya existe, solo actualiza el texto
+            if (badge) {
+                badge.textContent = cantidad;
+                badge.style.display = '';  // Asegura que sea visible
+            } else {
+                // Si no existe, crea uno nuevo
+                badge = document.createElement('span');
+                badge.className = 'badge bg-danger rounded-pill';
+                badge.textContent = cantidad;
+
+                // Inserta el badge después del ícono de campana
+                const bellIcon = notificacionesDropdown.querySelector('.bi-bell');
+                if (bellIcon) {
+                    bellIcon.insertAdjacentElement('afterend', badge);
+                } else {
+                    notificacionesDropdown.appendChild(badge);
+                }
+            }
+        } else if (badge) {
+            // Si no hay notificaciones, oculta el badge
+            badge.style.display = 'none';
+        }
+    }
+
     function actualizarContadorNotificaciones() {
-        // Usar la URL exactamente como la probaste
         fetch('/api/v1/notificaciones/no-leidas/')
             .then(response => {
                 if (!response.ok) {
@@ -17,46 +45,28 @@ document.addEventListener('DOMContentLoaded', function() {
                 }
                 return response.json();
             })
-            .then(data => {
-                console.log('Respuesta de API:', data);
-
-                const cantidad = data.cantidad;
-
-                // Buscar el badge existente dentro del dropdown
-                let badge = notificacionesDropdown.querySelector('.badge');
-
-                if (cantidad > 0) {
-                    // Si el badge ya existe, solo actualiza el texto
-                    if (badge) {
-                        badge.textContent = cantidad;
-                        badge.style.display = '';  // Asegura que sea visible
-                    } else {
-                        // Si no existe, crea uno nuevo
-                        badge = document.createElement('span');
-                        badge.className = 'badge bg-danger rounded-pill';
-                        badge.textContent = cantidad;
-
-                        // Inserta el badge después del ícono de campana
-                        const bellIcon = notificacionesDropdown.querySelector('.bi-bell');
-                        if (bellIcon) {
-                            bellIcon.insertAdjacentElement('afterend', badge);
-                        } else {
-                            notificacionesDropdown.appendChild(badge);
-                        }
-                    }
-                } else if (badge) {
-                    // Si no hay notificaciones, oculta el badge
-                    badge.style.display = 'none';
-                }
-            })
+            .then(data => mostrarContador(data.cantidad))
             .catch(error => {
                 console.error('Error al obtener notificaciones:', error);
             });
     }
 
-    // Ejecutar inmediatamente
-    actualizarContadorNotificaciones();
+    // Por defecto se consulta cada 30 segundos; el flujo SSE solo si el servidor lo habilita
+    if (!window.EventSource || notificacionesDropdown.dataset.sse !== '1') {
+        actualizarContadorNotificaciones();
+        setInterval(actualizarContadorNotificaciones, 30000);
+        return;
+    }
+
+    // El servidor envía el contador al conectar y cada vez que cambia;
+    // EventSource reconecta solo si se corta la conexión
+    const eventos = new EventSource('/api/v1/notificaciones/stream/');
+
+    eventos.addEventListener('contador', function(evento) {
+        mostrarContador(JSON.parse(evento.data).cantidad);
+    });
 
-    // Actualizar cada 30 segundos
-    setInterval(actualizarContadorNotificaciones, 30000);
-});
\ No newline at end of file
+    eventos.addEventListener('error', function() {
+        console.warn('Conexión de notificaciones interrumpida, reintentando...');
+    });
+});
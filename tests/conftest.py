@@ -0,0 +1,10 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    """La caché local del proceso sobrevive al rollback de la base de pruebas."""
+    cache.clear()
+    yield
+    cache.clear()
@@ -0,0 +1,108 @@
+import unittest
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.auditorias.models import Auditoria
+from apps.medidas.models import Componente, Medida, AsignacionMedida, RegistroAvance
+from apps.notificaciones.models import Notificacion
+from apps.organismos.models import Organismo, TipoOrganismo
+
+
+@pytest.mark.django_db
+class AvancesLoteTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        # Los datos iniciales se confirman aparte para que sus auditorías no se mezclen con las del lote
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            self._crear_datos()
+
+    def _crear_datos(self):
+        Usuario = get_user_model()
+        self.client = APIClient()
+        hoy = timezone.now().date()
+        tipo = TipoOrganismo.objects.create(nombre="Tipo Prueba")
+        self.organismo = Organismo.objects.create(nombre="Municipalidad", tipo=tipo)
+        componente = Componente.objects.create(nombre="Componente", codigo="CP")
+        self.medidas = [
+            Medida.objects.create(
+                nombre=f"Medida {indice}", codigo=f"LT-{indice}", descripcion="Desc",
+                componente=componente, fecha_inicio=hoy, fecha_termino=hoy,
+            )
+            for indice in range(4)
+        ]
+        for medida in self.medidas[:3]:
+            AsignacionMedida.objects.create(medida=medida, organismo=self.organismo)
+
+        self.usuario = Usuario.objects.create_user(
+            username="org", password="x", rol="organismo", organismo=self.organismo
+        )
+        Usuario.objects.create_user(username="admin1", password="x", rol="admin_sma")
+        Usuario.objects.create_user(username="admin2", password="x", rol="admin_sma")
+        self.client.force_authenticate(self.usuario)
+        self.hoy = hoy
+
+    def _avances(self, medidas, repeticiones=1):
+        return [
+            {"medida": medida.id, "fecha_registro": str(self.hoy), "porcentaje_avance": "25.00",
+             "descripcion": f"Avance {indice}"}
+            for medida in medidas for indice in range(repeticiones)
+        ]
+
+    def _post(self, datos):
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                resp = self.client.post("/api/v1/registros-avance/lote/", datos, format="json")
+        return resp, queries.captured_queries
+
+    def test_lote_un_evento_por_lote(self):
+        Notificacion.objects.all().delete()
+        Auditoria.objects.all().delete()
+
+        resp, queries = self._post(self._avances(self.medidas[:3], repeticiones=4))
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(len(resp.data), 12)
+        self.assertEqual(RegistroAvance.objects.filter(organismo=self.organismo, created_by=self.usuario).count(), 12)
+
+        # Un insert de registros, una notificación por administrador y una auditoría
+        inserts = [q for q in queries if q["sql"].startswith('INSERT INTO "medidas_registroavance"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Notificacion.objects.count(), 2)
+        auditoria = Auditoria.objects.get(accion="creacion")
+        self.assertEqual(len(auditoria.datos_adicionales["registros"]), 12)
+
+        # El costo no depende del tamaño del lote (el primer lote creó la configuración
+        # de auditoría de RegistroAvance: el siguiente la recarga una vez)
+        self._post(self._avances(self.medidas[:3]))
+        _, queries_chico = self._post(self._avances(self.medidas[:3]))
+        _, queries_grande = self._post(self._avances(self.medidas[:3], repeticiones=20))
+        self.assertEqual(len(queries_grande), len(queries_chico))
+
+    def test_medida_no_asignada_rechaza_todo_el_lote(self):
+        resp, _ = self._post(self._avances([self.medidas[0], self.medidas[3]]))
+
+        self.assertEqual(resp.status_code, 403)
+        self.assertEqual(resp.data["medidas"], [self.medidas[3].id])
+        self.assertFalse(RegistroAvance.objects.exists())
+
+    def test_validacion(self):
+        avances = self._avances(self.medidas[:2])
+        del avances[1]["porcentaje_avance"]
+        resp, _ = self._post(avances)
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("porcentaje_avance", resp.data[1])
+
+        resp, _ = self._post({"medida": self.medidas[0].id})
+        self.assertEqual(resp.status_code, 400)
+        self.assertFalse(RegistroAvance.objects.exists())
+
+    def test_lote_requiere_usuario_de_organismo(self):
+        self.client.force_authenticate(None)
+        resp, _ = self._post(self._avances(self.medidas[:1]))
+        self.assertIn(resp.status_code, (401, 403))
+        self.assertFalse(RegistroAvance.objects.exists())
@@ -0,0 +1,124 @@
+import unittest
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.auditorias.models import Auditoria, CambioDetalle, ConfiguracionAuditoria
+from apps.auditorias.services import ConfiguracionAuditoriaCache
+from apps.organismos.models import Organismo, TipoOrganismo
+
+
+@pytest.mark.django_db
+class BufferAuditoriaTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.tipo = TipoOrganismo.objects.create(nombre="Tipo Prueba")
+
+    def test_escritura_en_lote_al_confirmar(self):
+        with TestCase.captureOnCommitCallbacks() as callbacks:
+            organismo = Organismo.objects.create(nombre="Municipalidad", tipo=self.tipo)
+            organismo.nombre = "Municipalidad de Coyhaique"
+            organismo.comuna = "Coyhaique"
+            organismo.save()
+            self.assertEqual(Auditoria.objects.count(), 0)
+
+        with CaptureQueriesContext(connection) as queries:
+            for callback in callbacks:
+                callback()
+
+        inserts = [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith('INSERT') and 'auditorias_' in q['sql']
+        ]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(
+            list(Auditoria.objects.order_by('id').values_list('accion', flat=True)),
+            ['creacion', 'modificacion']
+        )
+        modificacion = Auditoria.objects.get(accion='modificacion')
+        self.assertEqual(
+            set(modificacion.detalles.values_list('campo', flat=True)),
+            {'nombre', 'comuna'}
+        )
+
+    def test_transaccion_revertida_descarta_registros(self):
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Organismo.objects.create(nombre="Revertido", tipo=self.tipo)
+                    raise ValueError
+            except ValueError:
+                pass
+            Organismo.objects.create(nombre="Confirmado", tipo=self.tipo)
+
+        self.assertEqual(Auditoria.objects.count(), 1)
+        self.assertIn("Confirmado", Auditoria.objects.get().descripcion)
+        self.assertEqual(CambioDetalle.objects.count(), 0)
+
+    def test_savepoint_revertido_descarta_solo_sus_registros(self):
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            Organismo.objects.create(nombre="Antes", tipo=self.tipo)
+            try:
+                with transaction.atomic():
+                    Organismo.objects.create(nombre="Revertido", tipo=self.tipo)
+                    raise ValueError
+            except ValueError:
+                pass
+            Organismo.objects.create(nombre="Después", tipo=self.tipo)
+
+        descripciones = list(Auditoria.objects.order_by('id').values_list('descripcion', flat=True))
+        self.assertEqual(len(descripciones), 2)
+        self.assertIn("Antes", descripciones[0])
+        self.assertIn("Después", descripciones[1])
+
+
+@pytest.mark.django_db
+class ConfiguracionAuditoriaCacheTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        ConfiguracionAuditoriaCache._configuraciones = None
+        self.tipo = TipoOrganismo.objects.create(nombre="Tipo Prueba")
+        Organismo.objects.create(nombre="Inicial", tipo=self.tipo)
+
+    def tearDown(self):
+        # La caché es del proceso y sobrevive al rollback de la base de pruebas
+        ConfiguracionAuditoriaCache._configuraciones = None
+        super().tearDown()
+
+    def test_sin_consultas_de_configuracion_en_estado_estable(self):
+        with CaptureQueriesContext(connection) as queries:
+            Organismo.objects.create(nombre="Otro", tipo=self.tipo)
+
+        tabla = ConfiguracionAuditoria._meta.db_table
+        self.assertFalse([q for q in queries.captured_queries if tabla in q['sql']])
+
+    def test_edicion_de_configuracion_invalida_cache(self):
+        content_type = ContentType.objects.get_for_model(Organismo)
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            config, _ = ConfiguracionAuditoria.objects.get_or_create(content_type=content_type)
+            config.auditar_creacion = False
+            config.save()
+
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            Organismo.objects.create(nombre="No auditado", tipo=self.tipo)
+
+        self.assertFalse(Auditoria.objects.filter(descripcion__contains="No auditado").exists())
+
+    def test_cambio_hecho_por_otro_proceso_se_detecta_en_la_base(self):
+        content_type = ContentType.objects.get_for_model(Organismo)
+        ConfiguracionAuditoriaCache.obtener(content_type, 'Organismo')
+
+        # Otro proceso desactiva la auditoría (sin señales ni caché compartida de por medio)
+        ConfiguracionAuditoria.objects.filter(content_type=content_type).update(
+            auditar_creacion=False, updated_at=timezone.now()
+        )
+        ConfiguracionAuditoriaCache._verificado = 0.0  # venció el intervalo de verificación
+
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            Organismo.objects.create(nombre="No auditado", tipo=self.tipo)
+
+        self.assertFalse(Auditoria.objects.filter(descripcion__contains="No auditado").exists())
+        self.assertEqual(ConfiguracionAuditoria.objects.filter(content_type=content_type).count(), 1)
@@ -0,0 +1,84 @@
+import unittest
+from unittest import mock
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from apps.reportes.models import TipoReporte
+from apps.reportes.services import ReporteService
+from apps.organismos.models import Organismo, TipoOrganismo
+from apps.medidas.models import Componente, Medida, AsignacionMedida, RegistroAvance
+
+
+@pytest.mark.django_db
+class CacheReportesTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        User = get_user_model()
+        self.tipo_org = TipoOrganismo.objects.create(nombre="Tipo Prueba")
+        self.organismo = Organismo.objects.create(nombre="Municipalidad", tipo=self.tipo_org)
+
+        self.usuario1 = User.objects.create_user(username="org1", password="testpassword", rol="organismo")
+        self.usuario2 = User.objects.create_user(username="org2", password="testpassword", rol="organismo")
+        for usuario in (self.usuario1, self.usuario2):
+            usuario.organismo = self.organismo
+            usuario.save()
+
+        componente = Componente.objects.create(nombre="Componente Prueba", codigo="CP")
+        hoy = timezone.now().date()
+        self.medida = Medida.objects.create(
+            nombre="Medida", codigo="CACHE-1", descripcion="Desc", componente=componente,
+            fecha_inicio=hoy, fecha_termino=hoy + timezone.timedelta(days=30),
+        )
+        AsignacionMedida.objects.create(medida=self.medida, organismo=self.organismo)
+
+        self.tipo = TipoReporte.objects.create(
+            nombre="Reporte Organismo", tipo="organismo", acceso_organismos=True
+        )
+
+    def _generar(self, usuario):
+        return ReporteService.generar_reporte(usuario, self.tipo.id, titulo="Mensual")
+
+    def test_mismos_parametros_reutilizan_archivo(self):
+        primero = self._generar(self.usuario1)
+
+        with mock.patch.object(ReporteService, '_generar_reporte_organismo') as generar:
+            segundo = self._generar(self.usuario2)
+
+        generar.assert_not_called()
+        self.assertNotEqual(primero.pk, segundo.pk)
+        self.assertEqual(segundo.usuario, self.usuario2)
+        self.assertEqual(primero.archivo.name, segundo.archivo.name)
+
+    def test_cambio_en_datos_invalida_cache(self):
+        primero = self._generar(self.usuario1)
+
+        RegistroAvance.objects.create(
+            medida=self.medida, organismo=self.organismo, created_by=self.usuario1,
+            fecha_registro=timezone.now().date(), porcentaje_avance=20, descripcion="Avance",
+        )
+        segundo = self._generar(self.usuario2)
+
+        self.assertNotEqual(primero.version_datos, segundo.version_datos)
+        self.assertNotEqual(primero.archivo.name, segundo.archivo.name)
+
+    def test_renombrar_tipo_de_organismo_invalida_cache(self):
+        primero = self._generar(self.usuario1)
+
+        self.tipo_org.nombre = "Tipo Renombrado"
+        self.tipo_org.save()
+        segundo = self._generar(self.usuario2)
+
+        self.assertNotEqual(primero.version_datos, segundo.version_datos)
+        self.assertNotEqual(primero.archivo.name, segundo.archivo.name)
+        # La versión calculada en lote coincide con la individual
+        self.assertEqual(
+            ReporteService._versiones_organismos([self.organismo.id])[self.organismo.id], segundo.version_datos
+        )
+
+    def test_parametros_distintos_no_comparten_archivo(self):
+        primero = self._generar(self.usuario1)
+        otro = ReporteService.generar_reporte(self.usuario1, self.tipo.id, titulo="Trimestral")
+
+        self.assertNotEqual(primero.huella_parametros, otro.huella_parametros)
+        self.assertNotEqual(primero.archivo.name, otro.archivo.name)
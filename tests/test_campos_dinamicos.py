@@ -0,0 +1,77 @@
+import unittest
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.medidas.models import Componente, Medida, AsignacionMedida, RegistroAvance
+from apps.organismos.models import Organismo, TipoOrganismo
+
+
+@pytest.mark.django_db
+class CamposDinamicosTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        # Versiones de ETag en caché: las consultas capturadas son solo las de la respuesta
+        compartida = override_settings(CACHE_COMPARTIDA=True)
+        compartida.enable()
+        self.addCleanup(compartida.disable)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username="admin", password="x", rol="admin_sma")
+        self.client.force_authenticate(self.user)
+
+        hoy = timezone.now().date()
+        tipo = TipoOrganismo.objects.create(nombre="Tipo Prueba")
+        self.organismo = Organismo.objects.create(nombre="Municipalidad", tipo=tipo, comuna="Temuco")
+        self.componente = Componente.objects.create(nombre="Componente", codigo="CP", descripcion="Larga")
+        self.medida = Medida.objects.create(
+            nombre="Medida", codigo="FD-1", descripcion="Desc", componente=self.componente,
+            fecha_inicio=hoy, fecha_termino=hoy,
+        )
+        AsignacionMedida.objects.create(medida=self.medida, organismo=self.organismo)
+        self.registro = RegistroAvance.objects.create(
+            medida=self.medida, organismo=self.organismo, fecha_registro=hoy,
+            porcentaje_avance=10, descripcion="Avance",
+        )
+
+    def _get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return resp.data, queries.captured_queries
+
+    def test_listado_medidas_solo_campos_pedidos(self):
+        datos, queries = self._get("/api/v1/medidas/?fields=id,codigo,estado")
+
+        self.assertEqual(dict(datos["results"][0]), {"id": self.medida.id, "codigo": "FD-1", "estado": "pendiente"})
+        consulta = next(q["sql"] for q in queries if 'FROM "medidas_medida"' in q["sql"] and "COUNT" not in q["sql"])
+        self.assertNotIn("descripcion", consulta)
+        self.assertNotIn("medidas_componente", consulta)
+
+    def test_detalle_medida_sin_expandir(self):
+        datos, queries = self._get(
+            f"/api/v1/medidas/{self.medida.id}/?fields=id,componente,asignaciones&expand=asignaciones"
+        )
+
+        self.assertEqual(datos["componente"], self.componente.id)
+        self.assertEqual(datos["asignaciones"][0]["organismo"]["nombre"], "Municipalidad")
+        self.assertNotIn("registros_avance", datos)
+        self.assertFalse(any("medidas_registroavance" in q["sql"] for q in queries))
+
+    def test_registros_con_medida_como_id(self):
+        datos, queries = self._get("/api/v1/registros-avance/?expand=organismo")
+
+        registro = datos["results"][0]
+        self.assertEqual(registro["medida"], self.medida.id)
+        self.assertEqual(registro["organismo"]["nombre"], "Municipalidad")
+        self.assertFalse(any("medidas_asignacionmedida" in q["sql"] for q in queries))
+
+    def test_sin_parametros_mantiene_anidados(self):
+        datos, _ = self._get(f"/api/v1/registros-avance/{self.registro.id}/")
+        self.assertEqual(datos["medida"]["componente"]["codigo"], "CP")
+
+        datos, _ = self._get(f"/api/v1/organismos/{self.organismo.id}/?fields=id,nombre,comuna")
+        self.assertEqual(dict(datos), {"id": self.organismo.id, "nombre": "Municipalidad", "comuna": "Temuco"})
@@ -0,0 +1,69 @@
+import unittest
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.medidas.models import Componente, Medida, AsignacionMedida, RegistroAvance
+from apps.organismos.models import Organismo, TipoOrganismo
+
+
+@pytest.mark.django_db
+class ConsultasAPIMedidasTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username="admin", password="x", rol="admin_sma")
+        self.client.force_authenticate(self.user)
+
+        self.tipo = TipoOrganismo.objects.create(nombre="Tipo Prueba")
+        self.componente = Componente.objects.create(nombre="Componente", codigo="CP")
+        self.total = 0
+
+    def _agregar_medidas(self, cantidad):
+        hoy = timezone.now().date()
+        for _ in range(cantidad):
+            self.total += 1
+            organismo = Organismo.objects.create(nombre=f"Organismo {self.total}", tipo=self.tipo)
+            medida = Medida.objects.create(
+                nombre=f"Medida {self.total}", codigo=f"Q-{self.total}", descripcion="Desc",
+                componente=self.componente, fecha_inicio=hoy, fecha_termino=hoy,
+            )
+            AsignacionMedida.objects.create(medida=medida, organismo=organismo)
+            for porcentaje in (10, 20):
+                RegistroAvance.objects.create(
+                    medida=medida, organismo=organismo, fecha_registro=hoy,
+                    porcentaje_avance=porcentaje, descripcion="Avance",
+                )
+
+    def _contar(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return len(queries.captured_queries)
+
+    def test_listado_registros_costo_constante(self):
+        self._agregar_medidas(2)
+        pocas = self._contar("/api/v1/registros-avance/")
+
+        self._agregar_medidas(6)
+        muchas = self._contar("/api/v1/registros-avance/")
+
+        self.assertEqual(pocas, muchas)
+        self.assertLessEqual(muchas, 8)
+
+    def test_detalle_y_listado_medidas_costo_constante(self):
+        self._agregar_medidas(2)
+        listado_pocas = self._contar("/api/v1/medidas/")
+        medida = Medida.objects.first()
+        detalle_pocas = self._contar(f"/api/v1/medidas/{medida.id}/")
+
+        self._agregar_medidas(6)
+        AsignacionMedida.objects.create(
+            medida=medida, organismo=Organismo.objects.create(nombre="Extra", tipo=self.tipo)
+        )
+
+        self.assertEqual(listado_pocas, self._contar("/api/v1/medidas/"))
+        self.assertEqual(detalle_pocas, self._contar(f"/api/v1/medidas/{medida.id}/"))
@@ -0,0 +1,85 @@
+import unittest
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.notificaciones.models import TipoNotificacion, Notificacion
+from apps.notificaciones.services import NotificacionService
+
+
+@pytest.mark.django_db
+class ContadorNotificacionesTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.user = get_user_model().objects.create_user(username="testuser", password="testpassword")
+        self.tipo = TipoNotificacion.objects.create(nombre="General", codigo="GEN")
+        # El contador en caché requiere un backend compartido entre procesos (p. ej. Redis)
+        compartida = override_settings(CACHE_COMPARTIDA=True)
+        compartida.enable()
+        self.addCleanup(compartida.disable)
+
+    def _crear(self, titulo="Aviso"):
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            return Notificacion.objects.create(tipo=self.tipo, usuario=self.user, titulo=titulo, mensaje="M")
+
+    def test_lectura_sin_consultas_en_estado_estable(self):
+        self._crear()
+        self.assertEqual(NotificacionService.contar_notificaciones_no_leidas(self.user), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            cantidad = NotificacionService.contar_notificaciones_no_leidas(self.user)
+
+        self.assertEqual(cantidad, 1)
+        self.assertEqual(len(queries.captured_queries), 0)
+
+    def test_creacion_y_lectura_ajustan_contador(self):
+        notificacion = self._crear()
+        self.assertEqual(NotificacionService.contar_notificaciones_no_leidas(self.user), 1)
+
+        self._crear("Otra")
+        self.assertEqual(NotificacionService.contar_notificaciones_no_leidas(self.user), 2)
+
+        # Los ajustes se aplican al confirmar la transacción
+        NotificacionService.notificar_usuarios([self.user, self.user], self.tipo, "Masiva", "M", enviar_email=False)
+        self.assertEqual(NotificacionService.contar_notificaciones_no_leidas(self.user), 2)
+
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            NotificacionService.notificar_usuarios([self.user], self.tipo, "Masiva", "M", enviar_email=False)
+        self.assertEqual(NotificacionService.contar_notificaciones_no_leidas(self.user), 3)
+
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            notificacion.marcar_como_leida()
+            notificacion.marcar_como_leida()
+        self.assertEqual(NotificacionService.contar_notificaciones_no_leidas(self.user), 2)
+
+        # La reconciliación corrige la diferencia con la base (las 2 sin confirmar)
+
+        NotificacionService.reconciliar_contadores([self.user.id])
+        self.assertEqual(NotificacionService.contar_notificaciones_no_leidas(self.user), 4)
+
+    def test_marcar_todas_deja_contador_en_cero(self):
+        self._crear()
+        self._crear("Otra")
+        self.assertEqual(NotificacionService.contar_notificaciones_no_leidas(self.user), 2)
+
+        assert self.client.login(username="testuser", password="testpassword")
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('notificaciones:marcar_todas_leidas'))
+
+        self.assertEqual(NotificacionService.contar_notificaciones_no_leidas(self.user), 0)
+
+    def test_sin_cache_compartida_cuenta_en_la_base(self):
+        with override_settings(CACHE_COMPARTIDA=False):
+            self._crear()
+            self.assertEqual(NotificacionService.contar_notificaciones_no_leidas(self.user), 1)
+
+            # Una notificación creada por otro proceso se ve de inmediato
+            Notificacion.objects.bulk_create([Notificacion(tipo=self.tipo, usuario=self.user, titulo="Otra", mensaje="M")])
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(NotificacionService.contar_notificaciones_no_leidas(self.user), 2)
+            self.assertEqual(len(queries.captured_queries), 1)
+            self.assertEqual(NotificacionService.reconciliar_contadores([self.user.id]), 0)
@@ -0,0 +1,46 @@
+import unittest
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.medidas.models import Componente, Medida
+
+
+@pytest.mark.django_db
+class DashboardInteractivoTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(username="admin", password="x", rol="admin_sma")
+        )
+        hoy = timezone.now().date()
+        componente = Componente.objects.create(nombre="Calefacción", codigo="CF")
+        Medida.objects.bulk_create([
+            Medida(nombre=f"Medida {i}", codigo=f"DI-{i:03d}", descripcion="Desc", componente=componente,
+                   fecha_inicio=hoy, fecha_termino=hoy, estado="completada" if i % 2 else "pendiente")
+            for i in range(130)
+        ])
+
+    def test_recorrer_next_obtiene_todas_las_medidas(self):
+        # Mismo recorrido que obtenerTodos() en el dashboard interactivo
+        medidas, url = [], "/api/v1/medidas/?page_size=100"
+        while url:
+            datos = self.client.get(url).json()
+            medidas.extend(datos["results"])
+            url = datos["next"]
+
+        self.assertEqual(len(medidas), 130)
+        self.assertEqual(sum(1 for m in medidas if m["estado"] == "completada"), 65)
+
+    def test_dashboard_no_se_queda_en_la_primera_pagina(self):
+        plantilla = Path(settings.BASE_DIR, "templates", "reportes", "dashboard_interactivo.html").read_text("utf-8")
+
+        self.assertIn("data.next ? pagina(data.next)", plantilla)
+        self.assertNotIn("data.results || data", plantilla)
+        for url in ("/api/v1/componentes/", "/api/v1/organismos/", "/api/v1/medidas/"):
+            self.assertIn(f"obtenerTodos('{url}')", plantilla)
@@ -0,0 +1,75 @@
+import unittest
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.medidas.models import Componente, Medida, AsignacionMedida, RegistroAvance
+from apps.organismos.models import Organismo, TipoOrganismo
+from apps.reportes import pdf
+from apps.reportes.datos import CargadorDatosReporte
+
+
+@pytest.mark.django_db
+class CargadorDatosReporteTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.usuario = get_user_model().objects.create_user(username="admin", password="x", rol="superadmin")
+        tipo = TipoOrganismo.objects.create(nombre="Tipo Prueba")
+        self.organismo = Organismo.objects.create(nombre="Municipalidad", tipo=tipo, email_contacto="m@x.cl")
+        self.componente = Componente.objects.create(nombre="Componente", codigo="CP")
+        self._crear_medidas(0, 2)
+
+    def _crear_medidas(self, desde, hasta):
+        for i in range(desde, hasta):
+            medida = Medida.objects.create(
+                nombre=f"Medida {i}", codigo=f"DR-{i:02d}", descripcion="Desc", componente=self.componente,
+                fecha_inicio=date(2025, 1, 1), fecha_termino=date(2025, 12, 31),
+                estado="completada" if i % 2 else "en_proceso",
+            )
+            AsignacionMedida.objects.create(medida=medida, organismo=self.organismo)
+            RegistroAvance.objects.create(
+                medida=medida, organismo=self.organismo, created_by=self.usuario, fecha_registro=date(2025, 6, i + 1),
+                descripcion="Avance", porcentaje_avance=50,
+            )
+
+    def _consultas(self, cargar):
+        with CaptureQueriesContext(connection) as queries:
+            datos = cargar()
+        return datos, len(queries.captured_queries)
+
+    def test_consultas_fijas_sin_importar_cantidad_de_medidas(self):
+        cargadores = [
+            CargadorDatosReporte.general,
+            lambda: CargadorDatosReporte.organismo(self.organismo.id),
+            lambda: CargadorDatosReporte.componente(self.componente.id),
+        ]
+        antes = [self._consultas(cargar)[1] for cargar in cargadores]
+        self._crear_medidas(2, 15)
+        despues = [self._consultas(cargar)[1] for cargar in cargadores]
+
+        self.assertEqual(antes, despues)
+        self.assertEqual(despues, [2, 3, 2])
+
+    def test_contenido_y_pdf_sin_consultas(self):
+        datos = CargadorDatosReporte.organismo(self.organismo.id)
+        self.assertEqual(datos["organismo"]["tipo__nombre"], "Tipo Prueba")
+        self.assertEqual(datos["resumen"]["total_medidas"], 2)
+        self.assertEqual(datos["resumen"]["medidas_completadas"], 1)
+        self.assertEqual([medida["estado_nombre"] for medida in datos["medidas"]], ["En Proceso", "Completada"])
+        self.assertEqual(len(datos["registros"]), 2)
+
+        general = CargadorDatosReporte.general()
+        self.assertEqual(general["resumen"]["total_medidas"], 2)
+        self.assertEqual(sum(estado["porcentaje"] for estado in general["estados"]), 100)
+        self.assertIsNone(CargadorDatosReporte.componente(None))
+        self.assertIsNone(CargadorDatosReporte.organismo(self.organismo.id + 100))
+
+        encabezado = {"titulo": "Prueba", "autor": "admin", "fecha": date(2025, 6, 1)}
+        with CaptureQueriesContext(connection) as queries:
+            contenido = pdf.reporte_organismo(datos, encabezado).getvalue()
+            pdf.reporte_general(general, encabezado)
+        self.assertTrue(contenido.startswith(b"%PDF"))
+        self.assertEqual(len(queries.captured_queries), 0)
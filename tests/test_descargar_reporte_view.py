@@ -1,13 +1,14 @@
 import unittest
 import pytest
 from django.urls import reverse
-from django.test import Client
+from django.test import Client, override_settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.contrib.messages import get_messages
 from apps.reportes.models import TipoReporte, ReporteGenerado
 from apps.organismos.models import Organismo, TipoOrganismo
 from apps.medidas.models import Componente
+from rest_framework.test import APIClient
 
 @pytest.mark.django_db
 class DescargarReporteViewTest(unittest.TestCase):
@@ -47,7 +48,44 @@ class DescargarReporteViewTest(unittest.TestCase):
             resp["Content-Disposition"],
             f'attachment; filename="reporte_general_{self.reporte.id}.pdf"'
         )
-        self.assertEqual(resp.content, self.file_content)
+        self.assertEqual(resp["Content-Length"], str(len(self.file_content)))
+        self.assertEqual(b"".join(resp.streaming_content), self.file_content)
+
+    def test_descargar_reporte_etag_y_rangos(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+        resp = self.client.get(self.url, HTTP_RANGE="bytes=5-8")
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(resp["Content-Range"], f"bytes 5-8/{len(self.file_content)}")
+        self.assertEqual(b"".join(resp.streaming_content), self.file_content[5:9])
+
+        resp = self.client.get(self.url, HTTP_RANGE="bytes=-5")
+        self.assertEqual(b"".join(resp.streaming_content), self.file_content[-5:])
+
+        # Un If-Range que no coincide descarta el rango y envía el archivo completo
+        resp = self.client.get(self.url, HTTP_RANGE="bytes=5-8", HTTP_IF_RANGE='"otro"')
+        self.assertEqual(resp.status_code, 200)
+
+        resp = self.client.get(self.url, HTTP_RANGE="bytes=500-")
+        self.assertEqual(resp.status_code, 416)
+        self.assertEqual(resp["Content-Range"], f"bytes */{len(self.file_content)}")
+
+    @override_settings(REPORTES_DESCARGA_SERVIDOR="x-accel-redirect", REPORTES_DESCARGA_PREFIJO="/protegido/")
+    def test_descargar_reporte_servidor_web(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["X-Accel-Redirect"], f"/protegido/{self.reporte.archivo.name}")
+        self.assertEqual(resp.content, b"")
+
+    def test_api_descargar(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        resp = client.get(f"/api/v1/reportes/{self.reporte.pk}/descargar/", HTTP_RANGE="bytes=0-3")
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(b"".join(resp.streaming_content), self.file_content[:4])
 
     def test_descargar_reporte_file_not_exists(self):
         self.reporte.archivo.delete(save=True)
@@ -0,0 +1,132 @@
+import unittest
+import unittest.mock
+import pytest
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.medidas.models import Componente, Medida, AsignacionMedida, EstadisticaPlan
+from apps.medidas.services import EstadisticaService
+from apps.organismos.models import Organismo, TipoOrganismo
+
+
+@pytest.mark.django_db
+class EstadisticaPlanTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        hoy = timezone.now().date()
+
+        self.componente = Componente.objects.create(nombre="Calidad del Aire", codigo="CA")
+        tipo = TipoOrganismo.objects.create(nombre="Tipo Prueba")
+        self.organismo = Organismo.objects.create(nombre="Municipalidad", tipo=tipo)
+
+        self.medida1 = Medida.objects.create(
+            nombre="Medida 1", codigo="EST-1", descripcion="Desc", componente=self.componente,
+            fecha_inicio=hoy, fecha_termino=hoy + timezone.timedelta(days=10),
+            estado="completada", porcentaje_avance=100,
+        )
+        self.medida2 = Medida.objects.create(
+            nombre="Medida 2", codigo="EST-2", descripcion="Desc", componente=self.componente,
+            fecha_inicio=hoy - timezone.timedelta(days=20), fecha_termino=hoy - timezone.timedelta(days=5),
+            estado="en_proceso", porcentaje_avance=50,
+        )
+        AsignacionMedida.objects.create(medida=self.medida1, organismo=self.organismo)
+
+    def test_resumen_desde_snapshot(self):
+        resumen = EstadisticaService.obtener_resumen()
+
+        self.assertEqual(resumen['global']['total_medidas'], 2)
+        self.assertEqual(resumen['global']['medidas_completadas'], 1)
+        self.assertEqual(resumen['global']['medidas_retrasadas'], 1)
+        self.assertEqual(float(resumen['global']['avance_promedio']), 75.0)
+
+        componente = next(c for c in resumen['componentes'] if c['id'] == self.componente.id)
+        self.assertEqual(componente['total_medidas'], 2)
+        self.assertEqual(componente['codigo'], "CA")
+
+        organismo = EstadisticaService.obtener_organismo(self.organismo.id)
+        self.assertEqual(organismo['total_medidas'], 1)
+        self.assertEqual(organismo['medidas_completadas'], 1)
+
+    def test_refresco_incremental_al_confirmar(self):
+        EstadisticaService.refrescar_todo()
+
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            AsignacionMedida.objects.create(medida=self.medida2, organismo=self.organismo)
+
+        organismo = EstadisticaService.obtener_organismo(self.organismo.id)
+        self.assertEqual(organismo['total_medidas'], 2)
+        self.assertEqual(organismo['medidas_retrasadas'], 1)
+
+    def test_portal_publico_lectura_unica(self):
+        EstadisticaService.refrescar_todo()
+
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(reverse("inicio_portal"))
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context["total_medidas"], 2)
+        tablas = [q['sql'] for q in queries.captured_queries if 'medidas_' in q['sql']]
+        self.assertEqual(len(tablas), 1)
+        self.assertIn(EstadisticaPlan._meta.db_table, tablas[0])
+
+    def test_snapshot_de_otro_dia_no_se_recalcula_en_la_solicitud(self):
+        EstadisticaService.refrescar_todo()
+        ayer = timezone.now().date() - timezone.timedelta(days=1)
+        EstadisticaPlan.objects.update(fecha_referencia=ayer)
+        Medida.objects.filter(pk=self.medida2.pk).update(estado="completada")
+
+        resumen = EstadisticaService.obtener_resumen()
+
+        # Se sirve el snapshot anterior; el cambio de día lo hace el comando nocturno
+        self.assertEqual(resumen['global']['medidas_completadas'], 1)
+        self.assertEqual(EstadisticaPlan.objects.get(ambito='global').fecha_referencia, ayer)
+
+    def test_refresco_solo_de_los_ambitos_afectados(self):
+        EstadisticaService.refrescar_todo()
+        otro = Componente.objects.create(nombre="Otro", codigo="OT")
+        # Refresco pendiente de los cambios de setUp (en el test no se confirman)
+        EstadisticaService._ejecutar_refresco_pendiente()
+        antes = dict(EstadisticaPlan.objects.values_list('id', 'updated_at'))
+
+        medida = Medida.objects.get(pk=self.medida2.pk)
+        medida.componente = otro
+        medida.estado = "completada"
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            medida.save()
+
+        resumen = EstadisticaService.obtener_resumen()
+        componentes = {c['id']: c for c in resumen['componentes']}
+        self.assertEqual(componentes[self.componente.id]['total_medidas'], 1)
+        self.assertEqual(componentes[otro.id]['total_medidas'], 1)
+        estados = {e['id']: e for e in resumen['estados']}
+        self.assertEqual(estados['completada']['total_medidas'], 2)
+        self.assertEqual(estados['en_proceso']['total_medidas'], 0)
+        self.assertEqual(resumen['global']['total_medidas'], 2)
+        self.assertEqual(resumen['global']['medidas_completadas'], 2)
+        self.assertEqual(float(resumen['global']['avance_promedio']), 75.0)
+
+        # Ningún organismo ni estado ajeno al cambio se reescribe
+        reescritas = {
+            (fila.ambito, fila.clave) for fila in EstadisticaPlan.objects.all() if fila.updated_at != antes[fila.id]
+        }
+        self.assertEqual(reescritas, {
+            ('global', ''), ('componente', str(self.componente.id)), ('componente', str(otro.id)),
+            ('estado', 'en_proceso'), ('estado', 'completada'),
+        })
+
+    def test_guardar_resuelve_filas_insertadas_por_otro_proceso(self):
+        EstadisticaService.refrescar_todo()
+        fila = EstadisticaPlan.objects.get(ambito='componente', clave=str(self.componente.id))
+        hoy = timezone.now().date()
+        valores = {'total_medidas': 7, 'avance_promedio': 0}
+
+        # Como si la fila no existiera al leer: el INSERT choca con la de otro proceso
+        with unittest.mock.patch.object(EstadisticaPlan.objects, 'filter', return_value=EstadisticaPlan.objects.none()):
+            EstadisticaService._guardar('componente', {fila.clave: ('CA', valores, {})}, hoy, claves=[fila.clave])
+
+        fila.refresh_from_db()
+        self.assertEqual(fila.total_medidas, 7)
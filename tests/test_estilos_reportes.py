@@ -0,0 +1,48 @@
+import unittest
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from apps.medidas.models import Componente, Medida, AsignacionMedida
+from apps.organismos.models import Organismo, TipoOrganismo
+from apps.reportes.estilos import obtener_tema
+from apps.reportes.models import TipoReporte
+from apps.reportes.services import ReporteService
+
+
+@pytest.mark.django_db
+class EstilosReportesTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        hoy = timezone.now().date()
+        self.usuario = get_user_model().objects.create_user(username="admin", password="x", rol="superadmin")
+        tipo = TipoOrganismo.objects.create(nombre="Tipo Prueba")
+        self.organismo = Organismo.objects.create(nombre="Municipalidad", tipo=tipo)
+        componente = Componente.objects.create(nombre="Componente", codigo="CP")
+        medida = Medida.objects.create(
+            nombre="Medida", codigo="EST-1", descripcion="Desc", componente=componente,
+            fecha_inicio=hoy, fecha_termino=hoy,
+        )
+        AsignacionMedida.objects.create(medida=medida, organismo=self.organismo)
+        self.tipos = [
+            TipoReporte.objects.create(nombre=f"Reporte {tipo}", tipo=tipo, acceso_superadmin=True)
+            for tipo in ("general", "organismo")
+        ]
+
+    def test_tema_compartido_no_se_modifica(self):
+        tema = obtener_tema()
+        self.assertIs(obtener_tema(), tema)
+        self.assertIs(tema.tabla_columna_centrada(2), tema.tabla_columna_centrada(2))
+        estilos = set(tema.estilos.byName)
+        comandos = list(tema.tabla.getCommands())
+
+        for indice in range(2):
+            for tipo in self.tipos:
+                reporte = ReporteService.generar_reporte(
+                    self.usuario, tipo.id, titulo=f"{tipo.tipo} {indice}", organismo_id=self.organismo.id
+                )
+                self.assertIsNotNone(reporte)
+                self.assertTrue(reporte.archivo.read().startswith(b"%PDF"))
+
+        self.assertEqual(set(tema.estilos.byName), estilos)
+        self.assertEqual(list(tema.tabla.getCommands()), comandos)
@@ -0,0 +1,91 @@
+import csv
+import io
+import unittest
+import pytest
+from django.contrib.auth import get_user_model
+from django.http import StreamingHttpResponse
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.medidas.models import Componente, Medida, RegistroAvance
+from apps.organismos.models import Organismo, TipoOrganismo
+
+
+@pytest.mark.django_db
+class ExportacionCSVTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username="admin", password="x", rol="admin_sma")
+        self.client.force_authenticate(self.user)
+
+        hoy = timezone.now().date()
+        tipo = TipoOrganismo.objects.create(nombre="Tipo Prueba")
+        self.organismo = Organismo.objects.create(nombre="Municipalidad", tipo=tipo)
+        otro = Organismo.objects.create(nombre="Seremi", tipo=tipo)
+        componente = Componente.objects.create(nombre="Calefacción", codigo="CF")
+        self.medida = Medida.objects.create(
+            nombre="Recambio", codigo="EX-1", descripcion="Desc", componente=componente,
+            fecha_inicio=hoy, fecha_termino=hoy,
+        )
+        for indice in range(5):
+            RegistroAvance.objects.create(
+                medida=self.medida, organismo=self.organismo, porcentaje_avance=indice * 10,
+                fecha_registro=hoy - timezone.timedelta(days=indice), descripcion=f"Avance {indice}",
+            )
+        RegistroAvance.objects.create(
+            medida=self.medida, organismo=otro, porcentaje_avance=5,
+            fecha_registro=hoy, descripcion="Otro organismo",
+        )
+
+    def _leer(self, resp):
+        self.assertIsInstance(resp, StreamingHttpResponse)
+        contenido = b"".join(resp.streaming_content).decode("utf-8")
+        return list(csv.reader(io.StringIO(contenido)))
+
+    @override_settings(EXPORTACION_CSV_CHUNK=2)
+    def test_exportar_registros_filtrados(self):
+        resp = self.client.get(f"/api/v1/registros-avance/exportar/?organismo={self.organismo.id}")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "text/csv; charset=utf-8")
+        filas = self._leer(resp)
+        self.assertEqual(filas[0], ["Código Medida", "Medida", "Organismo", "Fecha", "Avance (%)", "Descripción"])
+        self.assertEqual(len(filas), 6)
+        self.assertEqual([fila[5] for fila in filas[1:]], [f"Avance {i}" for i in range(5)])
+        self.assertTrue(all(fila[2] == "Municipalidad" for fila in filas[1:]))
+
+    def test_exportar_medidas(self):
+        filas = self._leer(self.client.get("/api/v1/medidas/exportar/"))
+
+        self.assertEqual(filas[0][:3], ["Código", "Nombre de la Medida", "Componente"])
+        self.assertEqual(filas[1][:3], ["EX-1", "Recambio", "Calefacción"])
+
+    def test_listado_csv_sin_paginar(self):
+        hoy = timezone.now().date()
+        Medida.objects.bulk_create([
+            Medida(nombre=f"Medida {i}", codigo=f"EX-{i:02d}", descripcion="Desc", componente=self.medida.componente,
+                   fecha_inicio=hoy, fecha_termino=hoy)
+            for i in range(2, 27)
+        ])
+
+        filas = self._leer(self.client.get("/api/v1/medidas/?format=csv&page_size=5"))
+        self.assertEqual(filas[0][:2], ["Código", "Nombre de la Medida"])
+        self.assertEqual(len(filas), 27)
+
+        filas = self._leer(self.client.get(f"/api/v1/registros-avance/?format=csv&page_size=2&organismo={self.organismo.id}"))
+        self.assertEqual(len(filas), 6)
+        self.assertEqual(filas[1][5], "Avance 0")
+
+    def test_exportar_escapa_formulas(self):
+        RegistroAvance.objects.filter(descripcion="Avance 0").update(descripcion="=HYPERLINK(\"http://x\")")
+        RegistroAvance.objects.filter(descripcion="Avance 1").update(descripcion="-1+2")
+        RegistroAvance.objects.filter(descripcion="Avance 2").update(descripcion="@SUMA(A1)")
+
+        filas = self._leer(self.client.get(f"/api/v1/registros-avance/exportar/?organismo={self.organismo.id}"))
+        descripciones = [fila[5] for fila in filas[1:]]
+        self.assertEqual(descripciones[:3], ["'=HYPERLINK(\"http://x\")", "'-1+2", "'@SUMA(A1)"])
+        self.assertEqual(descripciones[3], "Avance 3")
+        # Los números no se alteran aunque sean negativos
+        self.assertEqual(filas[1][4], "0.00")
@@ -0,0 +1,112 @@
+import csv
+import io
+import unittest
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+
+from apps.medidas.models import Componente, Medida, AsignacionMedida
+from apps.organismos.models import Organismo, TipoOrganismo
+from apps.reportes.models import TipoReporte, ReporteGenerado
+from apps.reportes.services import ReporteService
+
+
+@pytest.mark.django_db
+class FormatosReportesTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.usuario = get_user_model().objects.create_user(username="admin", password="x", rol="superadmin")
+        tipo = TipoOrganismo.objects.create(nombre="Tipo Prueba")
+        self.organismo = Organismo.objects.create(nombre="Municipalidad", tipo=tipo)
+        self.componente = Componente.objects.create(nombre="Componente", codigo="CP")
+        for i in range(3):
+            medida = Medida.objects.create(
+                nombre=f"Medida {i}", codigo=f"FR-{i}", descripcion="Desc", componente=self.componente,
+                fecha_inicio=date(2025, 1, 1), fecha_termino=date(2025, 12, 31), porcentaje_avance=10 * i,
+            )
+            AsignacionMedida.objects.create(medida=medida, organismo=self.organismo)
+        self.tipos = {
+            tipo: TipoReporte.objects.create(nombre=f"Reporte {tipo}", tipo=tipo, acceso_superadmin=True)
+            for tipo in ("general", "organismo", "componente")
+        }
+
+    def _generar(self, tipo, formato):
+        return ReporteService.generar_reporte(
+            self.usuario, self.tipos[tipo].id, titulo=f"{tipo} {formato}", formato=formato,
+            organismo_id=self.organismo.id, componente_id=self.componente.id,
+        )
+
+    def test_xlsx_con_una_hoja_por_tabla(self):
+        reporte = self._generar("organismo", "xlsx")
+        self.assertEqual(reporte.formato, "xlsx")
+        self.assertTrue(reporte.archivo.name.endswith(".xlsx"))
+
+        libro = load_workbook(io.BytesIO(reporte.archivo.read()))
+        self.assertEqual(libro.sheetnames, ["Organismo", "Resumen", "Medidas", "Registros"])
+        self.assertEqual(libro.properties.title, "organismo xlsx")
+        filas = list(libro["Medidas"].values)
+        self.assertEqual(filas[0], ("Código", "Nombre", "Estado", "Avance (%)"))
+        self.assertEqual([fila[0] for fila in filas[1:]], ["FR-0", "FR-1", "FR-2"])
+        self.assertEqual(filas[3][3], 20)
+
+        for tipo in ("general", "componente"):
+            reporte = self._generar(tipo, "xlsx")
+            self.assertIn("Resumen", load_workbook(io.BytesIO(reporte.archivo.read())).sheetnames)
+
+    def test_csv_y_cache_por_formato(self):
+        reporte_csv = self._generar("componente", "csv")
+        texto = reporte_csv.archivo.read().decode("utf-8-sig")
+        filas = list(csv.reader(io.StringIO(texto)))
+        self.assertEqual(filas[0], ["Componente"])
+        self.assertIn(["FR-1", "Medida 1", "Pendiente", "10.00"], filas)
+
+        # El mismo reporte en otro formato no reutiliza el archivo; en el mismo formato sí
+        reporte_pdf = self._generar("componente", "pdf")
+        self.assertTrue(reporte_pdf.archivo.read().startswith(b"%PDF"))
+        self.assertEqual(self._generar("componente", "csv").archivo.name, reporte_csv.archivo.name)
+        self.assertIsNone(self._generar("componente", "docx"))
+
+    def test_textos_con_formula_se_escriben_como_texto(self):
+        Medida.objects.filter(codigo="FR-0").update(nombre='=HYPERLINK("http://x","y")')
+        Medida.objects.filter(codigo="FR-1").update(nombre="+1-2")
+        Medida.objects.filter(codigo="FR-2").update(nombre="@SUMA(A1)")
+        esperados = ['=HYPERLINK("http://x","y")', "+1-2", "@SUMA(A1)"]
+
+        libro = load_workbook(io.BytesIO(self._generar("organismo", "xlsx").archivo.read()))
+        celdas = [fila[1] for fila in libro["Medidas"].iter_rows(min_row=2)]
+        self.assertEqual([celda.value for celda in celdas], esperados)
+        self.assertEqual({celda.data_type for celda in celdas}, {"s"})
+        # Los números siguen siendo números
+        self.assertEqual(libro["Medidas"]["D3"].value, 10)
+
+        texto = self._generar("componente", "csv").archivo.read().decode("utf-8-sig")
+        filas = list(csv.reader(io.StringIO(texto)))
+        self.assertIn(["FR-0", "'" + esperados[0], "Pendiente", "0.00"], filas)
+        self.assertIn(["FR-1", "'+1-2", "Pendiente", "10.00"], filas)
+        self.assertIn(["FR-2", "'@SUMA(A1)", "Pendiente", "20.00"], filas)
+
+    @override_settings(REPORTES_GENERACION_ASINCRONA=False)
+    def test_api_formato(self):
+        client = APIClient()
+        client.force_authenticate(self.usuario)
+        resp = client.post("/api/v1/reportes/generar/", {
+            "tipo_reporte_id": self.tipos["general"].id, "titulo": "General", "formato": "xlsx",
+        }, format="json")
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["formato"], "xlsx")
+
+        resp = client.get(f"/api/v1/reportes/{resp.data['id']}/descargar/")
+        self.assertEqual(
+            resp["Content-Type"], "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+        self.assertTrue(resp["Content-Disposition"].endswith('.xlsx"'))
+
+        resp = client.post("/api/v1/reportes/generar/", {
+            "tipo_reporte_id": self.tipos["general"].id, "titulo": "General", "formato": "docx",
+        }, format="json")
+        self.assertEqual(resp.status_code, 400)
+        self.assertFalse(ReporteGenerado.objects.filter(formato="docx").exists())
@@ -0,0 +1,171 @@
+import io
+import unittest
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from openpyxl import Workbook
+from rest_framework.test import APIClient
+
+from apps.auditorias.models import Auditoria
+from apps.medidas.importacion import ImportadorMedidas, leer_filas
+from apps.medidas.models import Componente, Medida, AsignacionMedida
+from apps.medidas.services import EstadisticaService
+from apps.notificaciones.models import Notificacion
+from apps.organismos.models import Organismo, TipoOrganismo
+
+ENCABEZADO = "codigo;nombre;componente;fecha_inicio;fecha_termino;estado;organismos;coordinador\n"
+
+
+@pytest.mark.django_db
+class ImportarMedidasTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            self._crear_datos()
+
+    def _crear_datos(self):
+        tipo = TipoOrganismo.objects.create(nombre="Tipo Prueba")
+        self.municipio = Organismo.objects.create(nombre="Municipalidad", tipo=tipo, rut="69.190.700-7")
+        self.seremi = Organismo.objects.create(nombre="Seremi", tipo=tipo)
+        self.componente = Componente.objects.create(nombre="Componente", codigo="CP")
+        self.existente = Medida.objects.create(
+            nombre="Antigua", codigo="IM-0", descripcion="Desc", componente=self.componente,
+            fecha_inicio=date(2025, 1, 1), fecha_termino=date(2025, 12, 31),
+        )
+        AsignacionMedida.objects.create(medida=self.existente, organismo=self.seremi, es_coordinador=True)
+        Usuario = get_user_model()
+        self.admin = Usuario.objects.create_user(username="admin", password="x", rol="admin_sma")
+        self.usuario_municipio = Usuario.objects.create_user(
+            username="muni", password="x", rol="organismo", organismo=self.municipio
+        )
+
+    def _csv(self, filas):
+        return io.BytesIO((ENCABEZADO + "".join(filas)).encode("utf-8-sig"))
+
+    def _importar(self, archivo, nombre="medidas.csv", lote=None):
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                resumen = ImportadorMedidas(usuario=self.admin, lote=lote).importar(leer_filas(archivo, nombre))
+        return resumen, queries.captured_queries
+
+    def test_crea_actualiza_y_reporta_errores(self):
+        Auditoria.objects.all().delete()
+        Notificacion.objects.all().delete()
+        archivo = self._csv([
+            "IM-0;Renombrada;cp;01/02/2025;2025-12-31;en_proceso;Seremi|691907007;69.190.700-7\n",
+            "IM-1;Nueva;CP;2025-03-01;2025-06-30;;Municipalidad;\n",
+            "IM-2;Sin componente;XX;2025-03-01;2025-06-30;;;\n",
+            "IM-3;Fecha mala;CP;30-30-2025;2025-06-30;;Otro;\n",
+            "IM-1;Repetida;CP;2025-03-01;2025-06-30;;;\n",
+        ])
+
+        resumen, _ = self._importar(archivo)
+
+        self.assertEqual(resumen["filas"], 5)
+        self.assertEqual((resumen["medidas_creadas"], resumen["medidas_actualizadas"]), (1, 1))
+        self.assertEqual((resumen["asignaciones_creadas"], resumen["asignaciones_actualizadas"]), (2, 1))
+        self.assertEqual([error["fila"] for error in resumen["errores"]], [4, 5, 6])
+        self.assertEqual(len(resumen["errores"][1]["errores"]), 2)
+
+        self.existente.refresh_from_db()
+        self.assertEqual(self.existente.nombre, "Renombrada")
+        self.assertEqual(str(self.existente.fecha_inicio), "2025-02-01")
+        coordinador = AsignacionMedida.objects.get(medida=self.existente, es_coordinador=True)
+        self.assertEqual(coordinador.organismo, self.municipio)
+        self.assertEqual(Medida.objects.get(codigo="IM-1").responsables.get(), self.municipio)
+
+        # Una sola auditoría para toda la importación, no una por fila
+        auditoria = Auditoria.objects.get()
+        self.assertEqual(auditoria.accion, "importacion")
+        self.assertEqual(auditoria.datos_adicionales["medidas_creadas"], 1)
+        # Y una notificación por organismo con las medidas nuevas asignadas
+        notificacion = Notificacion.objects.get(usuario=self.usuario_municipio)
+        self.assertEqual(notificacion.titulo, "2 medidas asignadas")
+
+    def test_consultas_por_lote_no_por_fila(self):
+        filas = [f"IM-{i};Medida {i};CP;2025-01-01;2025-12-31;;Municipalidad;\n" for i in range(10, 40)]
+
+        # La primera importación crea el tipo de notificación
+        self._importar(self._csv(filas[:1]), lote=100)
+        _, queries_chico = self._importar(self._csv(filas[1:4]), lote=100)
+        _, queries_grande = self._importar(self._csv(filas[4:]), lote=100)
+
+        self.assertEqual(len(queries_grande), len(queries_chico))
+        self.assertEqual(Medida.objects.filter(codigo__startswith="IM-").count(), 31)
+
+    def test_codigo_de_componente_ambiguo_es_error(self):
+        Componente.objects.create(nombre="Otro con el mismo código", codigo="cp")
+        archivo = self._csv(["IM-5;Ambigua;CP;2025-03-01;2025-06-30;;;\n"])
+
+        resumen, _ = self._importar(archivo)
+
+        self.assertEqual(resumen["medidas_creadas"], 0)
+        self.assertEqual(resumen["errores"][0]["fila"], 2)
+        self.assertIn("ambiguo", resumen["errores"][0]["errores"][0])
+        self.assertFalse(Medida.objects.filter(codigo="IM-5").exists())
+
+    def test_organismo_repetido_en_la_fila_se_asigna_una_vez(self):
+        archivo = self._csv([
+            "IM-6;Repetido;CP;2025-03-01;2025-06-30;;Municipalidad|municipalidad|69.190.700-7;Municipalidad\n",
+            "IM-7;Otra;CP;2025-03-01;2025-06-30;;;\n",
+        ])
+
+        resumen, _ = self._importar(archivo)
+
+        self.assertEqual(resumen["errores"], [])
+        self.assertEqual((resumen["medidas_creadas"], resumen["asignaciones_creadas"]), (2, 1))
+        asignacion = AsignacionMedida.objects.get(medida__codigo="IM-6")
+        self.assertEqual((asignacion.organismo, asignacion.es_coordinador), (self.municipio, True))
+
+    def test_largo_de_codigo_y_nombre(self):
+        archivo = self._csv([
+            f"{'C' * 31};Código largo;CP;2025-03-01;2025-06-30;;;\n",
+            f"IM-8;{'N' * 256};CP;2025-03-01;2025-06-30;;;\n",
+            f"IM-9;{'N' * 255};CP;2025-03-01;2025-06-30;;;\n",
+        ])
+
+        resumen, _ = self._importar(archivo)
+
+        self.assertEqual(resumen["medidas_creadas"], 1)
+        self.assertEqual(
+            [error["errores"] for error in resumen["errores"]],
+            [["codigo supera los 30 caracteres"], ["nombre supera los 255 caracteres"]],
+        )
+
+    def test_refresca_organismos_ya_asignados(self):
+        EstadisticaService.refrescar(organismo_ids=None, componente_ids=None, estados=None)
+        self.assertEqual(EstadisticaService.obtener_organismo(self.seremi.id)["medidas_completadas"], 0)
+
+        # La fila no trae organismos: Seremi sigue asignado y su snapshot debe reflejar el cambio
+        archivo = self._csv(["IM-0;Antigua;CP;2025-01-01;2025-12-31;completada;;\n"])
+        self._importar(archivo)
+
+        self.assertEqual(EstadisticaService.obtener_organismo(self.seremi.id)["medidas_completadas"], 1)
+
+    def test_xlsx_y_api(self):
+        libro = Workbook()
+        hoja = libro.active
+        hoja.append(["Codigo", "Nombre", "Componente", "Fecha inicio", "Fecha termino", "Organismos"])
+        hoja.append(["IM-5", "Desde Excel", "CP", "2025-01-01", "2025-12-31", "Seremi"])
+        contenido = io.BytesIO()
+        libro.save(contenido)
+
+        client = APIClient()
+        url = "/api/v1/medidas/importar/"
+        archivo = SimpleUploadedFile("medidas.xlsx", contenido.getvalue())
+        self.assertIn(client.post(url, {"archivo": archivo}, format="multipart").status_code, (401, 403))
+
+        client.force_authenticate(self.admin)
+        archivo = SimpleUploadedFile("medidas.xlsx", contenido.getvalue())
+        resp = client.post(url, {"archivo": archivo}, format="multipart")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["medidas_creadas"], 1)
+        self.assertEqual(Medida.objects.get(codigo="IM-5").responsables.get(), self.seremi)
+
+        resp = client.post(url, {"archivo": SimpleUploadedFile("medidas.txt", b"x")}, format="multipart")
+        self.assertEqual(resp.status_code, 400)
@@ -0,0 +1,125 @@
+import unittest
+from unittest import mock
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.medidas.models import Componente, Medida, RegistroAvance
+from apps.notificaciones.models import Notificacion, CorreoPendiente
+from apps.notificaciones.services import NotificacionService
+from apps.organismos.models import Organismo, TipoOrganismo
+
+
+@pytest.mark.django_db
+class NotificacionesMasivasTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        mail.outbox = []
+        User = get_user_model()
+        for i in range(3):
+            User.objects.create_user(
+                username=f"admin{i}", password="testpassword", rol="admin_sma", email=f"admin{i}@test.com"
+            )
+        User.objects.create_user(
+            username="sin_email", password="testpassword", rol="admin_sma", email=""
+        )
+
+        tipo_org = TipoOrganismo.objects.create(nombre="Tipo Prueba")
+        self.organismo = Organismo.objects.create(nombre="Municipalidad", tipo=tipo_org)
+        componente = Componente.objects.create(nombre="Componente Prueba", codigo="CP")
+        hoy = timezone.now().date()
+        self.medida = Medida.objects.create(
+            nombre="Medida", codigo="NOT-1", descripcion="Desc", componente=componente,
+            fecha_inicio=hoy, fecha_termino=hoy + timezone.timedelta(days=30),
+        )
+
+    def test_nuevo_avance_inserts_en_lote_y_correos_en_bandeja(self):
+        with CaptureQueriesContext(connection) as queries:
+            RegistroAvance.objects.create(
+                medida=self.medida, organismo=self.organismo,
+                fecha_registro=timezone.now().date(), porcentaje_avance=30, descripcion="Avance",
+            )
+
+        for modelo in (Notificacion, CorreoPendiente):
+            tabla = modelo._meta.db_table
+            inserts = [q for q in queries.captured_queries if q['sql'].startswith(f'INSERT INTO "{tabla}"')]
+            self.assertEqual(len(inserts), 1)
+        self.assertEqual(Notificacion.objects.filter(medida=self.medida).count(), 4)
+        self.assertEqual(len(mail.outbox), 0)
+
+        resultado = NotificacionService.enviar_correos_pendientes()
+
+        self.assertEqual(resultado['enviados'], 3)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ["admin0@test.com", "admin1@test.com", "admin2@test.com"])
+        self.assertFalse(CorreoPendiente.objects.filter(estado='pendiente').exists())
+
+
+@pytest.mark.django_db
+class BandejaCorreosTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        mail.outbox = []
+        self.usuario = get_user_model().objects.create_user(
+            username="usuario", password="testpassword", email="usuario@test.com"
+        )
+
+    def test_notificacion_individual_encola_un_solo_correo(self):
+        NotificacionService.enviar_notificacion(self.usuario, "Aviso", "Mensaje")
+        self.assertEqual(CorreoPendiente.objects.count(), 1)
+
+        NotificacionService.enviar_notificacion(self.usuario, "Sin correo", "Mensaje", enviar_email=False)
+        self.assertEqual(CorreoPendiente.objects.count(), 1)
+
+    def test_reintento_con_espera_y_fallo_definitivo(self):
+        NotificacionService.enviar_notificacion(self.usuario, "Aviso", "Mensaje")
+        correo = CorreoPendiente.objects.get()
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                        side_effect=ConnectionError("SMTP caído")):
+            resultado = NotificacionService.enviar_correos_pendientes(max_intentos=2, espera_base=60)
+            self.assertEqual(resultado['reintentos'], 1)
+            correo.refresh_from_db()
+            self.assertEqual(correo.estado, 'pendiente')
+            self.assertEqual(correo.intentos, 1)
+            self.assertGreater(correo.proximo_intento, timezone.now() + timezone.timedelta(seconds=50))
+
+            # Aún no vence la espera: no se reintenta
+            self.assertEqual(NotificacionService.enviar_correos_pendientes(max_intentos=2)['reintentos'], 0)
+
+            CorreoPendiente.objects.update(proximo_intento=timezone.now())
+            resultado = NotificacionService.enviar_correos_pendientes(max_intentos=2)
+
+        self.assertEqual(resultado['fallidos'], 1)
+        correo.refresh_from_db()
+        self.assertEqual(correo.estado, 'fallido')
+        self.assertIn("SMTP caído", correo.ultimo_error)
+
+    def test_envio_fuera_de_la_transaccion_de_reserva(self):
+        NotificacionService.enviar_notificacion(self.usuario, "Aviso", "Mensaje")
+        durante_envio = []
+
+        def enviar(backend, mensajes):
+            durante_envio.append((len(connection.atomic_blocks), CorreoPendiente.objects.get().estado))
+            return len(mensajes)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', enviar):
+            resultado = NotificacionService.enviar_correos_pendientes()
+
+        self.assertEqual(resultado['enviados'], 1)
+        # El SMTP no se llama con la reserva abierta (fuera de la transacción de pytest)
+        self.assertEqual(durante_envio, [(len(connection.atomic_blocks), 'enviando')])
+        self.assertEqual(CorreoPendiente.objects.get().estado, 'enviado')
+
+    def test_reserva_vencida_de_worker_caido_se_retoma(self):
+        NotificacionService.enviar_notificacion(self.usuario, "Aviso", "Mensaje")
+        self.assertEqual(len(NotificacionService.reclamar_correos()), 1)
+
+        # Reservado y sin resultado: nadie más lo toma hasta que vence la reserva
+        self.assertEqual(NotificacionService.enviar_correos_pendientes()['enviados'], 0)
+        CorreoPendiente.objects.update(proximo_intento=timezone.now() - timezone.timedelta(seconds=1))
+
+        self.assertEqual(NotificacionService.enviar_correos_pendientes()['enviados'], 1)
+        self.assertEqual(len(mail.outbox), 1)
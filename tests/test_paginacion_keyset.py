@@ -0,0 +1,88 @@
+import unittest
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.medidas.models import Componente, Medida, RegistroAvance
+from apps.notificaciones.models import Notificacion, TipoNotificacion
+from apps.organismos.models import Organismo, TipoOrganismo
+
+
+@pytest.mark.django_db
+class PaginacionKeysetTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username="admin", password="x", rol="admin_sma")
+        self.client.force_authenticate(self.user)
+
+        hoy = timezone.now().date()
+        tipo = TipoOrganismo.objects.create(nombre="Tipo Prueba")
+        organismo = Organismo.objects.create(nombre="Municipalidad", tipo=tipo)
+        componente = Componente.objects.create(nombre="Componente", codigo="CP")
+        medida = Medida.objects.create(
+            nombre="Medida", codigo="KS-1", descripcion="Desc", componente=componente,
+            fecha_inicio=hoy, fecha_termino=hoy,
+        )
+        # Varias fechas repetidas: el id desempata el orden
+        for indice in range(7):
+            RegistroAvance.objects.create(
+                medida=medida, organismo=organismo, porcentaje_avance=indice,
+                fecha_registro=hoy - timezone.timedelta(days=indice // 3), descripcion="Avance",
+            )
+
+    def _recorrer(self, url):
+        ids, paginas = [], []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            self.assertNotIn("count", resp.data)
+            self.assertFalse(any("COUNT(" in q["sql"] for q in queries.captured_queries))
+            paginas.append(resp.data)
+            ids.extend(r["id"] for r in resp.data["results"])
+            url = resp.data["next"]
+        return ids, paginas
+
+    def test_registros_recorre_todas_las_paginas(self):
+        ids, paginas = self._recorrer("/api/v1/registros-avance/?page_size=3")
+
+        esperados = list(
+            RegistroAvance.objects.order_by("-fecha_registro", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, esperados)
+        self.assertEqual(len(paginas), 3)
+        self.assertIsNone(paginas[0]["previous"])
+
+        # El enlace previous de la última página vuelve a la página anterior
+        resp = self.client.get(paginas[-1]["previous"])
+        self.assertEqual([r["id"] for r in resp.data["results"]], esperados[3:6])
+        self.assertIsNotNone(resp.data["next"])
+
+    def test_cursor_invalido(self):
+        resp = self.client.get("/api/v1/registros-avance/?cursor=no-es-un-cursor")
+        self.assertEqual(resp.status_code, 404)
+
+    def test_notificaciones_del_usuario(self):
+        tipo = TipoNotificacion.objects.create(nombre="General", codigo="GEN")
+        otro = get_user_model().objects.create_user(username="otro", password="x")
+        for indice in range(5):
+            Notificacion.objects.create(tipo=tipo, usuario=self.user, titulo=f"N{indice}", mensaje="M")
+        Notificacion.objects.create(tipo=tipo, usuario=otro, titulo="Ajena", mensaje="M")
+
+        ids, _ = self._recorrer("/api/v1/notificaciones/?page_size=2")
+
+        esperados = list(
+            Notificacion.objects.filter(usuario=self.user)
+            .order_by("-fecha_envio", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, esperados)
+
+    def test_listados_paginados_por_defecto(self):
+        resp = self.client.get("/api/v1/medidas/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["count"], 1)
+        self.assertEqual(resp.data["current_page"], 1)
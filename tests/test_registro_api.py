@@ -0,0 +1,69 @@
+import unittest
+from unittest import mock
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, override_settings
+
+from apps.api.middleware import APILoggingMiddleware
+from apps.api.registro import ColaRegistroAPI
+from apps.auditorias.models import Auditoria
+
+
+@pytest.mark.django_db
+class RegistroAPITest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+        self.cola = ColaRegistroAPI(maximo=2, lote=10, intervalo=0.1)
+        # Sin hilo en segundo plano: las pruebas vacían la cola explícitamente
+        patch_iniciar = mock.patch.object(self.cola, '_iniciar')
+        patch_cola = mock.patch('apps.api.middleware.cola_registro_api', self.cola)
+        patch_iniciar.start()
+        patch_cola.start()
+        self.addCleanup(patch_iniciar.stop)
+        self.addCleanup(patch_cola.stop)
+
+    def _llamar(self, response, path="/api/v1/medidas/"):
+        request = self.factory.get(path)
+        request.user = AnonymousUser()
+        return APILoggingMiddleware(lambda r: response)(request)
+
+    def test_registro_fuera_de_la_peticion(self):
+        self._llamar(HttpResponse(b"ok"))
+        self.assertEqual(Auditoria.objects.count(), 0)
+
+        self.cola.vaciar()
+
+        auditoria = Auditoria.objects.get()
+        self.assertEqual(auditoria.accion, 'api_call')
+        self.assertEqual(auditoria.datos_adicionales['response_size'], 2)
+
+    def test_streaming_no_se_consume(self):
+        contenido = iter([b"a", b"b"])
+        response = self._llamar(StreamingHttpResponse(contenido))
+
+        self.assertEqual(b"".join(response.streaming_content), b"ab")
+        self.cola.vaciar()
+        self.assertIsNone(Auditoria.objects.get().datos_adicionales['response_size'])
+
+    def test_desborde_contabiliza_descartados(self):
+        for _ in range(3):
+            self._llamar(HttpResponse())
+
+        self.assertEqual(self.cola.estadisticas()['descartados'], 1)
+        with self.assertLogs('apps.api.registro', level='WARNING') as logs:
+            self.cola.vaciar()
+        self.assertEqual(Auditoria.objects.count(), 2)
+        self.assertIn("1 llamadas descartadas", logs.output[0])
+
+        # Los descartes ya informados no se repiten en la siguiente escritura
+        self._llamar(HttpResponse())
+        with self.assertLogs('apps.api.registro', level='DEBUG') as logs:
+            self.cola.vaciar()
+        self.assertEqual([registro.levelname for registro in logs.records], ['DEBUG'])
+
+    @override_settings(API_LOG_TASA_MUESTREO=0)
+    def test_muestreo(self):
+        self._llamar(HttpResponse())
+        self.assertEqual(self.cola.estadisticas()['encolados'], 0)
@@ -0,0 +1,149 @@
+import unittest
+from datetime import date
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.medidas.models import Componente, Medida, AsignacionMedida, RegistroAvance
+from apps.organismos.models import Organismo, TipoOrganismo
+from apps.reportes.datos import CargadorDatosReporte
+from apps.reportes.models import TipoReporte, ReporteGenerado, TrabajoReporte
+from apps.reportes.services import ReporteService
+
+
+@pytest.mark.django_db
+class ReportesLoteTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        Usuario = get_user_model()
+        self.admin = Usuario.objects.create_user(username="admin", password="x", rol="admin_sma")
+        tipo = TipoOrganismo.objects.create(nombre="Tipo Prueba")
+        self.organismos = [Organismo.objects.create(nombre=f"Organismo {i}", tipo=tipo) for i in range(3)]
+        self.inactivo = Organismo.objects.create(nombre="Inactivo", tipo=tipo, activo=False)
+        self.usuario_organismo = Usuario.objects.create_user(
+            username="org", password="x", rol="organismo", organismo=self.organismos[0]
+        )
+        componente = Componente.objects.create(nombre="Componente", codigo="CP")
+        for i in range(6):
+            medida = Medida.objects.create(
+                nombre=f"Medida {i}", codigo=f"RL-{i}", descripcion="Desc", componente=componente,
+                fecha_inicio=date(2025, 1, 1), fecha_termino=date(2025, 12, 31),
+            )
+            organismo = self.organismos[i % 2]
+            AsignacionMedida.objects.create(medida=medida, organismo=organismo)
+            for dia in range(1, 8):
+                RegistroAvance.objects.create(
+                    medida=medida, organismo=organismo, created_by=self.admin,
+                    fecha_registro=date(2025, 3, dia), descripcion=f"Avance {dia}", porcentaje_avance=dia,
+                )
+        self.tipo = TipoReporte.objects.create(nombre="Por organismo", tipo="organismo", acceso_admin_sma=True)
+
+    def test_datos_del_lote_iguales_a_los_individuales(self):
+        with CaptureQueriesContext(connection) as queries:
+            lote = CargadorDatosReporte.organismos()
+        self.assertEqual(len(queries.captured_queries), 3)
+        self.assertEqual(set(lote), {organismo.id for organismo in self.organismos})
+
+        for organismo in self.organismos:
+            individual = CargadorDatosReporte.organismo(organismo.id)
+            self.assertEqual(lote[organismo.id], individual)
+        self.assertEqual(len(lote[self.organismos[0].id]["registros"]), 10)
+        self.assertEqual(lote[self.organismos[2].id]["medidas"], [])
+
+        # La versión de datos calculada en lote coincide con la del reporte individual
+        versiones = ReporteService._versiones_organismos(list(lote))
+        for organismo in self.organismos:
+            self.assertEqual(
+                versiones[organismo.id],
+                ReporteService._version_datos(self.tipo, {"organismo_id": organismo.id}),
+            )
+
+    def test_genera_en_paralelo_y_reutiliza(self):
+        resumen = ReporteService.generar_reportes_organismos(self.admin, self.tipo.id, titulo="Cierre", procesos=2)
+
+        self.assertEqual((resumen["generados"], resumen["reutilizados"]), (3, 0))
+        self.assertGreater(resumen["reportes_por_segundo"], 0)
+        reportes = ReporteGenerado.objects.filter(tipo_reporte=self.tipo)
+        self.assertEqual(reportes.count(), 3)
+        for reporte in reportes:
+            self.assertEqual(reporte.titulo, f"Cierre - {reporte.organismo.nombre}")
+            self.assertTrue(reporte.archivo.read().startswith(b"%PDF"))
+
+        # Sin cambios en los datos se reutilizan los archivos; el reporte individual también los encuentra
+        resumen = ReporteService.generar_reportes_organismos(self.admin, self.tipo.id, titulo="Cierre")
+        self.assertEqual((resumen["generados"], resumen["reutilizados"]), (0, 3))
+        organismo = self.organismos[1]
+        reporte = ReporteService.generar_reporte(
+            self.admin, self.tipo.id, titulo=f"Cierre - {organismo.nombre}", organismo_id=organismo.id
+        )
+        self.assertEqual(reporte.archivo.name, reportes.filter(organismo=organismo).first().archivo.name)
+
+    def test_error_al_guardar_borra_los_archivos(self):
+        almacenamiento = ReporteGenerado._meta.get_field("archivo").storage
+        guardar = almacenamiento.save
+        nombres = []
+
+        def registrar(nombre, contenido, **kwargs):
+            nombres.append(guardar(nombre, contenido, **kwargs))
+            return nombres[-1]
+
+        with mock.patch.object(almacenamiento, "save", side_effect=registrar), \
+                mock.patch.object(ReporteGenerado.objects, "bulk_create", side_effect=DatabaseError("caída")):
+            with self.assertRaises(DatabaseError):
+                ReporteService.generar_reportes_organismos(self.admin, self.tipo.id, titulo="Fallido")
+
+        self.assertEqual(len(nombres), 3)
+        self.assertFalse(any(almacenamiento.exists(nombre) for nombre in nombres))
+        self.assertFalse(ReporteGenerado.objects.filter(tipo_reporte=self.tipo).exists())
+
+    @override_settings(REPORTES_LOTE_WORKERS=1, REPORTES_GENERACION_ASINCRONA=False)
+    def test_api_lote(self):
+        client = APIClient()
+        url = "/api/v1/reportes/lote/"
+        client.force_authenticate(self.usuario_organismo)
+        self.assertEqual(client.post(url, {"tipo_reporte_id": self.tipo.id}, format="json").status_code, 403)
+
+        client.force_authenticate(self.admin)
+        resp = client.post(
+            url, {"tipo_reporte_id": self.tipo.id, "organismo_ids": [self.organismos[0].id]}, format="json"
+        )
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["generados"], 1)
+        self.assertEqual(resp.data["reportes"][0]["organismo"], self.organismos[0].id)
+
+    @override_settings(REPORTES_GENERACION_ASINCRONA=True)
+    def test_api_lote_encola_un_trabajo_por_organismo(self):
+        client = APIClient()
+        url = "/api/v1/reportes/lote/"
+        client.force_authenticate(self.usuario_organismo)
+        self.assertEqual(client.post(url, {"tipo_reporte_id": self.tipo.id}, format="json").status_code, 403)
+
+        client.force_authenticate(self.admin)
+        with mock.patch.object(ReporteService, "generar_reportes_organismos") as generar:
+            resp = client.post(url, {"tipo_reporte_id": self.tipo.id, "titulo": "Cierre"}, format="json")
+
+        generar.assert_not_called()
+        self.assertEqual(resp.status_code, 202)
+        trabajos = resp.data["trabajos"]
+        # Solo los organismos activos, sin generar nada en la petición
+        self.assertEqual({t["parametros"]["organismo_id"] for t in trabajos}, {o.id for o in self.organismos})
+        self.assertTrue(all(t["estado"] == "pendiente" and t["estado_url"] for t in trabajos))
+        self.assertFalse(ReporteGenerado.objects.exists())
+
+        # El worker procesa cada trabajo y reutiliza los archivos de un lote con los mismos datos
+        ReporteService.generar_reportes_organismos(self.admin, self.tipo.id, titulo="Cierre")
+        for trabajo in trabajos:
+            ReporteService.procesar_trabajo(trabajo["id"])
+        completados = TrabajoReporte.objects.filter(estado="completado").select_related("reporte")
+        self.assertEqual(completados.count(), 3)
+        for trabajo in completados:
+            self.assertEqual(trabajo.reporte.titulo, f"Cierre - {trabajo.reporte.organismo.nombre}")
+            self.assertEqual(
+                trabajo.reporte.archivo.name,
+                ReporteGenerado.objects.filter(organismo=trabajo.reporte.organismo).earliest("id").archivo.name,
+            )
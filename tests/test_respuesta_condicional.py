@@ -0,0 +1,93 @@
+import unittest
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.medidas.models import Componente, Medida, AsignacionMedida
+from apps.organismos.models import Organismo, TipoOrganismo
+
+
+@pytest.mark.django_db
+class RespuestaCondicionalTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        compartida = override_settings(CACHE_COMPARTIDA=True)
+        compartida.enable()
+        self.addCleanup(compartida.disable)
+        self.client = APIClient()
+        hoy = timezone.now().date()
+        self.tipo = TipoOrganismo.objects.create(nombre="Tipo Prueba")
+        self.organismo = Organismo.objects.create(nombre="Municipalidad", tipo=self.tipo)
+        self.componente = Componente.objects.create(nombre="Componente", codigo="CP")
+        self.medida = Medida.objects.create(
+            nombre="Medida", codigo="ET-1", descripcion="Desc", componente=self.componente,
+            fecha_inicio=hoy, fecha_termino=hoy,
+        )
+
+    def _condicional(self, url, etag):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        return resp, len(queries.captured_queries)
+
+    def test_304_sin_consultas_cuando_no_hay_cambios(self):
+        for url in ("/api/v1/componentes/", "/api/v1/organismos/", "/api/v1/tipos-organismo/",
+                    "/api/v1/medidas/", f"/api/v1/medidas/{self.medida.id}/", "/api/v1/dashboard/"):
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200, url)
+            self.assertIn("ETag", resp)
+
+            resp, consultas = self._condicional(url, resp["ETag"])
+            self.assertEqual(resp.status_code, 304, url)
+            self.assertEqual(consultas, 0, url)
+            self.assertEqual(resp.content, b"")
+
+    def test_cambio_en_tabla_relacionada_invalida_etag(self):
+        url = f"/api/v1/medidas/{self.medida.id}/"
+        etag = self.client.get(url)["ETag"]
+
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            AsignacionMedida.objects.create(medida=self.medida, organismo=self.organismo)
+
+        resp, _ = self._condicional(url, etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+        self.assertEqual(len(resp.data["asignaciones"]), 1)
+
+        # Otro endpoint que no depende de la tabla conserva su ETag
+        etag_tipos = self.client.get("/api/v1/tipos-organismo/")["ETag"]
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            Componente.objects.create(nombre="Otro", codigo="OT")
+        self.assertEqual(self._condicional("/api/v1/tipos-organismo/", etag_tipos)[0].status_code, 304)
+
+    def test_etag_depende_del_alcance_del_usuario(self):
+        etag_anonimo = self.client.get("/api/v1/medidas/")["ETag"]
+
+        usuario = get_user_model().objects.create_user(
+            username="org", password="x", rol="organismo", organismo=self.organismo
+        )
+        self.client.force_authenticate(usuario)
+        resp, _ = self._condicional("/api/v1/medidas/", etag_anonimo)
+        self.assertEqual(resp.status_code, 200)
+
+    def test_sin_cache_compartida_la_version_sale_de_la_base_de_datos(self):
+        url = f"/api/v1/medidas/{self.medida.id}/"
+        with override_settings(CACHE_COMPARTIDA=False):
+            etag = self.client.get(url)["ETag"]
+            self.assertEqual(self._condicional(url, etag)[0].status_code, 304)
+
+            # Cambio hecho por otro proceso: no pasa por las señales de este
+            Medida.objects.filter(pk=self.medida.pk).update(
+                estado="en_proceso", updated_at=timezone.now() + timezone.timedelta(seconds=1)
+            )
+            resp, _ = self._condicional(url, etag)
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp.data["estado"], "en_proceso")
+
+            # Un borrado también cambia la versión
+            etag = resp["ETag"]
+            Organismo.objects.filter(pk=self.organismo.pk).delete()
+            self.assertEqual(self._condicional(url, etag)[0].status_code, 200)
@@ -0,0 +1,65 @@
+import unittest
+from datetime import timedelta
+
+import pytest
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.medidas.models import Componente, Medida
+from apps.medidas.services import RetrasoService
+
+
+@pytest.mark.django_db
+class RetrasoMedidasTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.hoy = timezone.now().date()
+        componente = Componente.objects.create(nombre="Componente", codigo="CP")
+
+        def medida(codigo, dias, estado="en_proceso"):
+            return Medida.objects.create(
+                nombre=codigo, codigo=codigo, descripcion="Desc", componente=componente,
+                fecha_inicio=self.hoy - timedelta(days=60), fecha_termino=self.hoy + timedelta(days=dias),
+                estado=estado,
+            )
+
+        self.atrasada = medida("RT-1", -10)
+        self.poco_atrasada = medida("RT-2", -3, estado="pendiente")
+        self.completada = medida("RT-3", -20, estado="completada")
+        self.vigente = medida("RT-4", 1)
+
+    def test_calculo_al_guardar(self):
+        self.assertEqual((self.atrasada.retrasada, self.atrasada.dias_retraso), (True, 10))
+        self.assertEqual((self.completada.retrasada, self.completada.dias_retraso), (False, 0))
+        self.assertFalse(self.vigente.retrasada)
+
+        self.atrasada.estado = "completada"
+        self.atrasada.save()
+        self.atrasada.refresh_from_db()
+        self.assertEqual((self.atrasada.retrasada, self.atrasada.dias_retraso), (False, 0))
+
+    def test_actualizacion_diaria(self):
+        manana = self.hoy + timedelta(days=2)
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            resultado = RetrasoService.actualizar(manana)
+        self.assertEqual(resultado, {'retrasadas': 3, 'al_dia': 0})
+
+        self.vigente.refresh_from_db()
+        self.assertEqual((self.vigente.retrasada, self.vigente.dias_retraso), (True, 1))
+        self.atrasada.refresh_from_db()
+        self.assertEqual(self.atrasada.dias_retraso, 12)
+
+        # Sin cambio de día no se reescribe ninguna fila
+        self.assertEqual(RetrasoService.actualizar(manana), {'retrasadas': 0, 'al_dia': 0})
+
+        # Volver a hoy deja al día la medida que aún no vence
+        self.assertEqual(RetrasoService.actualizar(self.hoy), {'retrasadas': 2, 'al_dia': 1})
+
+    def test_filtro_y_orden_api(self):
+        resp = APIClient().get("/api/v1/medidas/?retrasada=true&orden=-dias_retraso&fields=codigo,dias_retraso")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            [dict(m) for m in resp.data["results"]],
+            [{"codigo": "RT-1", "dias_retraso": 10}, {"codigo": "RT-2", "dias_retraso": 3}],
+        )
@@ -0,0 +1,144 @@
+import io
+import unittest
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.api.models import RegistroEliminado
+from apps.medidas.models import Componente, Medida, AsignacionMedida, RegistroAvance
+from apps.organismos.models import Organismo, TipoOrganismo
+
+
+@pytest.mark.django_db
+class SincronizacionTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username="admin", password="x", rol="admin_sma")
+        self.client.force_authenticate(self.user)
+
+        hoy = timezone.now().date()
+        tipo = TipoOrganismo.objects.create(nombre="Tipo Prueba")
+        self.organismo = Organismo.objects.create(nombre="Municipalidad", tipo=tipo)
+        componente = Componente.objects.create(nombre="Componente", codigo="CP")
+        self.medidas = [
+            Medida.objects.create(
+                nombre=f"Medida {indice}", codigo=f"SY-{indice}", descripcion="Desc",
+                componente=componente, fecha_inicio=hoy, fecha_termino=hoy,
+            )
+            for indice in range(3)
+        ]
+        self.asignacion = AsignacionMedida.objects.create(medida=self.medidas[0], organismo=self.organismo)
+        self.registro = RegistroAvance.objects.create(
+            medida=self.medidas[0], organismo=self.organismo, fecha_registro=hoy,
+            porcentaje_avance=10, descripcion="Avance",
+        )
+
+    def _sincronizar(self, **parametros):
+        resp = self.client.get("/api/v1/sincronizacion/", parametros)
+        self.assertEqual(resp.status_code, 200)
+        return resp.data
+
+    def test_sincronizacion_completa(self):
+        datos = self._sincronizar()
+
+        self.assertTrue(datos["completo"])
+        self.assertEqual(len(datos["medidas"]["actualizados"]), 3)
+        self.assertEqual(len(datos["organismos"]["actualizados"]), 1)
+        self.assertEqual(datos["asignaciones"]["actualizados"][0]["medida"], self.medidas[0].id)
+        self.assertEqual(datos["registros_avance"]["actualizados"][0]["id"], self.registro.id)
+
+    def test_cambios_desde_token(self):
+        desde = timezone.now()
+        # Simula una sincronización anterior: las filas existentes quedan antes del token
+        Medida.objects.update(updated_at=desde - timezone.timedelta(hours=1))
+        Organismo.objects.update(updated_at=desde - timezone.timedelta(hours=1))
+        AsignacionMedida.objects.update(updated_at=desde - timezone.timedelta(hours=1))
+        RegistroAvance.objects.update(updated_at=desde - timezone.timedelta(hours=1))
+
+        modificada, desactivada, borrada = self.medidas
+        modificada.estado = "en_proceso"
+        modificada.save()
+        desactivada.activo = False
+        desactivada.save()
+        borrada_id = borrada.id
+        borrada.delete()
+        registro_id = self.registro.id
+        self.registro.delete()
+
+        datos = self._sincronizar(changed_since=desde.isoformat())
+
+        self.assertFalse(datos["completo"])
+        self.assertEqual([m["id"] for m in datos["medidas"]["actualizados"]], [modificada.id])
+        self.assertEqual(datos["medidas"]["eliminados"], sorted([desactivada.id, borrada_id]))
+        self.assertEqual(datos["organismos"], {"actualizados": [], "eliminados": []})
+        self.assertEqual(datos["registros_avance"]["eliminados"], [registro_id])
+
+        # El token retornado sirve como changed_since de la siguiente sincronización
+        siguiente = self._sincronizar(sync_token=datos["sync_token"])
+        self.assertEqual(siguiente["medidas"]["eliminados"], datos["medidas"]["eliminados"])
+
+    def test_borrado_en_cascada_deja_marcas(self):
+        self.medidas[0].delete()
+
+        marcas = set(RegistroEliminado.objects.values_list("modelo", "objeto_id"))
+        self.assertIn(("medidas.asignacionmedida", self.asignacion.id), marcas)
+        self.assertIn(("medidas.registroavance", self.registro.id), marcas)
+
+    def test_fecha_invalida(self):
+        resp = self.client.get("/api/v1/sincronizacion/", {"changed_since": "ayer"})
+        self.assertEqual(resp.status_code, 400)
+
+    @override_settings(SINCRONIZACION_LOTE=2)
+    def test_paginas_con_token_de_continuacion(self):
+        desde = timezone.now()
+        Medida.objects.update(updated_at=desde - timezone.timedelta(hours=1))
+        hoy = timezone.now().date()
+        nuevas = [
+            Medida.objects.create(
+                nombre=f"Nueva {indice}", codigo=f"SY-N{indice}", descripcion="Desc",
+                componente=self.medidas[0].componente, fecha_inicio=hoy, fecha_termino=hoy,
+            )
+            for indice in range(5)
+        ]
+        eliminadas = []
+        for medida in nuevas[2:]:
+            eliminadas.append(medida.id)
+            medida.delete()
+
+        paginas = [self._sincronizar(changed_since=desde.isoformat())]
+        while paginas[-1]["siguiente"]:
+            paginas.append(self._sincronizar(continuacion=paginas[-1]["siguiente"]))
+
+        self.assertEqual(len(paginas), 2)
+        self.assertTrue(all(len(p["medidas"]["actualizados"]) <= 2 for p in paginas))
+        self.assertEqual(
+            [m["id"] for p in paginas for m in p["medidas"]["actualizados"]], [m.id for m in nuevas[:2]]
+        )
+        self.assertEqual(sorted(i for p in paginas for i in p["medidas"]["eliminados"]), eliminadas)
+        # Todas las páginas repiten el sync_token de la primera
+        self.assertEqual({p["sync_token"] for p in paginas}, {paginas[0]["sync_token"]})
+
+        resp = self.client.get("/api/v1/sincronizacion/", {"continuacion": "no-es-un-token"})
+        self.assertEqual(resp.status_code, 400)
+
+    @override_settings(SINCRONIZACION_RETENCION_ELIMINADOS=30)
+    def test_purgar_registros_eliminados(self):
+        registro_id = self.registro.id
+        self.registro.delete()
+        antigua = RegistroEliminado.objects.create(modelo="medidas.medida", objeto_id=999)
+        RegistroEliminado.objects.filter(pk=antigua.pk).update(
+            fecha_eliminacion=timezone.now() - timezone.timedelta(days=31)
+        )
+
+        call_command("purgar_registros_eliminados", stdout=io.StringIO())
+
+        self.assertEqual(list(RegistroEliminado.objects.values_list("objeto_id", flat=True)), [registro_id])
+
+        # Un token anterior a la retención recibe una sincronización completa
+        datos = self._sincronizar(changed_since=(timezone.now() - timezone.timedelta(days=40)).isoformat())
+        self.assertTrue(datos["completo"])
+        self.assertEqual(len(datos["medidas"]["actualizados"]), 3)
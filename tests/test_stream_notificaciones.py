@@ -0,0 +1,95 @@
+import asyncio
+import json
+import unittest
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import AsyncRequestFactory, Client, TestCase, override_settings
+
+from apps.api.views.notificaciones import notificaciones_stream
+from apps.notificaciones.eventos import canal_notificaciones, flujo_eventos_async
+from apps.notificaciones.models import TipoNotificacion, Notificacion
+
+
+def _leer(chunk):
+    lineas = dict(
+        linea.split(': ', 1) for linea in chunk.splitlines()
+        if linea and not linea.startswith('retry')
+    )
+    return lineas['event'], json.loads(lineas['data'])
+
+
+@pytest.mark.django_db
+class StreamNotificacionesTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        ajustes = override_settings(SSE_INTERVALO_LATIDO=0.05, SSE_DURACION_MAXIMA=5)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.user = get_user_model().objects.create_user(username="testuser", password="testpassword")
+        self.tipo = TipoNotificacion.objects.create(nombre="General", codigo="GEN")
+
+    def _crear(self):
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            return Notificacion.objects.create(tipo=self.tipo, usuario=self.user, titulo="Aviso", mensaje="M")
+
+    def test_creacion_publica_notificacion_y_contador(self):
+        suscripcion = canal_notificaciones.suscribir(self.user.id)
+        self.addCleanup(canal_notificaciones.cancelar, suscripcion)
+
+        notificacion = self._crear()
+
+        eventos = [suscripcion.esperar(1), suscripcion.esperar(1)]
+        self.assertIn(('contador', {'cantidad': 1}), eventos)
+        self.assertEqual(next(datos for evento, datos in eventos if evento == 'notificacion')['id'], notificacion.id)
+
+    def test_flujo_asincrono(self):
+        async def recibir():
+            flujo = flujo_eventos_async(self.user.id)
+            inicial = await flujo.__anext__()
+            canal_notificaciones.publicar(self.user.id, 'contador', {'cantidad': 7})
+            siguiente = await flujo.__anext__()
+            await flujo.aclose()
+            return inicial, siguiente
+
+        inicial, siguiente = asyncio.run(recibir())
+        self.assertEqual(_leer(inicial), ('contador', {'cantidad': 0}))
+        self.assertEqual(_leer(siguiente), ('contador', {'cantidad': 7}))
+        self.assertFalse(canal_notificaciones.tiene_suscriptores(self.user.id))
+
+    def test_flujo_asincrono_reenvia_eventos_y_latido(self):
+        async def recibir():
+            flujo = flujo_eventos_async(self.user.id)
+            await flujo.__anext__()
+            canal_notificaciones.publicar(self.user.id, 'notificacion', {'id': 5})
+            eventos = [await flujo.__anext__(), await flujo.__anext__()]
+            await flujo.aclose()
+            return eventos
+
+        notificacion, latido = asyncio.run(recibir())
+        self.assertEqual(_leer(notificacion), ('notificacion', {'id': 5}))
+        self.assertEqual(latido, ": latido\n\n")
+
+    def test_endpoint_desactivado_por_defecto(self):
+        client = Client()
+        assert client.login(username="testuser", password="testpassword")
+
+        # Sin NOTIFICACIONES_SSE, o con WSGI, 204 indica a EventSource que no reconecte
+        self.assertEqual(client.get("/api/v1/notificaciones/stream/").status_code, 204)
+        with override_settings(NOTIFICACIONES_SSE=True):
+            self.assertEqual(client.get("/api/v1/notificaciones/stream/").status_code, 204)
+
+    @override_settings(NOTIFICACIONES_SSE=True)
+    def test_endpoint_sse_asgi(self):
+        request = AsyncRequestFactory().get("/api/v1/notificaciones/stream/")
+        request.user = self.user
+        resp = notificaciones_stream(request)
+
+        async def primero():
+            contenido = resp.streaming_content.__aiter__()
+            evento = await contenido.__anext__()
+            await contenido.aclose()
+            return evento
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "text/event-stream")
+        self.assertIn(b"event: contador", asyncio.run(primero()))
@@ -0,0 +1,88 @@
+import unittest
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.reportes.models import TipoReporte, ReporteGenerado, TrabajoReporte
+from apps.reportes.services import ReporteService
+
+
+@pytest.mark.django_db
+class TrabajoReporteTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        User = get_user_model()
+        self.user = User.objects.create_user(username="admin_sma", password="testpassword", rol="admin_sma")
+        self.user_organismo = User.objects.create_user(username="organismo", password="testpassword", rol="organismo")
+
+        self.tipo_general = TipoReporte.objects.create(
+            nombre="Reporte General", tipo="general",
+            acceso_superadmin=True, acceso_admin_sma=True, acceso_organismos=False
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_encolar_y_procesar_trabajo(self):
+        trabajo = ReporteService.encolar_reporte(self.user, self.tipo_general.id, titulo="Mensual")
+        self.assertEqual(trabajo.estado, 'pendiente')
+        self.assertFalse(ReporteGenerado.objects.filter(titulo="Mensual").exists())
+
+        trabajo = ReporteService.procesar_trabajo(trabajo.id)
+
+        self.assertEqual(trabajo.estado, 'completado')
+        self.assertIsNotNone(trabajo.fecha_fin)
+        self.assertEqual(trabajo.reporte.titulo, "Mensual")
+        self.assertTrue(trabajo.reporte.archivo)
+
+        # Un trabajo ya procesado no puede ser reclamado de nuevo
+        self.assertIsNone(ReporteService.procesar_trabajo(trabajo.id))
+
+    def test_encolar_sin_permiso(self):
+        self.assertIsNone(ReporteService.encolar_reporte(self.user_organismo, self.tipo_general.id))
+
+    def test_api_generar_responde_202_con_estado(self):
+        resp = self.client.post(
+            "/api/v1/reportes/generar/",
+            {"tipo_reporte_id": self.tipo_general.id, "titulo": "Desde API"},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(resp.data["estado"], "pendiente")
+
+        ReporteService.procesar_trabajo(resp.data["id"])
+
+        estado = self.client.get(resp.data["estado_url"])
+        self.assertEqual(estado.status_code, 200)
+        self.assertEqual(estado.data["estado"], "completado")
+        self.assertEqual(estado.data["reporte"]["titulo"], "Desde API")
+        self.assertEqual(TrabajoReporte.objects.count(), 1)
+
+    def test_trabajo_de_worker_caido_vuelve_a_la_cola(self):
+        trabajo = ReporteService.encolar_reporte(self.user, self.tipo_general.id, titulo="Huérfano")
+        self.assertTrue(ReporteService.reclamar_trabajo(trabajo.id))
+        self.assertEqual(ReporteService.recuperar_trabajos_vencidos(), {'fallidos': 0, 'reencolados': 0})
+
+        # El worker murió: la reserva vence sin renovarse
+        TrabajoReporte.objects.filter(pk=trabajo.id).update(vencimiento=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(ReporteService.recuperar_trabajos_vencidos(), {'fallidos': 0, 'reencolados': 1})
+
+        trabajo = ReporteService.procesar_trabajo(trabajo.id)
+        self.assertEqual(trabajo.estado, 'completado')
+        self.assertEqual(trabajo.intentos, 2)
+        self.assertIsNone(trabajo.vencimiento)
+
+    @override_settings(REPORTES_TRABAJO_MAX_INTENTOS=1)
+    def test_trabajo_que_agota_intentos_queda_fallido(self):
+        trabajo = ReporteService.encolar_reporte(self.user, self.tipo_general.id)
+        ReporteService.reclamar_trabajo(trabajo.id)
+        TrabajoReporte.objects.filter(pk=trabajo.id).update(vencimiento=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(ReporteService.recuperar_trabajos_vencidos(), {'fallidos': 1, 'reencolados': 0})
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, 'fallido')
+        self.assertIsNone(ReporteService.procesar_trabajo(trabajo.id))
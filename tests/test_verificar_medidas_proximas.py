@@ -0,0 +1,93 @@
+import unittest
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.medidas.models import Componente, Medida, AsignacionMedida
+from apps.notificaciones.models import Notificacion
+from apps.notificaciones.signals import verificar_medidas_proximas_vencer
+from apps.organismos.models import Organismo, TipoOrganismo
+
+
+@pytest.mark.django_db
+class VerificarMedidasProximasTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        User = get_user_model()
+        tipo_org = TipoOrganismo.objects.create(nombre="Tipo Prueba")
+        self.organismo = Organismo.objects.create(nombre="Municipalidad", tipo=tipo_org)
+        otro = Organismo.objects.create(nombre="Seremi", tipo=tipo_org)
+
+        self.usuarios_org = [
+            User.objects.create_user(username=f"org{i}", password="x", rol="organismo", organismo=self.organismo)
+            for i in range(2)
+        ]
+        User.objects.create_user(username="otro", password="x", rol="organismo", organismo=otro)
+        self.admin = User.objects.create_user(username="admin", password="x", rol="admin_sma")
+
+        componente = Componente.objects.create(nombre="Componente", codigo="CP")
+        hoy = timezone.now().date()
+        self.medidas = []
+        for i, dias in enumerate([5, 20, 60]):
+            medida = Medida.objects.create(
+                nombre=f"Medida {i}", codigo=f"VEN-{i}", descripcion="Desc", componente=componente,
+                fecha_inicio=hoy - timezone.timedelta(days=10),
+                fecha_termino=hoy + timezone.timedelta(days=dias), estado="en_proceso",
+            )
+            AsignacionMedida.objects.create(medida=medida, organismo=self.organismo)
+            self.medidas.append(medida)
+        # Las asignaciones generan sus propias notificaciones; solo interesan las de vencimiento
+        Notificacion.objects.all().delete()
+
+    def _vencimiento(self):
+        return Notificacion.objects.filter(tipo__codigo="medida_proxima_vencer")
+
+    def test_crea_pares_faltantes_en_pocas_consultas(self):
+        with CaptureQueriesContext(connection) as queries:
+            resultado = verificar_medidas_proximas_vencer()
+
+        # 2 medidas por vencer x (2 usuarios del organismo + 1 admin)
+        self.assertEqual(resultado['medidas'], 2)
+        self.assertEqual(resultado['notificaciones_organismos'], 4)
+        self.assertEqual(resultado['notificaciones_admins'], 2)
+        self.assertEqual(self._vencimiento().count(), 6)
+        self.assertFalse(self._vencimiento().filter(medida=self.medidas[2]).exists())
+        self.assertLessEqual(len(queries.captured_queries), 12)
+
+    def test_no_duplica_notificaciones_sin_leer(self):
+        verificar_medidas_proximas_vencer()
+        self._vencimiento().filter(usuario=self.usuarios_org[0], medida=self.medidas[0]).update(leida=True)
+
+        resultado = verificar_medidas_proximas_vencer()
+
+        self.assertEqual(resultado['notificaciones_organismos'], 1)
+        self.assertEqual(resultado['notificaciones_admins'], 0)
+        self.assertEqual(self._vencimiento().count(), 7)
+
+    def test_consultas_no_dependen_de_la_cantidad_de_admins(self):
+        User = get_user_model()
+        verificar_medidas_proximas_vencer()
+
+        def con_admins_nuevos(cantidad, prefijo):
+            admins = [
+                User.objects.create_user(username=f"{prefijo}{i}", password="x", rol="admin_sma")
+                for i in range(cantidad)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                resultado = verificar_medidas_proximas_vencer()
+            return admins, resultado, len(queries.captured_queries)
+
+        _, resultado, consultas_dos = con_admins_nuevos(2, "a")
+        self.assertEqual(resultado['notificaciones_admins'], 4)
+
+        admins, resultado, consultas_seis = con_admins_nuevos(6, "b")
+        self.assertEqual(consultas_seis, consultas_dos)
+        self.assertEqual(resultado['notificaciones_admins'], 12)
+
+        # Un admin con la notificación leída la recibe de nuevo; los demás no se duplican
+        self._vencimiento().filter(usuario=admins[0], medida=self.medidas[0]).update(leida=True)
+        resultado = verificar_medidas_proximas_vencer()
+        self.assertEqual(resultado['notificaciones_admins'], 1)
+        self.assertEqual(resultado['notificaciones_organismos'], 0)